@@ -0,0 +1,75 @@
+"""
+Throughput of features_acoustic.extract_acoustic_batch vs the per-clip loop.
+
+Pins BLAS/OpenMP to one thread (unless --threads is given) so the numbers are
+clips per second per core. Voice quality (Praat) runs per clip in both paths
+and dominates when enabled, so it is off by default; pass --voice to include it.
+"""
+import os
+import sys
+
+def _threads_from_argv() -> str:
+    if "--threads" in sys.argv:
+        return sys.argv[sys.argv.index("--threads") + 1]
+    return "1"
+
+# Must be set before numpy is imported
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, _threads_from_argv())
+
+import argparse
+import time
+import numpy as np
+from part1 import features_acoustic, config
+
+def _clips(n: int, n_samples: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(n_samples) / config.SAMPLE_RATE
+    f0 = rng.uniform(100, 300, size=(n, 1))
+    y = 0.3 * np.sin(2 * np.pi * f0 * t) + 0.02 * rng.standard_normal((n, n_samples))
+    return y.astype(np.float32)
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=str, default="1,2,4,8,16,32,64,128,256")
+    parser.add_argument("--seconds", type=float, default=config.ANALYSIS_WINDOW_SECONDS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=str, default="1")
+    parser.add_argument("--voice", action="store_true", help="Include Praat voice quality")
+    args = parser.parse_args()
+
+    n_samples = int(args.seconds * config.SAMPLE_RATE)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    print(f"clip={args.seconds}s threads={os.environ['OMP_NUM_THREADS']} voice={args.voice}")
+    print(f"{'batch':>6} {'loop clips/s':>13} {'batch clips/s':>14} {'speedup':>8}")
+
+    # Warm up the cached feature plan and librosa's filter caches
+    features_acoustic.extract_acoustic_batch(_clips(2, n_samples), voice=args.voice)
+
+    for size in sizes:
+        clips = _clips(size, n_samples)
+
+        def loop():
+            for clip in clips:
+                if args.voice:
+                    features_acoustic.extract_acoustic_vector(clip)
+                else:
+                    features_acoustic.extract_acoustic_batch(clip[np.newaxis], voice=False)
+
+        def batch():
+            features_acoustic.extract_acoustic_batch(clips, voice=args.voice)
+
+        loop_s = _best_of(loop, args.repeats)
+        batch_s = _best_of(batch, args.repeats)
+        print(f"{size:>6} {size / loop_s:>13.1f} {size / batch_s:>14.1f} {loop_s / batch_s:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,17 @@ import json
 import numpy as np
 import argparse
 from tqdm import tqdm
-from part1 import preprocess, features_acoustic, config
+from part1 import preprocess, features_acoustic, config, schema
 
-def compute_baselines(data_dir: str, output_path: str):
+def _extract(clips: list) -> np.ndarray:
+    """Acoustic vectors of (path, waveform) pairs, zero-padded into one stack."""
+    lengths = [len(waveform) for _, waveform in clips]
+    stack = np.zeros((len(clips), max(lengths)), dtype=np.float32)
+    for i, (_, waveform) in enumerate(clips):
+        stack[i, :len(waveform)] = waveform
+    return features_acoustic.extract_acoustic_batch(stack, lengths=lengths)
+
+def compute_baselines(data_dir: str, output_path: str, batch_size: int = 64):
     """
     Iterates over WAV files in data_dir, computes acoustic features, 
     and aggregates statistics to produce a baseline JSON.
@@ -19,23 +27,38 @@ def compute_baselines(data_dir: str, output_path: str):
     aggregated = {}
     
     print(f"Processing {len(wav_files)} files...")
+    clips = []
     for wav_path in tqdm(wav_files):
         try:
-            # Preprocess & Extract
+            # Preprocess
             # We skip io.decode checks and assume valid WAVs for baseline building
             waveform = preprocess.preprocess_audio(wav_path)
-            feats = features_acoustic.extract_acoustic_features(waveform)
-            
-            for k, v in feats.items():
+        except Exception as e:
+            print(f"Error processing {wav_path}: {e}")
+            continue
+        if len(waveform) > 0:
+            clips.append((wav_path, waveform))
+
+    # Extract in padded batches (one STFT/MFCC pass per batch); a failing batch is redone per file
+    for start in range(0, len(clips), batch_size):
+        chunk = clips[start:start + batch_size]
+        try:
+            vectors = list(_extract(chunk))
+        except Exception:
+            vectors = []
+            for wav_path, waveform in chunk:
+                try:
+                    vectors.extend(_extract([(wav_path, waveform)]))
+                except Exception as e:
+                    print(f"Error processing {wav_path}: {e}")
+
+        for feats in vectors:
+            for k, v in zip(schema.ACOUSTIC.names, feats.tolist()):
                 if v is None or np.isnan(v):
                     continue
                 if k not in aggregated:
                     aggregated[k] = []
                 aggregated[k].append(v)
-                
-        except Exception as e:
-            print(f"Error processing {wav_path}: {e}")
-            continue
 
     # Compute Stats
     baseline = {}
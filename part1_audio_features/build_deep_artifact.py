@@ -0,0 +1,24 @@
+"""
+Builds the wav2vec2 artifact that part1.features_deep.load_model loads at
+startup (see part1/deep_artifact.py). Run once per model/library upgrade and
+weights layout (DEEP_WEIGHTS); a stale artifact is rejected at load time.
+"""
+import argparse
+import json
+from part1 import deep_artifact, config
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output_dir", type=str, default=config.DEEP_ARTIFACT_DIR)
+    parser.add_argument("--model_name", type=str, default=config.DEEP_MODEL_NAME)
+    parser.add_argument("--weights", type=str, default=config.DEEP_WEIGHTS, choices=deep_artifact.WEIGHTS,
+                        help="qint8: quantized copy per worker; mmap: fp32 weights shared across workers")
+    args = parser.parse_args()
+
+    manifest = deep_artifact.build(args.output_dir, args.model_name, args.weights)
+    deep_artifact.verify(args.output_dir, args.model_name, args.weights)
+    print(json.dumps(manifest, indent=2))
+    print(f"Artifact saved to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Latency and detection AUC of truncated-depth wav2vec2 (DEEP_NUM_LAYERS).
+
+Labels come from the directory layout: WAVs under <data_dir>/human are 0,
+under <data_dir>/ai are 1. Each clip is preprocessed like the API and cut to
+the analysis window. The model is loaded once, and for every depth K the
+encoder is cut to its first K layers (pooled per DEEP_POOL_LAYER, by default
+the last one) and timed one clip per forward pass, as a CPU worker without
+batching would see it.
+
+The part2 classifier only consumes acoustic features, so its AUC is the same
+at every depth and is printed as the reference. Per K, the report gives the
+cross-validated AUC of a logistic-regression probe on the embeddings alone
+and on the embeddings plus the part2 score. That shows how much each depth
+could add to the detector.
+"""
+import os
+import glob
+import time
+import argparse
+import numpy as np
+from tqdm import tqdm
+from part1 import preprocess, features_acoustic, features_deep, config
+
+def _load(data_dir: str) -> tuple[list[np.ndarray], np.ndarray]:
+    window = int(config.ANALYSIS_WINDOW_SECONDS * config.SAMPLE_RATE)
+    waveforms, labels = [], []
+    for label, name in ((0, "human"), (1, "ai")):
+        wav_files = sorted(glob.glob(os.path.join(data_dir, name, "**/*.wav"), recursive=True))
+        for wav_path in tqdm(wav_files, desc=name):
+            try:
+                y = preprocess.preprocess_audio(wav_path)[:window]
+            except Exception as e:
+                print(f"Error processing {wav_path}: {e}")
+                continue
+            if len(y) > 0:
+                waveforms.append(y)
+                labels.append(label)
+    return waveforms, np.array(labels)
+
+def _part2_scores(waveforms: list[np.ndarray]) -> np.ndarray:
+    """Calibrated part2 probabilities from the acoustic features."""
+    import part2
+    part2.utils.load_artifacts()
+    lengths = [len(w) for w in waveforms]
+    stack = np.zeros((len(waveforms), max(lengths)), dtype=np.float32)
+    for i, w in enumerate(waveforms):
+        stack[i, :len(w)] = w
+    matrix = features_acoustic.extract_acoustic_batch(stack, lengths=lengths)
+    return part2._predict_proba(matrix)
+
+def _probe_auc(X: np.ndarray, y: np.ndarray, folds: int) -> float:
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    probe = make_pipeline(StandardScaler(), LogisticRegression(max_iter=2000))
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    scores = cross_val_predict(probe, X, y, cv=cv, method="predict_proba")[:, 1]
+    return roc_auc_score(y, scores)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data_dir", type=str, required=True, help="Directory with human/ and ai/ WAV subfolders")
+    parser.add_argument("--depths", type=str, default="2,4,6,8,10,12")
+    parser.add_argument("--folds", type=int, default=5)
+    args = parser.parse_args()
+
+    from sklearn.metrics import roc_auc_score
+
+    waveforms, labels = _load(args.data_dir)
+    if len(set(labels)) < 2:
+        print(f"Need both human/ and ai/ clips under {args.data_dir}")
+        return
+
+    part2_scores = _part2_scores(waveforms)
+    print(f"{len(waveforms)} clips ({int(labels.sum())} ai) | part2 AUC (acoustic): {roc_auc_score(labels, part2_scores):.4f}")
+
+    features_deep.load_model()
+    model = features_deep._MODEL
+    full_layers = model.encoder.layers
+    print(f"{'K':>3} {'ms/clip':>9} {'emb AUC':>8} {'emb+part2 AUC':>14}")
+    try:
+        for depth in [int(d) for d in args.depths.split(",")]:
+            features_deep.truncate_layers(model, depth, full_layers)
+            features_deep.extract_deep_embeddings_batch([waveforms[0]])  # warm-up
+
+            embeddings = []
+            start = time.perf_counter()
+            for w in waveforms:
+                embeddings.append(features_deep.extract_deep_embeddings_batch([w])[0])
+            ms_per_clip = (time.perf_counter() - start) * 1000.0 / len(waveforms)
+
+            embeddings = np.stack(embeddings)
+            emb_auc = _probe_auc(embeddings, labels, args.folds)
+            combined_auc = _probe_auc(np.column_stack([embeddings, part2_scores]), labels, args.folds)
+            print(f"{len(model.encoder.layers):>3} {ms_per_clip:>9.1f} {emb_auc:>8.4f} {combined_auc:>14.4f}")
+    finally:
+        features_deep.truncate_layers(model, 0, full_layers)
+
+if __name__ == "__main__":
+    main()
@@ -2,48 +2,93 @@
 import warnings
 warnings.filterwarnings("ignore")
 
-from typing import Optional
+from typing import Iterable, Optional
 import os
 import numpy as np
 
-from . import io, preprocess, features_acoustic, features_deep, bundle, config, utils
+from . import io, preprocess, features_acoustic, features_deep, bundle, config, utils, probe, schema, stages, registry, segments, window
+from .segments import extract_segments
 
-def extract_features(audio_base64: str, language_hint: Optional[str] = None) -> bundle.FeatureBundle:
+def extract_features(
+    audio_base64: str,
+    language_hint: Optional[str] = None,
+    features: Optional[Iterable[str]] = None,
+    explain: bool = True
+) -> bundle.FeatureBundle:
     """
     Main pipeline function.
     
     Args:
         audio_base64: Base64 encoded MP3 string.
         language_hint: Optional language code (not used in Part 1 logic but passed for API compliance).
+        features: Feature names the consumer needs (see registry.FEATURES), e.g. the
+            model's inputs. Only their dependency closure is computed; skipped acoustic
+            columns are NaN. None computes every acoustic feature, plus embeddings
+            when USE_DEEP_FEATURES is set.
+        explain: With features given, also compute registry.EXPLANATION_FEATURES.
         
     Returns:
         FeatureBundle object.
     """
     wav_path = None
     try:
-        # 1. Decode & Validate
-        wav_path, metadata = io.decode_and_validate(audio_base64)
-        
-        # 2. Preprocess
-        waveform = preprocess.preprocess_audio(wav_path)
-        
-        # 3. Acoustic Features
-        acoustic = features_acoustic.extract_acoustic_features(waveform, sr=config.SAMPLE_RATE)
+        # Only the analyses the requested features depend on are run
+        if features is None:
+            analyses = set(registry.ANALYSES) - (set() if config.USE_DEEP_FEATURES else {"embeddings"})
+        else:
+            requested = set(features) | (set(registry.EXPLANATION_FEATURES) if explain else set())
+            analyses = registry.resolve(requested)
+        # With DEEP_FULL_CLIP the embeddings see the whole clip (chunked); acoustic stages keep the window
+        deep_full = config.DEEP_FULL_CLIP and config.IN_MEMORY_DECODE and "embeddings" in analyses
+
+        # 1. Decode & Validate, 2. Preprocess
+        # In-memory decode hands the array straight to preprocessing (no temp files)
+        if deep_full:
+            raw_waveform, metadata = io.decode_to_array(audio_base64, full=True)
+            start, end = window.cut(raw_waveform, config.SAMPLE_RATE,
+                                    int(config.ANALYSIS_WINDOW_SECONDS * config.SAMPLE_RATE), metadata)
+            waveform = preprocess.preprocess_waveform(raw_waveform[start:end], sr=config.SAMPLE_RATE, copy=True)
+            deep_waveform = preprocess.preprocess_waveform(raw_waveform, sr=config.SAMPLE_RATE, copy=False)
+        elif config.IN_MEMORY_DECODE:
+            raw_waveform, metadata = io.decode_to_array(audio_base64)
+            waveform = deep_waveform = preprocess.preprocess_waveform(raw_waveform, sr=config.SAMPLE_RATE, copy=False)
+        else:
+            wav_path, metadata = io.decode_and_validate(audio_base64)
+            waveform = deep_waveform = preprocess.preprocess_audio(wav_path)
         
-        # 4. Deep Embeddings
-        if config.USE_DEEP_FEATURES:
-            embeddings = features_deep.extract_deep_embeddings(waveform, sr=config.SAMPLE_RATE)
+        # 3. Acoustic Features, 4. Deep Embeddings
+
+        # Independent stages over the same read-only waveform; concurrent with PARALLEL_STAGES
+        acoustic = np.full(schema.ACOUSTIC.size, np.nan, dtype=np.float32)
+        stage_fns = {}
+        if "stft" in analyses:
+            stage_fns["spectral"] = lambda: features_acoustic.write_spectral_features(acoustic, waveform, config.SAMPLE_RATE)
+        if "pitch" in analyses:
+            stage_fns["voice"] = lambda: features_acoustic.extract_voice_quality(
+                waveform, config.SAMPLE_RATE, metadata, pulses="point_process" in analyses)
+        if "embeddings" in analyses:
+            stage_fns["deep"] = lambda: features_deep.extract_deep_embeddings(deep_waveform, sr=config.SAMPLE_RATE)
+        results, metadata["stage_timings_ms"] = stages.run_stages(stage_fns)
+        if "voice" in results:
+            features_acoustic.write_voice_features(acoustic, results["voice"])
+        metadata["analyses"] = sorted(analyses)
+
+        if "deep" in results:
+            embeddings = results["deep"]
         else:
             # Return dummy embeddings to maintain schema compatibility
             embeddings = np.zeros(1536, dtype=np.float32)
-            utils.logger.debug("Skipping deep embeddings (disabled in config)")
+            utils.logger.debug("Skipping deep embeddings (not requested or disabled in config)")
         
         # 5. Bundle
+        # The dict view over the vector is only materialized for explanations/JSON
         feat_bundle = bundle.FeatureBundle(
-            acoustic_features=acoustic,
+            acoustic_features=schema.ACOUSTIC.view(acoustic),
             deep_embeddings=embeddings,
             metadata=metadata,
-            version=config.BUNDLE_VERSION
+            version=config.BUNDLE_VERSION,
+            acoustic_vector=acoustic,
+            schema_version=schema.ACOUSTIC.version
         )
 
 
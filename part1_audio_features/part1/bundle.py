@@ -1,21 +1,24 @@
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Mapping, Optional
 import numpy as np
 import json
 
 @dataclass
 class FeatureBundle:
-    acoustic_features: Dict[str, float]
+    acoustic_features: Mapping[str, float]  # dict, or a schema.FeatureView over acoustic_vector
     deep_embeddings: np.ndarray  # float32 array
     metadata: Dict[str, Any]
     version: str = "part1-v1"
+    acoustic_vector: Optional[np.ndarray] = None  # float32, ordered by schema.ACOUSTIC
+    schema_version: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Returns JSON-serializable dictionary (excluding huge embeddings)."""
         return {
-            "acoustic_features": self.acoustic_features,
+            "acoustic_features": dict(self.acoustic_features),
             "metadata": self.metadata,
             "version": self.version,
+            "schema_version": self.schema_version,
             "deep_embeddings_shape": list(self.deep_embeddings.shape)
         }
 
@@ -24,7 +27,26 @@ class FeatureBundle:
         np.savez_compressed(
             path,
             embeddings=self.deep_embeddings,
-            acoustic=json.dumps(self.acoustic_features),
+            acoustic=json.dumps(dict(self.acoustic_features)),
             metadata=json.dumps(self.metadata),
             version=self.version
         )
+
+@dataclass
+class SegmentBundle:
+    """Features of several analysis windows of one clip (multi-segment mode)."""
+    acoustic_matrix: np.ndarray  # float32 (n_segments, schema.ACOUSTIC.size)
+    segment_bounds: np.ndarray  # float (n_segments, 2): start/end seconds in the preprocessed clip
+    metadata: Dict[str, Any]
+    version: str = "part1-v1"
+    schema_version: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns JSON-serializable dictionary (segment bounds, not the feature matrix)."""
+        return {
+            "segments": self.segment_bounds.tolist(),
+            "metadata": self.metadata,
+            "version": self.version,
+            "schema_version": self.schema_version,
+            "acoustic_matrix_shape": list(self.acoustic_matrix.shape)
+        }
@@ -6,6 +6,16 @@ MIN_DURATION_SECONDS = 1.0
 MAX_DURATION_SECONDS = 30.0
 MAX_FILE_SIZE_BYTES = 5 * 1024 * 1024  # 5 MB
 
+# Only ANALYSIS_WINDOW_SECONDS of a clip are analysed (speed vs. stability trade-off)
+ANALYSIS_WINDOW_SECONDS = 1.5
+
+# Which window: "energy" picks the most speech-like one in the first WINDOW_SEARCH_SECONDS
+# (see window.py), "first" always takes the start of the clip
+WINDOW_SELECTION = os.getenv("WINDOW_SELECTION", "energy").lower()
+if WINDOW_SELECTION not in ("energy", "first"):
+    raise ValueError(f"WINDOW_SELECTION must be 'energy' or 'first', got {WINDOW_SELECTION!r}")
+WINDOW_SEARCH_SECONDS = float(os.getenv("WINDOW_SEARCH_SECONDS", "10"))
+
 # Paths
 import tempfile
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -16,6 +26,75 @@ TEMP_DIR = tempfile.gettempdir()
 _env_value = os.getenv("USE_DEEP_FEATURES", "false").lower()
 USE_DEEP_FEATURES = _env_value in ("true", "1", "yes")
 
+# wav2vec2 model, and the pre-built artifact load_model prefers (build_deep_artifact.py).
+# DEEP_WEIGHTS=qint8 keeps a dynamic-quantized private copy per worker (~180MB each);
+# DEEP_WEIGHTS=mmap maps fp32 weights read-only from the artifact, so all workers on one
+# host share the same ~360MB of page cache (needs torch>=2.1).
+DEEP_MODEL_NAME = os.getenv("DEEP_MODEL_NAME", "facebook/wav2vec2-base")
+DEEP_WEIGHTS = os.getenv("DEEP_WEIGHTS", "qint8").lower()
+DEEP_ARTIFACT_DIR = os.getenv(
+    "DEEP_ARTIFACT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artifacts", f"wav2vec2-base-{DEEP_WEIGHTS}")
+)
+
+# Truncated depth: run only the first DEEP_NUM_LAYERS transformer layers (0 = all) and pool
+# hidden state DEEP_POOL_LAYER (0 = CNN features after positional conv, k = output of layer k,
+# -1 = last layer run), or, when DEEP_LAYER_WEIGHTS is set ("w1,...,wK"), a weighted mix of
+# the outputs of layers 1..K. eval_deep_depth.py reports latency and AUC per depth.
+DEEP_NUM_LAYERS = int(os.getenv("DEEP_NUM_LAYERS", "0"))
+DEEP_POOL_LAYER = int(os.getenv("DEEP_POOL_LAYER", "-1"))
+DEEP_LAYER_WEIGHTS = [float(w) for w in os.getenv("DEEP_LAYER_WEIGHTS", "").split(",") if w.strip()]
+
+# Clips longer than DEEP_CHUNK_SECONDS are embedded in overlapping chunks with running
+# mean/std pooling (0 disables). DEEP_FULL_CLIP feeds the whole clip (up to
+# MAX_DURATION_SECONDS) to the embeddings while acoustic features keep the analysis window.
+DEEP_CHUNK_SECONDS = float(os.getenv("DEEP_CHUNK_SECONDS", "5"))
+DEEP_CHUNK_OVERLAP_SECONDS = float(os.getenv("DEEP_CHUNK_OVERLAP_SECONDS", "0.5"))
+DEEP_FULL_CLIP = os.getenv("DEEP_FULL_CLIP", "false").lower() in ("true", "1", "yes")
+
+# Group concurrent wav2vec2 calls into one forward pass: at most DEEP_BATCH_MAX_SIZE clips,
+# waiting at most DEEP_BATCH_MAX_WAIT_MS after the first one (see deep_batcher.py)
+DEEP_BATCHING = os.getenv("DEEP_BATCHING", "true").lower() in ("true", "1", "yes")
+DEEP_BATCH_MAX_SIZE = int(os.getenv("DEEP_BATCH_MAX_SIZE", "8"))
+DEEP_BATCH_MAX_WAIT_MS = float(os.getenv("DEEP_BATCH_MAX_WAIT_MS", "5"))
+
+# Decode uploads in memory (no temp files). The file-based pydub path is kept as a fallback.
+IN_MEMORY_DECODE = os.getenv("IN_MEMORY_DECODE", "true").lower() in ("true", "1", "yes")
+
+# Stop decoding once the analysis window is covered; duration comes from the container header
+BOUNDED_DECODE = os.getenv("BOUNDED_DECODE", "true").lower() in ("true", "1", "yes")
+
+# Warm ffmpeg worker pool for formats libsndfile cannot decode in memory
+FFMPEG_POOL_ENABLED = os.getenv("FFMPEG_POOL_ENABLED", "true").lower() in ("true", "1", "yes")
+FFMPEG_POOL_SIZE = int(os.getenv("FFMPEG_POOL_SIZE", "2"))
+FFMPEG_POOL_MAX_QUEUE = int(os.getenv("FFMPEG_POOL_MAX_QUEUE", "8"))
+FFMPEG_JOB_TIMEOUT_SECONDS = float(os.getenv("FFMPEG_JOB_TIMEOUT_SECONDS", "10"))
+
+# Voice-quality backend: "praat" (parselmouth, exact Praat semantics) or "numpy" (faster, batched; see voice.py)
+VOICE_BACKEND = os.getenv("VOICE_BACKEND", "praat").lower()
+if VOICE_BACKEND not in ("praat", "numpy"):
+    raise ValueError(f"VOICE_BACKEND must be 'praat' or 'numpy', got {VOICE_BACKEND!r}")
+
+# Praat stage from one cc pitch track: pitch statistics, jitter/shimmer pulses and HNR all reuse it
+# instead of three periodicity analyses. The values differ from the ac analysis the acoustic-v1
+# models were trained on, so this selects schema acoustic-v2 and needs a model trained with it.
+PRAAT_SHARED_PITCH = os.getenv("PRAAT_SHARED_PITCH", "false").lower() in ("true", "1", "yes")
+
+# Praat runs in killable worker processes with a hard per-clip deadline (zero-filled on timeout)
+VOICE_POOL_ENABLED = os.getenv("VOICE_POOL_ENABLED", "true").lower() in ("true", "1", "yes")
+VOICE_POOL_SIZE = int(os.getenv("VOICE_POOL_SIZE", "2"))
+VOICE_TIMEOUT_SECONDS = float(os.getenv("VOICE_TIMEOUT_SECONDS", "5"))
+
+# Multi-segment mode: up to MAX_SEGMENTS analysis windows per clip, as many as fit in
+# SEGMENT_BUDGET_SECONDS at the observed per-segment cost (seeded with SEGMENT_COST_SECONDS)
+MAX_SEGMENTS = int(os.getenv("MAX_SEGMENTS", "8"))
+SEGMENT_BUDGET_SECONDS = float(os.getenv("SEGMENT_BUDGET_SECONDS", "3"))
+SEGMENT_COST_SECONDS = float(os.getenv("SEGMENT_COST_SECONDS", "0.25"))
+
+# Run the spectral, voice-quality and deep-embedding stages of one request concurrently
+PARALLEL_STAGES = os.getenv("PARALLEL_STAGES", "false").lower() in ("true", "1", "yes")
+STAGE_WORKERS = int(os.getenv("STAGE_WORKERS", "3"))
+
 # Log configuration (safe for production)
 import sys
 sys.stderr.write(f"[part1/config] USE_DEEP_FEATURES={USE_DEEP_FEATURES}\n")
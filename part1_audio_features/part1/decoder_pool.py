@@ -0,0 +1,237 @@
+import atexit
+import collections
+import queue
+import subprocess
+import threading
+import time
+import numpy as np
+from pydub import AudioSegment
+from . import config, metrics, utils
+
+class DecoderError(Exception):
+    pass
+
+class DecoderTimeout(DecoderError):
+    pass
+
+class DecoderPoolFull(DecoderError):
+    pass
+
+class FFmpegDecoderPool:
+    """
+    Keeps pre-spawned ffmpeg processes waiting on stdin so a request never pays
+    for fork/exec and codec start-up on its critical path.
+
+    Each worker decodes one upload fed over its stdin pipe straight to 16kHz
+    mono float32 on stdout (one process instead of pydub's decode + export),
+    then exits; a replacement is spawned in the background. Jobs beyond `size`
+    wait in a queue bounded by `max_queue`; a full queue fails fast. With
+    `max_seconds` the workers stop after that much output (ffmpeg -t), so
+    only the start of a long upload is decoded.
+    """
+
+    def __init__(
+        self,
+        size: int = config.FFMPEG_POOL_SIZE,
+        max_queue: int = config.FFMPEG_POOL_MAX_QUEUE,
+        timeout: float = config.FFMPEG_JOB_TIMEOUT_SECONDS,
+        sample_rate: int = config.SAMPLE_RATE,
+        max_seconds: float | None = None
+    ):
+        self.size = size
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.sample_rate = sample_rate
+        self.max_seconds = max_seconds
+
+        self._idle = queue.Queue()
+        self._running = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._spawn_lock = threading.Lock()  # one _replenish at a time, so the pool never overshoots size
+        self._queued = 0
+        self._closed = False
+        self._latencies = collections.deque(maxlen=256)
+        self._counts = {"decodes": 0, "failures": 0, "timeouts": 0, "restarts": 0}
+
+        metrics.DECODER_POOL_SIZE.inc(size)
+        try:
+            for _ in range(size):
+                self._idle.put(self._spawn())
+        except DecoderError:
+            self.shutdown()
+            raise
+
+    def _command(self) -> list[str]:
+        limit = [] if self.max_seconds is None else ["-t", f"{self.max_seconds:.3f}"]
+        return [
+            AudioSegment.converter, "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            *limit,
+            "-f", "f32le", "-ac", "1", "-ar", str(self.sample_rate),
+            "pipe:1"
+        ]
+
+    def _spawn(self) -> subprocess.Popen:
+        try:
+            return subprocess.Popen(
+                self._command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except OSError as e:
+            # ffmpeg not installed, or no processes / file descriptors left
+            raise DecoderError(f"Could not start ffmpeg: {e}")
+
+    def _replenish(self):
+        """Tops the idle queue back up to `size` warm workers."""
+        with self._spawn_lock:
+            while not self._closed and self._idle.qsize() < self.size:
+                try:
+                    proc = self._spawn()
+                except DecoderError as e:
+                    utils.logger.warning(str(e))
+                    break
+                if self._closed:
+                    self._discard(proc)
+                    break
+                self._idle.put(proc)
+
+    def _checkout(self) -> subprocess.Popen:
+        """Returns a live warm worker, replacing any that died while idle."""
+        while True:
+            try:
+                proc = self._idle.get_nowait()
+            except queue.Empty:
+                return self._spawn()
+            if proc.poll() is None:
+                return proc
+            # Worker crashed while waiting for a job
+            self._discard(proc)
+            with self._lock:
+                self._counts["restarts"] += 1
+            metrics.DECODER_POOL_RESTARTS.inc()
+
+    @staticmethod
+    def _discard(proc: subprocess.Popen):
+        try:
+            proc.kill()
+            proc.communicate(timeout=1.0)
+        except Exception:
+            pass
+
+    def decode(self, data: bytes, timeout: float | None = None) -> np.ndarray:
+        """
+        Decodes encoded audio bytes to a float32 mono waveform at sample_rate.
+        `timeout` covers waiting for a worker and the decode together.
+        Raises DecoderPoolFull, DecoderTimeout or DecoderError.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._lock:
+            if self._closed:
+                raise DecoderError("Decoder pool is shut down")
+            if self._queued >= self.max_queue:
+                raise DecoderPoolFull(f"Decoder queue full ({self.max_queue} jobs waiting)")
+            self._queued += 1
+            metrics.DECODER_POOL_QUEUE_DEPTH.set(self._queued)
+
+        try:
+            acquired = self._running.acquire(timeout=timeout)
+        finally:
+            with self._lock:
+                self._queued -= 1
+                metrics.DECODER_POOL_QUEUE_DEPTH.set(self._queued)
+        if not acquired:
+            raise DecoderTimeout(f"No decoder worker free within {timeout:.1f}s")
+
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DecoderTimeout(f"No decoder worker free within {timeout:.1f}s")
+            proc = self._checkout()
+            threading.Thread(target=self._replenish, daemon=True).start()
+
+            start = time.perf_counter()
+            try:
+                out, err = proc.communicate(input=data, timeout=max(deadline - time.monotonic(), 0.0))
+            except subprocess.TimeoutExpired:
+                self._discard(proc)
+                with self._lock:
+                    self._counts["timeouts"] += 1
+                metrics.DECODER_POOL_TIMEOUTS.inc()
+                raise DecoderTimeout(f"ffmpeg decode exceeded {timeout:.1f}s")
+
+            if proc.returncode != 0:
+                with self._lock:
+                    self._counts["failures"] += 1
+                message = err.decode("utf-8", errors="replace").strip().splitlines()
+                raise DecoderError(message[-1] if message else f"ffmpeg exited with {proc.returncode}")
+
+            latency = time.perf_counter() - start
+            with self._lock:
+                self._counts["decodes"] += 1
+                self._latencies.append(latency)
+            metrics.DECODER_POOL_LATENCY.observe(latency)
+
+            return np.frombuffer(out, dtype="<f4").astype(np.float32)
+        finally:
+            self._running.release()
+
+    def stats(self) -> dict:
+        """Pool size, queue depth, counters and recent per-decode latency."""
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000.0
+            stats = {
+                "size": self.size,
+                "max_seconds": self.max_seconds,
+                "idle": self._idle.qsize(),
+                "queue_depth": self._queued,
+                **self._counts
+            }
+        if len(latencies):
+            stats["latency_ms_p50"] = float(np.percentile(latencies, 50))
+            stats["latency_ms_p95"] = float(np.percentile(latencies, 95))
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        metrics.DECODER_POOL_SIZE.dec(self.size)
+
+_POOLS = {}
+_POOL_ERROR = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool(max_seconds: float | None = None) -> FFmpegDecoderPool:
+    """
+    Returns the process-wide decoder pool whose workers decode at most
+    max_seconds (None: whole uploads), starting it on first use. If a pool
+    could not start, decoding via the pool stays disabled: every call raises
+    DecoderError without trying to spawn ffmpeg again.
+    """
+    global _POOL_ERROR
+    with _POOL_LOCK:
+        if _POOL_ERROR is not None:
+            raise DecoderError(f"Decoder pool disabled: {_POOL_ERROR}")
+        pool = _POOLS.get(max_seconds)
+        if pool is None:
+            try:
+                pool = FFmpegDecoderPool(max_seconds=max_seconds)
+            except DecoderError as e:
+                _POOL_ERROR = str(e)
+                utils.logger.error(f"ffmpeg decoder pool disabled ({e}); decoding falls back to temp files")
+                raise
+            _POOLS[max_seconds] = pool
+            atexit.register(pool.shutdown)
+            limit = "whole clips" if max_seconds is None else f"first {max_seconds:.2f}s"
+            utils.logger.info(f"Started ffmpeg decoder pool ({pool.size} workers, {limit})")
+        return pool
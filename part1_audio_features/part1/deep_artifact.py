@@ -0,0 +1,199 @@
+"""
+Pre-built wav2vec2 artifact.
+
+build() downloads the base model once and saves it in one of two layouts,
+chosen by `weights` (config.DEEP_WEIGHTS), together with the processor
+settings and a manifest:
+
+    qint8: the same dynamic qint8 quantization load_model used to do at every
+           start, as a pickled eval-mode module. Smallest per process, but
+           every worker holds its own copy.
+        <dir>/model.pt          pickled quantized module (no fp32 copy on load)
+
+    mmap:  fp32 weights as a plain state dict plus the model config. load()
+           maps the weights file read-only (copy-on-write, never written at
+           inference) and builds the module around the mapped tensors, so
+           every worker on the host shares the same physical pages. Needs
+           torch>=2.1; older versions get an ArtifactError (and load_model
+           falls back to quantizing at startup).
+        <dir>/weights.pt        state dict, loaded with torch.load(mmap=True)
+        <dir>/config/           model config (save_pretrained)
+
+    <dir>/processor/        processor settings (save_pretrained)
+    <dir>/manifest.json     format, weights, model name, library versions, sha256 of every file
+
+load() refuses an artifact whose checksums do not match or that was built
+for another model name, weights layout, artifact format or torch/transformers
+version, so a stale file is never silently used.
+"""
+import hashlib
+import json
+import os
+from . import config, utils
+
+ARTIFACT_FORMAT = 1
+MANIFEST = "manifest.json"
+MODEL_FILE = "model.pt"
+WEIGHTS_FILE = "weights.pt"
+CONFIG_DIR = "config"
+PROCESSOR_DIR = "processor"
+WEIGHTS = ("qint8", "mmap")
+MMAP_MIN_TORCH = (2, 1)  # torch.load(mmap=True) and load_state_dict(assign=True)
+
+class ArtifactError(Exception):
+    pass
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _files(artifact_dir: str, weights: str) -> list[str]:
+    """Artifact files (relative paths) covered by the manifest checksums."""
+    files = [MODEL_FILE] if weights == "qint8" else [WEIGHTS_FILE]
+    subdirs = [PROCESSOR_DIR] if weights == "qint8" else [CONFIG_DIR, PROCESSOR_DIR]
+    for subdir in subdirs:
+        try:
+            names = sorted(os.listdir(os.path.join(artifact_dir, subdir)))
+        except OSError as e:
+            raise ArtifactError(f"Cannot list artifact directory {subdir}/: {e}")
+        files.extend(os.path.join(subdir, name) for name in names)
+    return files
+
+def _versions() -> dict:
+    import torch
+    import transformers
+    return {"torch": torch.__version__.split("+")[0], "transformers": transformers.__version__}
+
+def _check_mmap_support():
+    """Raises ArtifactError when the installed torch cannot map the weights file."""
+    import torch
+    version = tuple(int(part) for part in torch.__version__.split("+")[0].split(".")[:2])
+    if version < MMAP_MIN_TORCH:
+        raise ArtifactError(
+            f"DEEP_WEIGHTS=mmap needs torch>={'.'.join(map(str, MMAP_MIN_TORCH))}, found {torch.__version__}"
+        )
+
+def quantize(model):
+    """Dynamic qint8 quantization of the Linear layers, in eval mode (~360MB -> ~180MB)."""
+    import torch
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    return model
+
+def build(
+    artifact_dir: str = config.DEEP_ARTIFACT_DIR,
+    model_name: str = config.DEEP_MODEL_NAME,
+    weights: str = config.DEEP_WEIGHTS
+) -> dict:
+    """Builds the artifact in artifact_dir and returns its manifest."""
+    import torch
+    from transformers import Wav2Vec2Processor, Wav2Vec2Model
+
+    if weights not in WEIGHTS:
+        raise ArtifactError(f"Unknown weights layout {weights!r} (expected one of {WEIGHTS})")
+    if weights == "mmap":
+        _check_mmap_support()
+    os.makedirs(artifact_dir, exist_ok=True)
+    processor = Wav2Vec2Processor.from_pretrained(model_name)
+    model = Wav2Vec2Model.from_pretrained(model_name)
+
+    if weights == "qint8":
+        torch.save(quantize(model), os.path.join(artifact_dir, MODEL_FILE))
+    else:
+        state = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+        torch.save(state, os.path.join(artifact_dir, WEIGHTS_FILE))
+        model.config.save_pretrained(os.path.join(artifact_dir, CONFIG_DIR))
+    processor.save_pretrained(os.path.join(artifact_dir, PROCESSOR_DIR))
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "weights": weights,
+        "model_name": model_name,
+        "quantization": "dynamic-qint8-linear" if weights == "qint8" else "none",
+        **_versions(),
+        "sha256": {name: _sha256(os.path.join(artifact_dir, name)) for name in _files(artifact_dir, weights)}
+    }
+    with open(os.path.join(artifact_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def verify(
+    artifact_dir: str = config.DEEP_ARTIFACT_DIR,
+    model_name: str = config.DEEP_MODEL_NAME,
+    weights: str = config.DEEP_WEIGHTS
+) -> dict:
+    """Returns the manifest, or raises ArtifactError if the artifact is missing, stale or corrupted."""
+    manifest_path = os.path.join(artifact_dir, MANIFEST)
+    if not os.path.exists(manifest_path):
+        raise ArtifactError(f"No artifact manifest at {manifest_path}")
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Unreadable artifact manifest {manifest_path}: {e}")
+
+    # Artifacts from before the mmap layout carry no "weights" key and are qint8
+    built = {**manifest, "weights": manifest.get("weights", "qint8")}
+    expected = {"format": ARTIFACT_FORMAT, "weights": weights, "model_name": model_name, **_versions()}
+    stale = {key: (built.get(key), value) for key, value in expected.items() if built.get(key) != value}
+    if stale:
+        raise ArtifactError(f"Stale artifact (built vs. expected): {stale}")
+
+    checksums = manifest.get("sha256", {})
+    if set(checksums) != set(_files(artifact_dir, weights)):
+        raise ArtifactError("Artifact files do not match the manifest")
+    for name, digest in checksums.items():
+        try:
+            actual = _sha256(os.path.join(artifact_dir, name))
+        except OSError as e:
+            raise ArtifactError(f"Cannot read artifact file {name}: {e}")
+        if actual != digest:
+            raise ArtifactError(f"Checksum mismatch for {name}")
+    return manifest
+
+def _load_mapped(artifact_dir: str):
+    """fp32 eval-mode model whose parameters and buffers live in the read-only mapped weights file."""
+    import torch
+    from transformers import Wav2Vec2Config, Wav2Vec2Model
+
+    _check_mmap_support()
+    model_config = Wav2Vec2Config.from_pretrained(os.path.join(artifact_dir, CONFIG_DIR))
+    # Build on the meta device (no allocation), then adopt the mapped tensors as they are
+    with torch.device("meta"):
+        model = Wav2Vec2Model(model_config)
+    state = torch.load(os.path.join(artifact_dir, WEIGHTS_FILE), map_location="cpu", mmap=True, weights_only=True)
+    model.load_state_dict(state, assign=True)
+    unmapped = [name for name, t in [*model.named_parameters(), *model.named_buffers()] if t.is_meta]
+    if unmapped:
+        raise ArtifactError(f"Weights file does not cover {unmapped[:3]}")
+    model.requires_grad_(False)
+    model.eval()
+    return model
+
+def load(
+    artifact_dir: str = config.DEEP_ARTIFACT_DIR,
+    model_name: str = config.DEEP_MODEL_NAME,
+    weights: str = config.DEEP_WEIGHTS
+):
+    """(processor, eval-mode model) from a verified artifact. Raises ArtifactError."""
+    import torch
+    from transformers import Wav2Vec2Processor
+
+    verify(artifact_dir, model_name, weights)
+    processor = Wav2Vec2Processor.from_pretrained(os.path.join(artifact_dir, PROCESSOR_DIR))
+    if weights == "mmap":
+        model = _load_mapped(artifact_dir)
+    else:
+        # The checksums catch a corrupted or partially copied file, not tampering: the
+        # manifest sits next to the module, so model.pt must come from a trusted build
+        model = torch.load(os.path.join(artifact_dir, MODEL_FILE), map_location="cpu", weights_only=False)
+        model.eval()
+    utils.logger.info(f"Loaded {weights} {model_name} from {artifact_dir}")
+    return processor, model
+
+def mapped_path(artifact_dir: str = config.DEEP_ARTIFACT_DIR) -> str:
+    """Path of the memory-mapped weights file (for memory.report)."""
+    return os.path.abspath(os.path.join(artifact_dir, WEIGHTS_FILE))
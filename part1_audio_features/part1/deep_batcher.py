@@ -0,0 +1,86 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+import numpy as np
+from . import config, metrics, utils
+
+class EmbeddingBatcher:
+    """
+    Groups concurrent embedding requests into one embed_fn call.
+
+    Callers block in submit() while a single worker thread collects requests
+    until max_batch are waiting or max_wait_ms has passed since the first one,
+    runs embed_fn over the whole group and hands each caller its own row.
+    Requests at different sample rates are never mixed in one call.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[list, int], np.ndarray],
+        max_batch: int = config.DEEP_BATCH_MAX_SIZE,
+        max_wait_ms: float = config.DEEP_BATCH_MAX_WAIT_MS
+    ):
+        self.embed_fn = embed_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="part1-deep-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, waveform: np.ndarray, sr: int = config.SAMPLE_RATE) -> np.ndarray:
+        """Embedding for one clip, computed in the next batch. Re-raises the batch's exception."""
+        if self._closed:
+            raise RuntimeError("Embedding batcher is shut down")
+        future = Future()
+        self._queue.put((np.asarray(waveform, dtype=np.float32), sr, time.perf_counter(), future))
+        return future.result()
+
+    def _collect(self, first) -> list:
+        """first plus whatever arrives within max_wait, up to max_batch requests."""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # keep the stop signal for _run
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            started = time.perf_counter()
+            for _, _, enqueued, _ in batch:
+                metrics.DEEP_BATCH_QUEUE_WAIT.observe(started - enqueued)
+
+            for sr in {item[1] for item in batch}:
+                group = [item for item in batch if item[1] == sr]
+                metrics.DEEP_BATCH_SIZE.observe(len(group))
+                try:
+                    embeddings = self.embed_fn([item[0] for item in group], sr)
+                except Exception as e:
+                    utils.logger.error(f"Batched embedding of {len(group)} clips failed: {e}")
+                    for *_, future in group:
+                        future.set_exception(e)
+                    continue
+                for row, (*_, future) in zip(embeddings, group):
+                    future.set_result(row)
+
+    def shutdown(self):
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
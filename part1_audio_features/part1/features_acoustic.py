@@ -1,61 +1,164 @@
+import time
 import numpy as np
 import librosa
 import parselmouth
 from parselmouth.praat import call
-from . import config, utils
+from . import config, utils, metrics, spectral, schema, voice_pool, voice as voice_numpy
+
+# Schema positions for the vectorized writes below: (stack, coefficient) order
+_STACK_MEAN_IDX = schema.ACOUSTIC.indices(
+    f"{stack}_mean_{i}" for stack in schema.MFCC_STACKS for i in range(config.N_MFCC))
+_STACK_STD_IDX = schema.ACOUSTIC.indices(
+    f"{stack}_std_{i}" for stack in schema.MFCC_STACKS for i in range(config.N_MFCC))
+_TRACK_MEAN_IDX = schema.ACOUSTIC.indices(f"{track}_mean" for track in schema.SPECTRAL_TRACKS)
+_TRACK_STD_IDX = schema.ACOUSTIC.indices(f"{track}_std" for track in schema.SPECTRAL_TRACKS)
+_VOICE_IDX = schema.ACOUSTIC.indices(schema.VOICE_FEATURES)
 
 def extract_acoustic_features(waveform: np.ndarray, sr: int = config.SAMPLE_RATE) -> dict:
     """
     Extracts interpretable acoustic features: MFCC, Pitch, Jitter, Shimmer, HNR, Spectral stats.
     Returns: dictionary of float values.
     """
+    return schema.ACOUSTIC.to_dict(extract_acoustic_vector(waveform, sr))
+
+def extract_acoustic_vector(waveform: np.ndarray, sr: int = config.SAMPLE_RATE, metadata: dict | None = None) -> np.ndarray:
+    """
+    Same features as extract_acoustic_features, written straight into a
+    float32 vector laid out by schema.ACOUSTIC. Stage flags (e.g.
+    voice_quality_timeout) are recorded in metadata when given.
+    """
+    vector = schema.ACOUSTIC.empty()
+    write_spectral_features(vector, waveform, sr)
+
+    # 3. Voice quality (Praat or NumPy, per config.VOICE_BACKEND)
+    write_voice_features(vector, extract_voice_quality(waveform, sr, metadata))
+
+    return vector
+
+def write_spectral_features(vector: np.ndarray, waveform: np.ndarray, sr: int = config.SAMPLE_RATE):
+    """Fills the MFCC and spectral-track columns of one schema.ACOUSTIC vector in place."""
+    _write_spectral(vector[np.newaxis], np.asarray(waveform)[np.newaxis], sr)
+
+def write_voice_features(vector: np.ndarray, features: dict):
+    """Fills the voice-quality columns of one schema.ACOUSTIC vector from an extract_voice_quality dict."""
+    vector[_VOICE_IDX] = [features[name] for name in schema.VOICE_FEATURES]
+
+def extract_acoustic_batch(waveforms: np.ndarray, lengths=None, sr: int = config.SAMPLE_RATE, voice: bool = True) -> np.ndarray:
+    """
+    Batched extract_acoustic_vector over a (n_clips, n_samples) stack.
+
+    Clips shorter than the stack are zero-padded and given by lengths. The
+    whole stack shares one STFT/MFCC pass; each clip's statistics cover only
+    its own frames, so rows match the single-clip path whatever the mix of
+    lengths. Voice quality is batched too with VOICE_BACKEND=numpy; Praat
+    runs per clip. voice=False leaves those columns zero.
+    Returns float32 array (n_clips, schema.ACOUSTIC.size).
+    """
+    waveforms = np.asarray(waveforms, dtype=np.float32)
+    if waveforms.ndim != 2:
+        raise ValueError(f"Expected a (n_clips, n_samples) stack, got shape {waveforms.shape}")
+    n_clips, n_samples = waveforms.shape
+    lengths = np.full(n_clips, n_samples) if lengths is None else np.asarray(lengths, dtype=np.intp)
+    if lengths.shape != (n_clips,) or (lengths < 1).any() or (lengths > n_samples).any():
+        raise ValueError("lengths must give one length in [1, n_samples] per clip")
+
+    out = np.zeros((n_clips, schema.ACOUSTIC.size), dtype=np.float32)
+    _write_spectral(out, waveforms, sr, lengths)
+
+    if voice and config.VOICE_BACKEND == "numpy":
+        out[:, _VOICE_IDX] = voice_numpy.extract_voice_batch(waveforms, lengths, sr)
+    elif voice:
+        for i in range(n_clips):
+            features = extract_voice_quality(waveforms[i, :lengths[i]], sr)
+            out[i, _VOICE_IDX] = [features[name] for name in schema.VOICE_FEATURES]
+
+    return out
+
+def _write_spectral(out: np.ndarray, waveforms: np.ndarray, sr: int, lengths: np.ndarray | None = None):
+    """
+    Fills the MFCC and spectral-track columns of out (n, F) for zero-padded
+    waveforms (n, T) whose own lengths are given by lengths (default: all T).
+    """
+    n, n_samples = waveforms.shape
+    lengths = np.full(n, n_samples) if lengths is None else lengths
+
+    # --- Spectral Features (one shared STFT, see spectral.py) ---
+    plan = spectral.get_plan(sr, config.N_FFT, config.HOP_LENGTH)
+    n_frames = plan.n_frames(lengths)
+    spec = plan.analyze(waveforms, n_frames)
+    own = np.arange(spec.mfcc.shape[-1]) < n_frames[:, None]  # (n, frames): frames of each clip itself
+
+    # 1. MFCC with delta and delta-delta: (n, 3, n_mfcc, frames) -> one mean/std call each.
+    # Deltas interpolate at the clip's last frames, so they are taken over each clip's own frames.
+    stacks = np.zeros((n, 3) + spec.mfcc.shape[1:], dtype=spec.mfcc.dtype)
+    stacks[:, 0] = spec.mfcc
+    for count in np.unique(n_frames):
+        rows = np.flatnonzero(n_frames == count)
+        mfcc = spec.mfcc[rows, :, :count]
+        stacks[rows, 1, :, :count] = librosa.feature.delta(mfcc)
+        stacks[rows, 2, :, :count] = librosa.feature.delta(mfcc, order=2)
+    mask = own[:, None, None, :]
+    out[:, _STACK_MEAN_IDX] = stacks.mean(axis=-1, where=mask).reshape(n, -1)
+    out[:, _STACK_STD_IDX] = stacks.std(axis=-1, where=mask).reshape(n, -1)
+
+    # 2. Spectral Features. ZCR frames edge-pad the clip, so the padding is
+    # filled with each clip's last sample before framing.
+    last = waveforms[np.arange(n), lengths - 1][:, None]
+    filled = np.where(np.arange(n_samples) < lengths[:, None], waveforms, last)
+    zcr = librosa.feature.zero_crossing_rate(y=filled)[:, 0]
+    tracks = np.stack([spec.centroid, spec.rolloff, spec.flatness, zcr], axis=1)
+    out[:, _TRACK_MEAN_IDX] = tracks.mean(axis=-1, where=own[:, None, :])
+    out[:, _TRACK_STD_IDX] = tracks.std(axis=-1, where=own[:, None, :])
+
+def extract_voice_quality(waveform: np.ndarray, sr: int = config.SAMPLE_RATE, metadata: dict | None = None,
+                          pulses: bool = True) -> dict:
+    """
+    Pitch statistics, jitter, shimmer and HNR via the configured VOICE_BACKEND.
+    With VOICE_POOL_ENABLED, Praat runs in a worker process under a hard
+    deadline; a clip that misses it gets zero-filled features and
+    metadata["voice_quality_timeout"] = True. pulses=False skips the point
+    process and leaves jitter and shimmer NaN.
+    """
+    start = time.perf_counter()
+    if config.VOICE_BACKEND == "numpy":
+        features = voice_numpy.extract_voice_quality(waveform, sr, pulses)
+    elif config.VOICE_POOL_ENABLED:
+        try:
+            features = voice_pool.get_pool().run(waveform, sr, pulses=pulses)
+        except voice_pool.VoiceWorkerError as e:
+            utils.logger.warning(f"Praat voice-quality stage abandoned: {e}")
+            features = dict.fromkeys(schema.VOICE_FEATURES, 0.0)
+            if metadata is not None and isinstance(e, voice_pool.VoiceTimeout):
+                metadata["voice_quality_timeout"] = True
+    else:
+        features = extract_voice_quality_praat(waveform, sr, pulses)
+    metrics.VOICE_QUALITY_LATENCY.labels(backend=config.VOICE_BACKEND).observe(time.perf_counter() - start)
+    return features
+
+def extract_voice_quality_praat(waveform: np.ndarray, sr: int = config.SAMPLE_RATE, pulses: bool = True) -> dict:
+    """
+    Pitch statistics, jitter, shimmer and HNR via Praat (zero-filled on failure).
+
+    With PRAAT_SHARED_PITCH one cross-correlation pitch track feeds all three:
+    the pitch statistics, the point process (Sound + Pitch, so Praat does not
+    track pitch again) and the HNR, which is Harmonicity's per-frame formula
+    applied to the voiced frames' strengths instead of another periodicity pass.
+    """
     features = {}
-    
-    # --- Librosa Features ---
-    
-    # 1. MFCC
-    mfcc = librosa.feature.mfcc(y=waveform, sr=sr, n_mfcc=config.N_MFCC, n_fft=config.N_FFT, hop_length=config.HOP_LENGTH)
-    for i in range(config.N_MFCC):
-        features[f"mfcc_mean_{i}"] = float(np.mean(mfcc[i]))
-        features[f"mfcc_std_{i}"] = float(np.std(mfcc[i]))
-        
-    # Delta and Delta-Delta omitted for brevity/speed unless strictly required, 
-    # but the prompt asked for them: "with delta and delta-delta"
-    # Let's add them.
-    mfcc_delta = librosa.feature.delta(mfcc)
-    mfcc_delta2 = librosa.feature.delta(mfcc, order=2)
-    for i in range(config.N_MFCC):
-        features[f"mfcc_delta_mean_{i}"] = float(np.mean(mfcc_delta[i]))
-        features[f"mfcc_delta_std_{i}"] = float(np.std(mfcc_delta[i]))
-        features[f"mfcc_delta2_mean_{i}"] = float(np.mean(mfcc_delta2[i]))
-        features[f"mfcc_delta2_std_{i}"] = float(np.std(mfcc_delta2[i]))
-
-    # 2. Spectral Features
-    cent = librosa.feature.spectral_centroid(y=waveform, sr=sr)
-    features["spectral_centroid_mean"] = float(np.mean(cent))
-    features["spectral_centroid_std"] = float(np.std(cent))
-    
-    rolloff = librosa.feature.spectral_rolloff(y=waveform, sr=sr)
-    features["spectral_rolloff_mean"] = float(np.mean(rolloff))
-    features["spectral_rolloff_std"] = float(np.std(rolloff))
-    
-    flatness = librosa.feature.spectral_flatness(y=waveform)
-    features["spectral_flatness_mean"] = float(np.mean(flatness))
-    features["spectral_flatness_std"] = float(np.std(flatness))
-    
-    zcr = librosa.feature.zero_crossing_rate(y=waveform)
-    features["zcr_mean"] = float(np.mean(zcr))
-    features["zcr_std"] = float(np.std(zcr))
 
     # --- Parselmouth (Praat) Features ---
     # These are high-CPU. If they fail or take too long, we use fallbacks to prevent timeout.
     try:
-        # Reduced precision for even more speed
         sound = parselmouth.Sound(waveform, sampling_frequency=sr)
-        
-        # Pitch (F0) with optimized range for speed
-        pitch = sound.to_pitch(time_step=0.02, pitch_floor=75.0, pitch_ceiling=500.0)
-        pitch_values = pitch.selected_array['frequency']
+
+        if config.PRAAT_SHARED_PITCH:
+            # Pitch (F0): the single periodicity analysis of this stage (schema acoustic-v2)
+            pitch = sound.to_pitch_cc(time_step=0.02, pitch_floor=75.0, pitch_ceiling=500.0)
+        else:
+            # Pitch (F0), autocorrelation method as the acoustic-v1 models were trained on
+            pitch = sound.to_pitch(time_step=0.02, pitch_floor=75.0, pitch_ceiling=500.0)
+        track = pitch.selected_array
+        pitch_values = track['frequency']
         # Filter 0 (unvoiced) and outliers
         pitch_values_voiced = pitch_values[(pitch_values > 75) & (pitch_values < 500)]
         
@@ -68,16 +171,26 @@ def extract_acoustic_features(waveform: np.ndarray, sr: int = config.SAMPLE_RATE
             features["pitch_std"] = 0.0
             features["voiced_ratio"] = 0.0
 
-        # Jitter (Optimized for speed - using local only)
-        pointProcess = call(sound, "To PointProcess (periodic, cc)", 75, 500)
-        features["jitter_local"] = call(pointProcess, "Get jitter (local)", 0.0, 0.0, 0.0001, 0.02, 1.3)
-        
-        # Shimmer (Optimized for speed)
-        features["shimmer_local"] = call([sound, pointProcess], "Get shimmer (local)", 0, 0, 0.0001, 0.02, 1.3, 1.6)
+        if pulses:
+            # Jitter (local)
+            if config.PRAAT_SHARED_PITCH:
+                pointProcess = call([sound, pitch], "To PointProcess (cc)")
+            else:
+                pointProcess = call(sound, "To PointProcess (periodic, cc)", 75, 500)
+            features["jitter_local"] = call(pointProcess, "Get jitter (local)", 0.0, 0.0, 0.0001, 0.02, 1.3)
+
+            # Shimmer (local) on the same pulses
+            features["shimmer_local"] = call([sound, pointProcess], "Get shimmer (local)", 0, 0, 0.0001, 0.02, 1.3, 1.6)
+        else:
+            features["jitter_local"] = features["shimmer_local"] = float("nan")
         
         # HNR
-        harmonicity = call(sound, "To Harmonicity (cc)", 0.02, 75, 0.1, 1.0)
-        features["hnr"] = call(harmonicity, "Get mean", 0, 0)
+        if config.PRAAT_SHARED_PITCH:
+            # Voiced frames only, as Harmonicity's "Get mean" skips unvoiced ones
+            features["hnr"] = _strength_to_hnr(track['strength'][pitch_values > 0])
+        else:
+            harmonicity = call(sound, "To Harmonicity (cc)", 0.02, 75, 0.1, 1.0)
+            features["hnr"] = call(harmonicity, "Get mean", 0, 0)
         
     except Exception as e:
         utils.logger.warning(f"Praat feature extraction skipped/failed to prevent timeout: {e}")
@@ -89,3 +202,10 @@ def extract_acoustic_features(waveform: np.ndarray, sr: int = config.SAMPLE_RATE
         features["hnr"] = 0.0
         
     return features
+
+def _strength_to_hnr(strength: np.ndarray) -> float:
+    """Mean of Praat's per-frame harmonicity 10*log10(r / (1 - r)), clamped to +-150 dB; NaN if no frames."""
+    if len(strength) == 0:
+        return float("nan")
+    r = np.clip(strength, 1e-15, 1 - 1e-15)
+    return float(np.mean(10 * np.log10(r / (1 - r))))
@@ -1,62 +1,194 @@
+import atexit
+import threading
 import numpy as np
 import logging
-from . import config, utils
+from . import config, utils, deep_batcher, deep_artifact, loading
 
 # Global model cache to avoid reloading on every call
 _PROCESSOR = None
 _MODEL = None
+_BATCHER = None
+_BATCHER_LOCK = threading.Lock()
+
+def _load():
+    """
+    (processor, model): the pre-quantized artifact (deep_artifact) when a valid
+    one exists, otherwise download + quantize as before.
+    """
+    try:
+        processor, model = deep_artifact.load()
+        _check_pooling(truncate_layers(model, config.DEEP_NUM_LAYERS))
+        return processor, model
+    except deep_artifact.ArtifactError as e:
+        utils.logger.warning(f"Not using wav2vec2 artifact ({e}); quantizing {config.DEEP_MODEL_NAME} at startup")
+
+    from transformers import Wav2Vec2Processor, Wav2Vec2Model
+    utils.logger.info("Loading Wav2Vec2 model...")
+    try:
+        # Using facebook/wav2vec2-base-960h or just base which is smaller
+        # Prompt suggested: facebook/wav2vec2-base
+        processor = Wav2Vec2Processor.from_pretrained(config.DEEP_MODEL_NAME)
+        
+        # Apply dynamic quantization to reduce memory footprint (from ~360MB to ~180MB)
+        # This is crucial for running on memory-constrained environments like Render Free tier
+        model = deep_artifact.quantize(Wav2Vec2Model.from_pretrained(config.DEEP_MODEL_NAME))
+        _check_pooling(truncate_layers(model, config.DEEP_NUM_LAYERS))
+        utils.logger.info("Wav2Vec2 model loaded and quantized.")
+        return processor, model
+    except Exception as e:
+        utils.logger.error(f"Failed to load Wav2Vec2 model: {e}")
+        raise e
+
+_LOADER = loading.OnceLoader("wav2vec2", _load)
 
 def load_model():
-    """Loads model lazily."""
+    """
+    Loads model lazily, once per process. Concurrent first callers wait for
+    the single in-flight load (see loading.OnceLoader).
+    """
     global _PROCESSOR, _MODEL
     if _MODEL is None:
-        import torch
-        from transformers import Wav2Vec2Processor, Wav2Vec2Model
-        utils.logger.info("Loading Wav2Vec2 model...")
-        try:
-            # Using facebook/wav2vec2-base-960h or just base which is smaller
-            # Prompt suggested: facebook/wav2vec2-base
-            model_name = "facebook/wav2vec2-base" 
-            _PROCESSOR = Wav2Vec2Processor.from_pretrained(model_name)
-            _MODEL = Wav2Vec2Model.from_pretrained(model_name)
-            
-            # Apply dynamic quantization to reduce memory footprint (from ~360MB to ~180MB)
-            # This is crucial for running on memory-constrained environments like Render Free tier
-            _MODEL = torch.quantization.quantize_dynamic(
-                _MODEL, {torch.nn.Linear}, dtype=torch.qint8
-            )
-            
-            _MODEL.eval()  # Set to eval mode
-            utils.logger.info("Wav2Vec2 model loaded and quantized.")
-        except Exception as e:
-            utils.logger.error(f"Failed to load Wav2Vec2 model: {e}")
-            raise e
+        _PROCESSOR, _MODEL = _LOADER.get()
+
+def load_state() -> dict:
+    """Load state of the wav2vec2 model (pending, loading, ready or failed)."""
+    return _LOADER.status()
+
+def truncate_layers(model, num_layers: int, layers=None):
+    """
+    Keeps only the first num_layers transformer layers of model (0 = all).
+    `layers` is the full layer list to cut from, by default the model's own,
+    so a caller holding the original list can change the depth again later.
+    """
+    layers = model.encoder.layers if layers is None else layers
+    if 0 < num_layers < len(layers):
+        layers = layers[:num_layers]
+    model.encoder.layers = layers
+    model.config.num_hidden_layers = len(layers)
+    return model
+
+def _check_pooling(model):
+    """Rejects a DEEP_POOL_LAYER / DEEP_LAYER_WEIGHTS the (truncated) model cannot provide."""
+    n_layers = len(model.encoder.layers)
+    if config.DEEP_LAYER_WEIGHTS and len(config.DEEP_LAYER_WEIGHTS) != n_layers:
+        raise ValueError(f"DEEP_LAYER_WEIGHTS has {len(config.DEEP_LAYER_WEIGHTS)} weights for {n_layers} layers")
+    if not -1 <= config.DEEP_POOL_LAYER <= n_layers:
+        raise ValueError(f"DEEP_POOL_LAYER={config.DEEP_POOL_LAYER} but only {n_layers} layers are run")
+    if config.DEEP_NUM_LAYERS or config.DEEP_POOL_LAYER != -1 or config.DEEP_LAYER_WEIGHTS:
+        pooled = "weighted mix" if config.DEEP_LAYER_WEIGHTS else f"layer {config.DEEP_POOL_LAYER}"
+        utils.logger.info(f"Wav2Vec2 runs {n_layers} layers, pooling {pooled}")
+
+def _hidden_states(input_values, **model_kwargs):
+    """(Batch, Time, Dim) hidden states to pool, per DEEP_POOL_LAYER / DEEP_LAYER_WEIGHTS."""
+    import torch
+    if not config.DEEP_LAYER_WEIGHTS and config.DEEP_POOL_LAYER == -1:
+        return _MODEL(input_values, **model_kwargs).last_hidden_state
+
+    # hidden_states[0] is the input to the first layer, hidden_states[k] the output of layer k
+    outputs = _MODEL(input_values, output_hidden_states=True, **model_kwargs)
+    if config.DEEP_LAYER_WEIGHTS:
+        weights = torch.tensor(config.DEEP_LAYER_WEIGHTS, dtype=outputs.last_hidden_state.dtype)
+        weights = weights / weights.sum()
+        return torch.einsum("l,lbtd->btd", weights, torch.stack(outputs.hidden_states[1:]))
+    return outputs.hidden_states[config.DEEP_POOL_LAYER]
 
 def extract_deep_embeddings(waveform: np.ndarray, sr: int = config.SAMPLE_RATE) -> np.ndarray:
     """
     Extracts embeddings using Wav2Vec2.
     Returns: 1D numpy array (mean pooled + std pooled), or just mean.
+
+    With DEEP_BATCHING, concurrent calls are grouped by deep_batcher and
+    embedded by extract_deep_embeddings_batch, which gives the same embedding
+    as a call on its own. Clips longer
+    than DEEP_CHUNK_SECONDS go through the chunked path instead.
+
+    For models without an attention mask (wav2vec2-base) the clip is first
+    zero-padded to a whole number of analysis windows (see _pad_to_window),
+    batched or not, so trimmed clips of different lengths can share a pass.
     """
+    if config.DEEP_CHUNK_SECONDS > 0 and len(waveform) > config.DEEP_CHUNK_SECONDS * sr:
+        return extract_deep_embeddings_chunked(waveform, sr)
     load_model()
+    if not _PROCESSOR.feature_extractor.return_attention_mask:
+        waveform = _pad_to_window(waveform, sr)
+    if config.DEEP_BATCHING:
+        return _get_batcher().submit(waveform, sr)
+    return extract_deep_embeddings_batch([waveform], sr)[0]
+
+def _pad_to_window(waveform: np.ndarray, sr: int) -> np.ndarray:
+    """
+    waveform zero-padded to the next multiple of ANALYSIS_WINDOW_SECONDS.
+
+    extract_deep_embeddings_batch only batches equal lengths for models
+    without an attention mask, and silence trimming leaves almost every
+    request a different length. The padding is trailing silence the model
+    sees: it enters the first layer's group norm and the pooled frames, so a
+    short clip's embedding describes the clip plus silence.
+    """
+    window = int(config.ANALYSIS_WINDOW_SECONDS * sr)
+    target = max(1, -(-len(waveform) // window)) * window
+    if len(waveform) == target:
+        return waveform
+    return np.pad(waveform, (0, target - len(waveform)))
+
+def _get_batcher() -> deep_batcher.EmbeddingBatcher:
+    """Returns the process-wide embedding batcher, starting it on first use."""
+    global _BATCHER
+    with _BATCHER_LOCK:
+        if _BATCHER is None:
+            _BATCHER = deep_batcher.EmbeddingBatcher(extract_deep_embeddings_batch)
+            atexit.register(_BATCHER.shutdown)
+        return _BATCHER
+
+def extract_deep_embeddings_batch(waveforms: list, sr: int = config.SAMPLE_RATE) -> np.ndarray:
+    """
+    Embeddings for several clips, each equal to the clip's single-clip
+    embedding. Returns float32 array (n_clips, 1536).
+
+    Models that take an attention mask run all clips in one zero-padded
+    forward pass. wav2vec2-base does not: its first conv layer's group norm
+    spans the whole padded input, so padding would change every frame. For
+    such models only clips of equal length share a forward pass;
+    extract_deep_embeddings pads requests to whole analysis windows for that.
+    """
+    load_model()
+    if _PROCESSOR.feature_extractor.return_attention_mask:
+        return _embed_padded(waveforms, sr)
+
+    lengths = np.array([len(w) for w in waveforms])
+    out = np.empty((len(waveforms), 2 * _MODEL.config.hidden_size), dtype=np.float32)
+    for length in np.unique(lengths):
+        rows = np.flatnonzero(lengths == length)
+        out[rows] = _embed_padded([waveforms[i] for i in rows], sr)
+    return out
+
+def _embed_padded(waveforms: list, sr: int) -> np.ndarray:
+    """One forward pass over the clips zero-padded to the longest; pooling covers each clip's own frames."""
+    import torch
     
     try:
         # Normalize inputs for Wav2Vec2 (it expects raw speech input)
-        # Processor handles padding and normalization
-        inputs = _PROCESSOR(waveform, sampling_rate=sr, return_tensors="pt", padding=True)
+        # Processor handles per-clip normalization and padding
+        inputs = _PROCESSOR(list(waveforms), sampling_rate=sr, return_tensors="pt", padding=True,
+                            return_attention_mask=True)
+        model_kwargs = {}
+        if _PROCESSOR.feature_extractor.return_attention_mask:
+            model_kwargs["attention_mask"] = inputs.attention_mask
         
         with torch.no_grad():
-            outputs = _MODEL(inputs.input_values)
-            
-        # Last hidden state: (Batch, Time, Dim) -> (1, T, 768)
-        hidden_states = outputs.last_hidden_state.squeeze(0).cpu().numpy()
+            # Pooled hidden state: (Batch, Time, Dim) -> (B, T, 768); mask out each clip's padding frames
+            hidden_states = _hidden_states(inputs.input_values, **model_kwargs)
+            frame_lengths = _MODEL._get_feat_extract_output_lengths(inputs.attention_mask.sum(-1))
+            mask = (torch.arange(hidden_states.shape[1])[None, :] < frame_lengths[:, None]).unsqueeze(-1).float()
+            n_frames = mask.sum(1).clamp(min=1.0)
         
-        # Pooling: Mean + Std to capture temporal dynamics
-        # Validated against prompt suggestion: "Mean pooling across time... Or concatenation of mean + std"
-        embedding_mean = np.mean(hidden_states, axis=0)
-        embedding_std = np.std(hidden_states, axis=0)
+            # Pooling: Mean + Std to capture temporal dynamics
+            # Validated against prompt suggestion: "Mean pooling across time... Or concatenation of mean + std"
+            embedding_mean = (hidden_states * mask).sum(1) / n_frames
+            embedding_std = ((((hidden_states - embedding_mean[:, None]) * mask) ** 2).sum(1) / n_frames).sqrt()
         
         # Concatenate: 768 + 768 = 1536 dims
-        final_embedding = np.concatenate([embedding_mean, embedding_std])
+        final_embedding = torch.cat([embedding_mean, embedding_std], dim=-1).cpu().numpy()
         
         return final_embedding.astype(np.float32)
 
@@ -64,3 +196,99 @@ def extract_deep_embeddings(waveform: np.ndarray, sr: int = config.SAMPLE_RATE)
         utils.logger.error(f"Deep embedding extraction failed: {e}")
         # Return zeros or raise? Raising is safer for consistency.
         raise e
+
+class RunningMoments:
+    """Count, mean and sum of squared deviations per dimension, merged chunk by chunk (Chan et al.)."""
+
+    def __init__(self, dim: int):
+        self.count = 0
+        self.mean = np.zeros(dim, dtype=np.float64)
+        self.m2 = np.zeros(dim, dtype=np.float64)
+
+    def update(self, frames: np.ndarray):
+        """Adds a (n_frames, dim) block."""
+        n = len(frames)
+        if n == 0:
+            return
+        frames = frames.astype(np.float64)
+        block_mean = frames.mean(axis=0)
+        block_m2 = ((frames - block_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = block_mean - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += block_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population std, as np.std over all frames would give."""
+        return np.sqrt(self.m2 / max(self.count, 1))
+
+def _receptive_field(model_config) -> tuple[int, int]:
+    """(receptive field, stride) in samples of one output frame of the conv feature encoder."""
+    field, stride = 1, 1
+    for kernel, step in zip(model_config.conv_kernel, model_config.conv_stride):
+        field += (kernel - 1) * stride
+        stride *= step
+    return field, stride
+
+def _chunk_bounds(n_samples: int, chunk: int, overlap: int, min_len: int = 400) -> list[tuple[int, int, int, int]]:
+    """
+    (start, end, own_start, own_end) per chunk. Chunks overlap by `overlap`
+    samples so every frame sees context on both sides; each frame is pooled
+    only in the chunk that owns its centre (the overlap is split down the
+    middle). A last chunk shorter than min_len (the model's receptive field)
+    would yield no frame, so it is merged into the previous chunk.
+    """
+    step = max(chunk - overlap, 1)
+    starts = list(range(0, max(n_samples - overlap, 1), step))
+    spans = []
+    for start in starts:
+        spans.append([start, min(start + chunk, n_samples)])
+        if spans[-1][1] == n_samples:
+            break
+    if len(spans) > 1 and spans[-1][1] - spans[-1][0] < min_len:
+        spans.pop()
+        spans[-1][1] = n_samples
+
+    bounds = []
+    for k, (start, end) in enumerate(spans):
+        own_start = start + overlap // 2 if k > 0 else 0
+        own_end = end - overlap // 2 if k < len(spans) - 1 else n_samples
+        bounds.append((start, end, own_start, own_end))
+    return bounds
+
+def _owned_frames(start: int, n_frames: int, field: int, stride: int, own_start: int, own_end: int) -> np.ndarray:
+    """Mask of a chunk's output frames whose centre falls in its owned range."""
+    centres = start + np.arange(n_frames) * stride + field // 2
+    return (centres >= own_start) & (centres < own_end)
+
+def extract_deep_embeddings_chunked(waveform: np.ndarray, sr: int = config.SAMPLE_RATE) -> np.ndarray:
+    """
+    Same mean + std embedding as extract_deep_embeddings, computed over
+    overlapping DEEP_CHUNK_SECONDS windows with running moments, so peak
+    memory depends on the chunk length, not the clip length. The clip is
+    normalized once as a whole (as the processor would) rather than per chunk.
+    """
+    import torch
+    load_model()
+
+    waveform = np.asarray(waveform, dtype=np.float32)
+    if _PROCESSOR.feature_extractor.do_normalize:
+        waveform = (waveform - waveform.mean()) / np.sqrt(waveform.var() + 1e-7)
+
+    chunk = int(config.DEEP_CHUNK_SECONDS * sr)
+    overlap = int(config.DEEP_CHUNK_OVERLAP_SECONDS * sr)
+    field, stride = _receptive_field(_MODEL.config)  # samples seen by / between output frames
+    moments = RunningMoments(_MODEL.config.hidden_size)
+
+    try:
+        with torch.no_grad():
+            for start, end, own_start, own_end in _chunk_bounds(len(waveform), chunk, overlap, field):
+                hidden = _hidden_states(torch.from_numpy(waveform[start:end])[None])[0].numpy()
+                moments.update(hidden[_owned_frames(start, len(hidden), field, stride, own_start, own_end)])
+    except Exception as e:
+        utils.logger.error(f"Chunked deep embedding extraction failed: {e}")
+        raise e
+
+    return np.concatenate([moments.mean, moments.std]).astype(np.float32)
@@ -2,22 +2,22 @@ import base64
 import binascii
 import os
 import tempfile
+import time
+from io import BytesIO
+import numpy as np
+import librosa
 import soundfile as sf
 from pydub import AudioSegment
-from . import config, utils
+from . import config, utils, decoder_pool, probe, metrics, window
+
+# Containers libsndfile decodes in-process; everything else needs ffmpeg
+_SOUNDFILE_FORMATS = {"wav", "flac", "ogg"} | ({"mp3"} if "MP3" in sf.available_formats() else set())
 
 class ValidationError(Exception):
     pass
 
-def decode_and_validate(audio_base64: str) -> tuple[str, dict]:
-    """
-    Decodes base64 string, saves to temp file, converts to 16kHz mono WAV,
-    and validates constraints.
-    
-    Returns:
-        path_to_wav (str): Path to the converted wav file.
-        metadata (dict): Metadata including hash, duration, etc.
-    """
+def _decode_base64(audio_base64: str) -> bytes:
+    """Decodes the base64 payload and enforces the file size limit."""
     try:
         raw_data = base64.b64decode(audio_base64)
     except binascii.Error as e:
@@ -27,6 +27,171 @@ def decode_and_validate(audio_base64: str) -> tuple[str, dict]:
     if len(raw_data) > config.MAX_FILE_SIZE_BYTES:
         raise ValidationError(f"File too large: {len(raw_data)} bytes (max {config.MAX_FILE_SIZE_BYTES})")
 
+    return raw_data
+
+def _check_duration(duration: float):
+    if not (config.MIN_DURATION_SECONDS <= duration <= config.MAX_DURATION_SECONDS):
+        raise ValidationError(f"Duration {duration:.2f}s out of bounds ({config.MIN_DURATION_SECONDS}-{config.MAX_DURATION_SECONDS}s)")
+
+def _probe_and_check(raw_data: bytes) -> probe.AudioInfo | None:
+    """
+    Validates duration from the container header before any decoding.
+    Returns None (and leaves validation to the decoder) for unprobeable formats.
+    """
+    try:
+        info = probe.probe(raw_data)
+    except probe.ProbeError:
+        return None
+    _check_duration(info.duration)
+    return info
+
+def decode_to_array(audio_base64: str, full: bool = False) -> tuple[np.ndarray, dict]:
+    """
+    Decodes base64 audio entirely in memory into a float32 16kHz mono waveform
+    cut to the analysis window (chosen by window.cut), and validates constraints.
+    full=True keeps the whole clip (multi-segment analysis).
+
+    The container is sniffed from its magic bytes and sent to the cheapest
+    decoder that handles it: libsndfile in-process for WAV/FLAC/Ogg (and MP3
+    when libsndfile was built with it), the warm ffmpeg worker pool for
+    everything else, and finally the file-based pydub/ffmpeg path
+    (decode_and_validate).
+
+    Returns:
+        waveform (np.ndarray): float32 mono samples at config.SAMPLE_RATE.
+        metadata (dict): Metadata including hash, duration, etc.
+    """
+    raw_data = _decode_base64(audio_base64)
+    info = _probe_and_check(raw_data)
+    fmt = probe.sniff_format(raw_data) or "unknown"
+    original_hash = utils.compute_hash(raw_data)
+
+    start = time.perf_counter()
+    y = None
+    if fmt in _SOUNDFILE_FORMATS:
+        try:
+            y, native_sr, duration = _read_soundfile(raw_data, bounded=not full)
+            decoder = "soundfile"
+        except Exception as e:
+            # e.g. a WAV wrapping a codec libsndfile does not implement
+            utils.logger.info(f"soundfile could not decode {fmt} ({e}), using ffmpeg")
+
+    if y is None and config.FFMPEG_POOL_ENABLED:
+        try:
+            # ffmpeg already downmixes and resamples to 16kHz mono; bounded decodes need the
+            # probed duration, since ffmpeg then stops at the end of the search span
+            limit = decode_limit_seconds() if info is not None and not full else None
+            samples = decoder_pool.get_pool(limit).decode(raw_data)
+            y, native_sr = samples.reshape(-1, 1), config.SAMPLE_RATE
+            duration = len(samples) / native_sr if limit is None else info.duration
+            decoder = "ffmpeg_pool"
+        except (decoder_pool.DecoderPoolFull, decoder_pool.DecoderTimeout) as pool_error:
+            raise ValidationError(f"Audio decoding unavailable: {pool_error}")
+        except decoder_pool.DecoderError as pool_error:
+            utils.logger.info(f"Pooled ffmpeg decode failed ({pool_error}), falling back to ffmpeg temp files")
+
+    if y is None:
+        waveform, metadata = _decode_via_file(audio_base64, full)
+        _record_decode(fmt, metadata["decoder"], start)
+        metadata["format"] = fmt
+        return waveform, metadata
+
+    _record_decode(fmt, decoder, start)
+    _check_duration(duration)
+
+    # Downmix, pick the analysis window at the native rate and resample only that span
+    # (a few extra native samples keep the resampler's tail out of the window)
+    y = y.mean(axis=1) if y.shape[1] > 1 else y[:, 0]
+    selection = {}
+    if not full:
+        y = y[:_search_frames(native_sr)]
+        offset, _ = window.cut(y, native_sr, int(np.ceil(config.ANALYSIS_WINDOW_SECONDS * native_sr)), selection)
+        y = y[offset:offset + _window_frames(native_sr)]
+    if native_sr != config.SAMPLE_RATE:
+        y = librosa.resample(y, orig_sr=native_sr, target_sr=config.SAMPLE_RATE)
+    if not full:
+        y = y[:int(config.ANALYSIS_WINDOW_SECONDS * config.SAMPLE_RATE)]
+
+    metadata = {
+        "duration": duration,
+        "sample_rate": config.SAMPLE_RATE,
+        "channels": 1,
+        "original_hash": original_hash,
+        "raw_size": len(raw_data),
+        "decoder": decoder,
+        "format": fmt,
+        "codec": info.codec if info else None,
+        **selection
+    }
+
+    utils.logger.info(f"Processed audio: {original_hash[:8]}... | Duration: {duration:.2f}s")
+    return np.ascontiguousarray(y, dtype=np.float32), metadata
+
+def _record_decode(fmt: str, decoder: str, start: float):
+    """Counts the decode and its latency per (format, decoder) path."""
+    metrics.DECODES_TOTAL.labels(format=fmt, decoder=decoder).inc()
+    metrics.DECODE_LATENCY.labels(format=fmt, decoder=decoder).observe(time.perf_counter() - start)
+
+def decode_limit_seconds() -> float | None:
+    """Seconds a bounded decode covers (window search span plus resampler margin); None without BOUNDED_DECODE."""
+    if not config.BOUNDED_DECODE:
+        return None
+    return round(window.search_seconds() + 0.01, 3)
+
+def _window_frames(sr: int) -> int:
+    """Native-rate frames covering the analysis window plus resampler margin."""
+    return int(np.ceil(config.ANALYSIS_WINDOW_SECONDS * sr)) + sr // 100
+
+def _search_frames(sr: int) -> int:
+    """Native-rate frames the window selection looks at (the analysis window itself with WINDOW_SELECTION=first)."""
+    return int(np.ceil(window.search_seconds() * sr)) + sr // 100
+
+def _read_soundfile(raw_data: bytes, bounded: bool = True) -> tuple[np.ndarray, int, float]:
+    """
+    Decodes with libsndfile from memory. The full clip duration comes from the
+    header frame count; with BOUNDED_DECODE (and bounded) only the span the
+    window selection searches is decoded.
+
+    Returns:
+        samples (np.ndarray): (frames, channels) float32 at the native rate.
+        sample_rate (int): Native sample rate.
+        duration (float): Duration of the whole clip in seconds.
+    """
+    with sf.SoundFile(BytesIO(raw_data)) as f:
+        duration = f.frames / f.samplerate
+        bounded = bounded and config.BOUNDED_DECODE
+        frames = _search_frames(f.samplerate) if bounded else -1
+        y = f.read(frames=frames, dtype="float32", always_2d=True)
+        if not bounded:
+            duration = len(y) / f.samplerate
+        return y, f.samplerate, duration
+
+def _decode_via_file(audio_base64: str, full: bool = False) -> tuple[np.ndarray, dict]:
+    """Runs the temp-file pipeline and reads the converted WAV back into memory."""
+    wav_path, metadata = decode_and_validate(audio_base64, full)
+    try:
+        y, _ = sf.read(wav_path, dtype="float32")
+    finally:
+        if os.path.exists(wav_path):
+            try:
+                os.remove(wav_path)
+            except OSError:
+                pass
+    metadata["decoder"] = "ffmpeg_file"
+    return y, metadata
+
+def decode_and_validate(audio_base64: str, full: bool = False) -> tuple[str, dict]:
+    """
+    Decodes base64 string, saves to temp file, converts to 16kHz mono WAV,
+    and validates constraints. full=True skips the cut to the analysis window.
+    
+    Returns:
+        path_to_wav (str): Path to the converted wav file.
+        metadata (dict): Metadata including hash, duration, etc.
+    """
+    raw_data = _decode_base64(audio_base64)
+    _probe_and_check(raw_data)
+
     # Traceability hash
     original_hash = utils.compute_hash(raw_data)
     
@@ -45,10 +210,16 @@ def decode_and_validate(audio_base64: str) -> tuple[str, dict]:
         audio = AudioSegment.from_file(tmp_mp3_path)
         audio = audio.set_frame_rate(config.SAMPLE_RATE).set_channels(1)
         
-        # Optimization: Slice to first 1500ms (1.5 seconds) for ULTIMATE speed
+        # Optimization: Slice to one 1500ms (1.5 seconds) window for ULTIMATE speed
         # 1.5s is the bare minimum for stable MFCCs and prevents any possible timeout
-        if len(audio) > 1500:
-            audio = audio[:1500]
+        window_ms = int(config.ANALYSIS_WINDOW_SECONDS * 1000)
+        selection = {}
+        if len(audio) > window_ms and not full:
+            audio = audio[:int(window.search_seconds() * 1000)]
+            samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
+            start, _ = window.cut(samples, config.SAMPLE_RATE, int(config.ANALYSIS_WINDOW_SECONDS * config.SAMPLE_RATE), selection)
+            start_ms = start * 1000 // config.SAMPLE_RATE
+            audio = audio[start_ms:start_ms + window_ms]
             
         audio.export(wav_path, format="wav")
     except Exception as e:
@@ -73,16 +244,15 @@ def decode_and_validate(audio_base64: str) -> tuple[str, dict]:
         info = sf.info(wav_path)
         duration = info.duration
         
-        if not (config.MIN_DURATION_SECONDS <= duration <= config.MAX_DURATION_SECONDS):
-            os.remove(wav_path)
-            raise ValidationError(f"Duration {duration:.2f}s out of bounds ({config.MIN_DURATION_SECONDS}-{config.MAX_DURATION_SECONDS}s)")
+        _check_duration(duration)
             
         metadata = {
             "duration": duration,
             "sample_rate": info.samplerate,
             "channels": info.channels,
             "original_hash": original_hash,
-            "raw_size": len(raw_data)
+            "raw_size": len(raw_data),
+            **selection
         }
         
         utils.logger.info(f"Processed audio: {original_hash[:8]}... | Duration: {duration:.2f}s")
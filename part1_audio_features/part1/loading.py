@@ -0,0 +1,77 @@
+"""
+Once-only, single-flight loading of heavy models.
+
+The first caller of OnceLoader.get() runs the load; callers arriving while it
+is in flight block until it finishes and share its result (or its failure)
+instead of starting a second multi-hundred-MB load. After a failure the next
+call retries. The state (pending, loading, ready, failed) is what readiness
+probes report. part2.utils uses the same class for its artifacts.
+"""
+import threading
+import time
+from typing import Any, Callable
+from . import utils
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+class LoadError(RuntimeError):
+    pass
+
+class OnceLoader:
+    def __init__(self, name: str, load_fn: Callable[[], Any]):
+        self.name = name
+        self._load_fn = load_fn
+        self._cond = threading.Condition()
+        self._state = PENDING
+        self._value = None
+        self._error = None
+        self._seconds = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def ready(self) -> bool:
+        return self._state == READY
+
+    def get(self) -> Any:
+        """The loaded value, loading it first if needed. Raises LoadError if the in-flight load it waited on failed."""
+        with self._cond:
+            if self._state == LOADING:
+                while self._state == LOADING:
+                    self._cond.wait()
+                if self._state == FAILED:
+                    raise LoadError(f"{self.name} failed to load: {self._error}")
+            if self._state == READY:
+                return self._value
+            self._state = LOADING
+
+        start = time.perf_counter()
+        try:
+            value = self._load_fn()
+        except BaseException as e:
+            with self._cond:
+                self._state, self._error = FAILED, str(e)
+                self._seconds = time.perf_counter() - start
+                self._cond.notify_all()
+            utils.logger.error(f"Loading {self.name} failed after {self._seconds:.1f}s: {e}")
+            raise
+
+        with self._cond:
+            self._state, self._value, self._error = READY, value, None
+            self._seconds = time.perf_counter() - start
+            self._cond.notify_all()
+        utils.logger.info(f"Loaded {self.name} in {self._seconds:.1f}s")
+        return value
+
+    def status(self) -> dict:
+        with self._cond:
+            return {
+                "state": self._state,
+                "error": self._error,
+                "load_seconds": None if self._seconds is None else round(self._seconds, 2)
+            }
@@ -0,0 +1,59 @@
+"""
+Per-process memory breakdown for sizing the worker count.
+
+On Linux, /proc/self/smaps_rollup splits resident memory into pages only
+this process maps (unique: what each extra worker adds) and pages shared
+with other processes (paid once per host, e.g. the memory-mapped wav2vec2
+weights). PSS charges each shared page 1/N to each of its N users. The
+weights file mapping is reported on its own from /proc/self/smaps.
+Elsewhere report() returns an empty dict.
+"""
+import os
+
+_KB = 1024
+
+def _read_kb(lines) -> dict:
+    """{field: bytes} from "Field:   123 kB" lines."""
+    fields = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "kB":
+            fields[parts[0].rstrip(":")] = fields.get(parts[0].rstrip(":"), 0) + int(parts[1]) * _KB
+    return fields
+
+def _mapping_kb(smaps_path: str, path: str) -> dict:
+    """Summed smaps fields of every mapping of `path`."""
+    lines, inside = [], False
+    with open(smaps_path) as f:
+        for line in f:
+            head = line.split()
+            if head and "-" in head[0] and len(head) >= 5:  # mapping header: addr perms offset dev inode [path]
+                inside = len(head) >= 6 and head[5] == path
+                continue
+            if inside:
+                lines.append(line)
+    return _read_kb(lines)
+
+def _summary(fields: dict) -> dict:
+    unique = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    return {
+        "rss_mb": round(fields.get("Rss", 0) / 2**20, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 2**20, 1),
+        "unique_mb": round(unique / 2**20, 1),
+        "shared_mb": round(shared / 2**20, 1)
+    }
+
+def report(mapped_file: str | None = None) -> dict:
+    """
+    Resident, proportional, unique and shared MB of this process, plus the
+    same for mapped_file's mappings under "mapped_*" keys when given.
+    """
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        return {}
+    with open("/proc/self/smaps_rollup") as f:
+        result = {"pid": os.getpid(), **_summary(_read_kb(f))}
+    if mapped_file:
+        mapped = _summary(_mapping_kb("/proc/self/smaps", os.path.abspath(mapped_file)))
+        result.update({f"mapped_{key}": value for key, value in mapped.items()})
+    return result
@@ -0,0 +1,120 @@
+"""
+Prometheus metrics for the part1 pipeline.
+
+prometheus_client is only installed with the API (part3), which serves the
+default registry on /metrics. Without it every metric below is a no-op.
+"""
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    class _NoopMetric:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def labels(self, *args, **kwargs):
+            return self
+
+        def inc(self, amount: float = 1):
+            pass
+
+        def dec(self, amount: float = 1):
+            pass
+
+        def set(self, value: float):
+            pass
+
+        def observe(self, value: float):
+            pass
+
+    Counter = Gauge = Histogram = _NoopMetric
+
+DECODES_TOTAL = Counter(
+    "part1_decodes_total",
+    "Uploads decoded, by sniffed container format and decoder path",
+    ["format", "decoder"]
+)
+
+DECODE_LATENCY = Histogram(
+    "part1_decode_latency_seconds",
+    "Decode latency by sniffed container format and decoder path",
+    ["format", "decoder"],
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+DECODER_POOL_SIZE = Gauge(
+    "part1_decoder_pool_size",
+    "Number of warm ffmpeg decoder workers"
+)
+
+DECODER_POOL_QUEUE_DEPTH = Gauge(
+    "part1_decoder_pool_queue_depth",
+    "Decode jobs waiting for a free ffmpeg worker"
+)
+
+DECODER_POOL_LATENCY = Histogram(
+    "part1_decoder_pool_latency_seconds",
+    "Time spent decoding one upload in an ffmpeg worker",
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+DECODER_POOL_RESTARTS = Counter(
+    "part1_decoder_pool_restarts_total",
+    "ffmpeg workers replaced after crashing while idle"
+)
+
+DECODER_POOL_TIMEOUTS = Counter(
+    "part1_decoder_pool_timeouts_total",
+    "Decode jobs killed for exceeding the per-job timeout"
+)
+
+VOICE_QUALITY_LATENCY = Histogram(
+    "part1_voice_quality_latency_seconds",
+    "Time spent in the voice-quality stage (pitch, jitter, shimmer, HNR) for one clip",
+    ["backend"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+VOICE_POOL_SIZE = Gauge(
+    "part1_voice_pool_size",
+    "Number of Praat voice-quality worker processes"
+)
+
+VOICE_POOL_TIMEOUTS = Counter(
+    "part1_voice_pool_timeouts_total",
+    "Voice-quality calls that missed their deadline and were zero-filled"
+)
+
+VOICE_POOL_KILLS = Counter(
+    "part1_voice_pool_kills_total",
+    "Voice-quality workers killed for exceeding the per-call deadline"
+)
+
+VOICE_POOL_RESTARTS = Counter(
+    "part1_voice_pool_restarts_total",
+    "Voice-quality workers replaced after crashing while idle"
+)
+
+STAGE_LATENCY = Histogram(
+    "part1_stage_latency_seconds",
+    "Wall time of one feature-extraction stage of a request",
+    ["stage"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+)
+
+WINDOW_SELECTION_LATENCY = Histogram(
+    "part1_window_selection_latency_seconds",
+    "Time spent choosing the analysis window of one clip",
+    buckets=[0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025]
+)
+
+DEEP_BATCH_SIZE = Histogram(
+    "part1_deep_batch_size",
+    "Clips per wav2vec2 forward pass",
+    buckets=[1, 2, 3, 4, 6, 8, 12, 16, 32]
+)
+
+DEEP_BATCH_QUEUE_WAIT = Histogram(
+    "part1_deep_batch_queue_wait_seconds",
+    "Time an embedding request waited for its batch to start",
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0]
+)
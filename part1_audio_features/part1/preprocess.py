@@ -1,41 +1,90 @@
 import numpy as np
 import librosa
+import soundfile as sf
 from . import config, utils
 
+TRIM_TOP_DB = 50
+TARGET_RMS = 0.05
+
 def preprocess_audio(wav_path: str) -> np.ndarray:
     """
     Loads WAV, ensures 16kHz mono, trims silence, and normalizes loudness.
     Returns float32 numpy array.
     """
     try:
-        # Load audio (already converted to 16k mono by io.py, but safe reload)
-        y, sr = librosa.load(wav_path, sr=config.SAMPLE_RATE, mono=True)
-        
-        # 1. Trim Silence
-        # top_db=60 is standard, but we want to be conservative to keep micro-pauses
-        # Prompt says "low amplitude threshold but conservative"
-        y_trimmed, _ = librosa.effects.trim(y, top_db=50) 
-        
-        # 2. Loudness Normalization (RMS)
-        # Target RMS: -23 LUFS approx or simple RMS fixed value.
-        # We will use simple RMS normalization to a target level.
-        target_rms = 0.05  # Experimentally decent value
-        current_rms = np.sqrt(np.mean(y_trimmed**2))
-        
-        if current_rms > 0:
-            scale_factor = target_rms / current_rms
-            y_norm = y_trimmed * scale_factor
-        else:
-            y_norm = y_trimmed
-
-        # 3. Clipping Guard
-        # Clip to -1.0 to 1.0 range
-        y_final = np.clip(y_norm, -1.0, 1.0)
-        
-        # Ensure float32
-        y_final = y_final.astype(np.float32)
-        
-        return y_final
+        # Read as-is: io.py already converted to 16k mono, other rates are resampled below
+        y, sr = sf.read(wav_path, dtype="float32", always_2d=True)
+        y = y.mean(axis=1) if y.shape[1] > 1 else y[:, 0]
+        return preprocess_waveform(y, sr, copy=False)
 
     except Exception as e:
         raise RuntimeError(f"Preprocessing failed for {wav_path}: {e}")
+
+def _trim_bounds(y: np.ndarray, top_db: float = TRIM_TOP_DB, frame_length: int = 2048, hop_length: int = 512) -> tuple[int, int]:
+    """
+    Same bounds as librosa.effects.trim(y, top_db=top_db) (centered RMS frames,
+    reference = loudest frame), computed from per-hop block energies instead of
+    materializing the framed signal. Requires frame_length to be a multiple of
+    2 * hop_length.
+    """
+    n = len(y)
+    full = n // hop_length
+    half = frame_length // 2 // hop_length  # hop blocks on each side of a frame centre
+
+    blocks = y[:full * hop_length].reshape(full, hop_length)
+    tail = y[full * hop_length:]
+    energy = np.zeros(full + 2, dtype=np.float64)
+    energy[1:full + 1] = np.einsum("ij,ij->i", blocks, blocks)
+    energy[full + 1] = np.dot(tail, tail)
+    np.cumsum(energy, out=energy)
+
+    # Frame i (centre i * hop_length) covers blocks [i - half, i + half), zero-padded at the edges
+    frames = np.arange(full + 1)
+    lo = np.clip(frames - half, 0, full + 1)
+    hi = np.clip(frames + half, 0, full + 1)
+    mse = (energy[hi] - energy[lo]) / frame_length
+
+    # power_to_db(mse, ref=np.max) > -top_db, with librosa's amin=1e-10 floor
+    amin = 1e-10
+    threshold = max(amin, mse.max(initial=0.0)) * 10.0 ** (-top_db / 10.0)
+    nonsilent = np.flatnonzero(np.maximum(mse, amin) > threshold)
+    if len(nonsilent) == 0:
+        return 0, 0
+    return int(nonsilent[0] * hop_length), min(n, int((nonsilent[-1] + 1) * hop_length))
+
+def preprocess_waveform(y: np.ndarray, sr: int = config.SAMPLE_RATE, copy: bool = True) -> np.ndarray:
+    """
+    Array-in/array-out variant of preprocess_audio for already decoded audio:
+    resamples to 16kHz only if needed, trims silence, and normalizes loudness.
+
+    Trim, RMS normalization and clipping run as one float32 pass over a view
+    of the trimmed span. With copy=False the caller's float32 buffer is
+    normalized in place and the returned array is a view into it.
+    Returns float32 numpy array.
+    """
+    y = np.asarray(y, dtype=np.float32)
+    if sr != config.SAMPLE_RATE:
+        y = librosa.resample(y, orig_sr=sr, target_sr=config.SAMPLE_RATE)
+        copy = False  # resample already returned a fresh array
+
+    # 1. Trim Silence
+    # top_db=60 is standard, but we want to be conservative to keep micro-pauses
+    # Prompt says "low amplitude threshold but conservative"
+    start, end = _trim_bounds(y)
+    y_trimmed = y[start:end]
+    out = np.empty_like(y_trimmed) if copy else y_trimmed
+
+    # 2. Loudness Normalization (RMS)
+    # We will use simple RMS normalization to a fixed target level.
+    current_rms = np.sqrt(np.dot(y_trimmed, y_trimmed) / len(y_trimmed)) if len(y_trimmed) else 0.0
+
+    if current_rms > 0:
+        np.multiply(y_trimmed, np.float32(TARGET_RMS / current_rms), out=out)
+    elif copy:
+        out[:] = y_trimmed
+
+    # 3. Clipping Guard
+    # Clip to -1.0 to 1.0 range
+    np.clip(out, -1.0, 1.0, out=out)
+
+    return out
@@ -0,0 +1,267 @@
+"""
+Header-only audio probing.
+
+Reads container/stream headers (MP3 frame headers with Xing/Info/VBRI/LAME
+tags, WAV/RIFF, FLAC STREAMINFO, Ogg pages) to get duration, sample rate,
+channels and codec without decoding any audio, so bad uploads can be
+rejected before the expensive stages run.
+"""
+import struct
+from dataclasses import dataclass
+
+class ProbeError(ValueError):
+    pass
+
+@dataclass
+class AudioInfo:
+    codec: str
+    sample_rate: int
+    channels: int
+    duration_us: int  # microseconds
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return self.duration_us / 1e6
+
+def _us(samples: int, sample_rate: int) -> int:
+    return int(round(samples * 1_000_000 / sample_rate))
+
+def _id3v2_size(data: bytes) -> int:
+    """Length of a leading ID3v2 tag (0 if none)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+def sniff_format(data: bytes) -> str | None:
+    """Identifies the container from its magic bytes: 'wav', 'flac', 'ogg', 'mp3' or None."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:4] == b"OggS":
+        return "ogg"
+    offset = _id3v2_size(data)
+    if data[offset:offset + 4] == b"fLaC":
+        return "flac"
+    if _find_mp3_frame(data, offset) is not None:
+        return "mp3"
+    return None
+
+def probe(data: bytes) -> AudioInfo:
+    """Returns AudioInfo for a supported container, raises ProbeError otherwise."""
+    fmt = sniff_format(data)
+    try:
+        if fmt == "wav":
+            return _probe_wav(data)
+        if fmt == "flac":
+            return _probe_flac(data, _id3v2_size(data))
+        if fmt == "ogg":
+            return _probe_ogg(data)
+        if fmt == "mp3":
+            return _probe_mp3(data)
+    except (struct.error, IndexError, ZeroDivisionError) as e:
+        raise ProbeError(f"Truncated or corrupt {fmt} header: {e}")
+    raise ProbeError("Unrecognized audio format")
+
+# --- WAV / RIFF ---
+
+_WAV_CODECS = {1: "pcm", 3: "pcm_float", 6: "alaw", 7: "mulaw"}
+
+def _probe_wav(data: bytes) -> AudioInfo:
+    pos = 12
+    fmt = None
+    while pos + 8 <= len(data):
+        chunk_id, size = data[pos:pos + 4], struct.unpack_from("<I", data, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            tag, channels, sample_rate, byte_rate, block_align = struct.unpack_from("<HHIIH", data, body)
+            if tag == 0xFFFE and size >= 40:
+                # WAVE_FORMAT_EXTENSIBLE: real format tag leads the sub-format GUID
+                tag = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = (_WAV_CODECS.get(tag, f"wav_0x{tag:04x}"), channels, sample_rate, block_align)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ProbeError("WAV data chunk before fmt chunk")
+            codec, channels, sample_rate, block_align = fmt
+            # Streamed WAVs leave the size at 0 or 0xFFFFFFFF; use what we have
+            if size in (0, 0xFFFFFFFF) or body + size > len(data):
+                size = len(data) - body
+            return AudioInfo(codec, sample_rate, channels, _us(size // block_align, sample_rate))
+        pos = body + size + (size & 1)
+    raise ProbeError("WAV without fmt/data chunks")
+
+# --- FLAC ---
+
+def _parse_streaminfo(block: bytes) -> tuple[int, int, int]:
+    """Returns (sample_rate, channels, total_samples) from a STREAMINFO block body."""
+    packed = int.from_bytes(block[10:18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    return sample_rate, channels, total_samples
+
+def _probe_flac(data: bytes, offset: int) -> AudioInfo:
+    block_type = data[offset + 4] & 0x7F
+    if block_type != 0:
+        raise ProbeError("FLAC stream does not start with STREAMINFO")
+    sample_rate, channels, total_samples = _parse_streaminfo(data[offset + 8:offset + 8 + 34])
+    if sample_rate == 0:
+        raise ProbeError("FLAC STREAMINFO has no sample rate")
+    return AudioInfo("flac", sample_rate, channels, _us(total_samples, sample_rate))
+
+# --- Ogg (Vorbis, Opus, FLAC) ---
+
+def _ogg_page(data: bytes, pos: int) -> tuple[int, int, int]:
+    """Returns (granule_position, serial, body_offset) of the page at pos."""
+    granule, serial = struct.unpack_from("<qI", data, pos + 6)
+    n_segments = data[pos + 26]
+    return granule, serial, pos + 27 + n_segments
+
+def _probe_ogg(data: bytes) -> AudioInfo:
+    _, serial, body = _ogg_page(data, 0)
+    packet = data[body:body + 64]
+
+    if packet[:7] == b"\x01vorbis":
+        channels, sample_rate = struct.unpack_from("<BI", packet, 11)
+        codec, granule_rate, pre_skip = "vorbis", sample_rate, 0
+    elif packet[:8] == b"OpusHead":
+        channels, pre_skip, sample_rate = struct.unpack_from("<BHI", packet, 9)
+        # Opus granule positions always count 48kHz samples
+        codec, granule_rate = "opus", 48000
+    elif packet[:5] == b"\x7fFLAC":
+        sample_rate, channels, _ = _parse_streaminfo(packet[17:17 + 34])
+        codec, granule_rate, pre_skip = "flac", sample_rate, 0
+    else:
+        raise ProbeError("Unsupported Ogg codec")
+
+    # Duration is the granule position of the last page of this stream
+    pos = len(data)
+    while True:
+        pos = data.rfind(b"OggS", 0, pos)
+        if pos < 0:
+            raise ProbeError("Ogg stream without a final granule position")
+        granule, page_serial, _ = _ogg_page(data, pos)
+        if page_serial == serial and granule >= 0:
+            break
+
+    return AudioInfo(codec, sample_rate or granule_rate, channels, _us(max(granule - pre_skip, 0), granule_rate))
+
+# --- MP3 ---
+
+_MP3_BITRATES = {
+    # (mpeg1, layer) -> kbps by index
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+@dataclass
+class _FrameHeader:
+    mpeg1: bool
+    layer: int
+    bitrate: int  # bits per second
+    sample_rate: int
+    channels: int
+    length: int  # bytes
+    samples: int  # samples per channel
+
+def _parse_mp3_header(data: bytes, pos: int) -> _FrameHeader | None:
+    if pos + 4 > len(data):
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x3
+    layer = 4 - ((b1 >> 1) & 0x3)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x1
+    channels = 1 if (b3 >> 6) == 3 else 2
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if (layer == 2 or mpeg1) else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+    return _FrameHeader(mpeg1, layer, bitrate, sample_rate, channels, length, samples)
+
+_MP3_SYNC_FRAMES = 3  # consecutive matching frames needed to call a stream MP3
+_MP3_SYNC_SCAN = 4096  # bytes after the ID3 tag searched for the first frame
+
+def _find_mp3_frame(data: bytes, offset: int, limit: int = _MP3_SYNC_SCAN) -> tuple[int, _FrameHeader] | None:
+    """
+    First frame header at/after offset that starts a run of _MP3_SYNC_FRAMES
+    valid headers with the same version, layer, sample rate and channels.
+    A run cut short by the end of the data does not count, so a stray 0xFFE
+    sync in arbitrary bytes is not taken for MP3; None when unsure.
+    """
+    pos = data.find(b"\xff", offset, offset + limit)
+    while 0 <= pos < offset + limit:
+        header = _parse_mp3_header(data, pos)
+        if header is not None and _mp3_run(data, pos, header):
+            return pos, header
+        pos = data.find(b"\xff", pos + 1, offset + limit)
+    return None
+
+def _mp3_run(data: bytes, pos: int, first: _FrameHeader) -> bool:
+    """Whether _MP3_SYNC_FRAMES consistent frames follow each other from pos."""
+    header = first
+    for _ in range(_MP3_SYNC_FRAMES - 1):
+        if header.length < 4:
+            return False
+        pos += header.length
+        header = _parse_mp3_header(data, pos)
+        if header is None or (header.mpeg1, header.layer, header.sample_rate, header.channels) != \
+                (first.mpeg1, first.layer, first.sample_rate, first.channels):
+            return False
+    return True
+
+def _probe_mp3(data: bytes) -> AudioInfo:
+    pos, first = _find_mp3_frame(data, _id3v2_size(data))
+    codec = f"mp{first.layer}"
+
+    # Xing/Info (LAME) tag sits after the side information of the first frame
+    if first.mpeg1:
+        side_info = 17 if first.channels == 1 else 32
+    else:
+        side_info = 9 if first.channels == 1 else 17
+    xing = pos + 4 + side_info
+    tag = data[xing:xing + 4]
+    if tag in (b"Xing", b"Info"):
+        flags = struct.unpack_from(">I", data, xing + 4)[0]
+        if flags & 0x1:
+            frames = struct.unpack_from(">I", data, xing + 8)[0]
+            samples = frames * first.samples
+            lame = xing + 8 + 4 * bool(flags & 0x1) + 4 * bool(flags & 0x2) + 100 * bool(flags & 0x4) + 4 * bool(flags & 0x8)
+            if data[lame:lame + 4] in (b"LAME", b"Lavc", b"Lavf"):
+                # Gapless info (LAME tag, also written by ffmpeg): 12-bit encoder delay and padding
+                delay_padding = int.from_bytes(data[lame + 21:lame + 24], "big")
+                samples -= (delay_padding >> 12) + (delay_padding & 0xFFF)
+            return AudioInfo(codec, first.sample_rate, first.channels, _us(max(samples, 0), first.sample_rate))
+
+    # VBRI (Fraunhofer) tag sits 32 bytes after the first header
+    vbri = pos + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        frames = struct.unpack_from(">I", data, vbri + 14)[0]
+        return AudioInfo(codec, first.sample_rate, first.channels, _us(frames * first.samples, first.sample_rate))
+
+    # No tag: walk the frame headers and count samples
+    samples = 0
+    header = first
+    while header is not None:
+        samples += header.samples
+        pos += header.length
+        header = _parse_mp3_header(data, pos)
+    return AudioInfo(codec, first.sample_rate, first.channels, _us(samples, first.sample_rate))
@@ -0,0 +1,64 @@
+"""
+Feature registry: the intermediate analyses each output feature depends on.
+
+extract_features(features=...) computes only the dependency closure of the
+requested names and skips every stage outside it. Skipped acoustic columns
+are NaN in the bundle so they can never pass for measured values.
+
+    stft           shared STFT/MFCC plan (spectral.py): MFCC stacks, spectral tracks, zcr
+    pitch          the voice-quality pitch track: pitch stats, voiced ratio, HNR
+    point_process  glottal pulses on that track: jitter, shimmer
+    embeddings     wav2vec2: deep_embeddings
+"""
+import functools
+from typing import Iterable
+from . import schema
+
+DEEP_EMBEDDINGS = "deep_embeddings"
+
+# Analysis -> analyses it is built on
+ANALYSES = {
+    "stft": (),
+    "pitch": (),
+    "point_process": ("pitch",),
+    "embeddings": (),
+}
+
+# Features part2.explain reads; requested on top of the model's inputs when an explanation is wanted
+EXPLANATION_FEATURES = ("jitter_local", "pitch_std", "hnr")
+
+def _feature_dependencies() -> dict[str, tuple[str, ...]]:
+    deps = {name: ("stft",) for name in schema.ACOUSTIC.names}
+    deps.update({name: ("pitch",) for name in ("pitch_mean", "pitch_std", "voiced_ratio", "hnr")})
+    deps.update({name: ("point_process",) for name in ("jitter_local", "shimmer_local")})
+    deps[DEEP_EMBEDDINGS] = ("embeddings",)
+    return deps
+
+FEATURES = _feature_dependencies()
+
+def resolve(features: Iterable[str]) -> frozenset[str]:
+    """
+    Analyses needed for the given feature names (closed under ANALYSES).
+    Raises KeyError on unknown names. Results are cached per feature set, so
+    a server requesting the same set on every call resolves it once.
+    """
+    return _resolve(frozenset(features))
+
+@functools.lru_cache(maxsize=64)
+def _resolve(features: frozenset[str]) -> frozenset[str]:
+    unknown = sorted(set(features) - set(FEATURES))
+    if unknown:
+        raise KeyError(f"Unknown features: {unknown}")
+    needed = set()
+    pending = [dep for name in features for dep in FEATURES[name]]
+    while pending:
+        analysis = pending.pop()
+        if analysis not in needed:
+            needed.add(analysis)
+            pending.extend(ANALYSES[analysis])
+    return frozenset(needed)
+
+def provided(analyses: Iterable[str]) -> frozenset[str]:
+    """Feature names fully computed by the given analyses."""
+    analyses = set(analyses)
+    return frozenset(name for name, deps in FEATURES.items() if analyses.issuperset(deps))
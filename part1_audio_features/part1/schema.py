@@ -0,0 +1,84 @@
+"""
+Versioned, fixed-order layout of the acoustic feature vector.
+
+Extraction writes straight into a float32 array in this order, and part2
+feeds that array to the model without rebuilding it from a dict. The order is
+the sorted feature names, i.e. exactly what sorted(acoustic_features.keys())
+produced for the models trained so far. Bump SCHEMA_VERSION whenever the set
+or order of features, or what a feature measures, changes.
+"""
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+import numpy as np
+from . import config
+
+# acoustic-v2: same layout, voice features from the shared Praat pitch track (config.PRAAT_SHARED_PITCH)
+SCHEMA_VERSION = "acoustic-v2" if config.PRAAT_SHARED_PITCH else "acoustic-v1"
+
+MFCC_STACKS = ("mfcc", "mfcc_delta", "mfcc_delta2")
+SPECTRAL_TRACKS = ("spectral_centroid", "spectral_rolloff", "spectral_flatness", "zcr")
+VOICE_FEATURES = ("pitch_mean", "pitch_std", "voiced_ratio", "jitter_local", "shimmer_local", "hnr")
+
+class FeatureSchema:
+    def __init__(self, names: Iterable[str], version: str):
+        self.names = tuple(names)
+        self.version = version
+        self.index = {name: i for i, name in enumerate(self.names)}
+        if len(self.index) != len(self.names):
+            raise ValueError("Duplicate feature names in schema")
+
+    @property
+    def size(self) -> int:
+        return len(self.names)
+
+    def indices(self, names: Iterable[str]) -> np.ndarray:
+        """Positions of the given features, for vectorized writes/reads."""
+        return np.array([self.index[name] for name in names], dtype=np.intp)
+
+    def empty(self) -> np.ndarray:
+        return np.zeros(self.size, dtype=np.float32)
+
+    def view(self, vector: np.ndarray) -> "FeatureView":
+        """Read-only name -> float mapping over a vector (no dict is built)."""
+        return FeatureView(self, vector)
+
+    def to_dict(self, vector: np.ndarray) -> dict[str, float]:
+        return dict(zip(self.names, vector.tolist()))
+
+    def from_dict(self, features: Mapping) -> np.ndarray:
+        """Schema-ordered float32 vector from a name -> value mapping."""
+        missing = set(self.names) - set(features)
+        if missing:
+            raise KeyError(f"Features missing for schema {self.version}: {sorted(missing)}")
+        return np.array([features[name] for name in self.names], dtype=np.float32)
+
+class FeatureView(Mapping):
+    """Dict-like access to a schema-ordered feature vector (for explanations and JSON)."""
+
+    def __init__(self, schema: FeatureSchema, vector: np.ndarray):
+        self.schema = schema
+        self.vector = vector
+
+    def __getitem__(self, name: str) -> float:
+        return float(self.vector[self.schema.index[name]])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.schema.names)
+
+    def __len__(self) -> int:
+        return self.schema.size
+
+    def __repr__(self) -> str:
+        return f"FeatureView({self.schema.version}, {self.schema.size} features)"
+
+def _acoustic_names() -> list[str]:
+    names = []
+    for stack in MFCC_STACKS:
+        for stat in ("mean", "std"):
+            names += [f"{stack}_{stat}_{i}" for i in range(config.N_MFCC)]
+    for track in SPECTRAL_TRACKS:
+        names += [f"{track}_mean", f"{track}_std"]
+    names += list(VOICE_FEATURES)
+    return sorted(names)
+
+ACOUSTIC = FeatureSchema(_acoustic_names(), SCHEMA_VERSION)
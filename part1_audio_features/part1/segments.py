@@ -0,0 +1,97 @@
+"""
+Multi-segment analysis: features for several analysis windows of one clip.
+
+The preprocessed clip is cut into non-overlapping ANALYSIS_WINDOW_SECONDS
+windows spread evenly over its length, and all of them go through the
+batched acoustic extractor in one call. How many windows fit is decided per
+request from the time left in the latency budget and a running estimate of
+the cost of one window, so long clips degrade to fewer segments instead of
+missing the SLA.
+"""
+import threading
+import time
+import numpy as np
+from . import config, io, preprocess, features_acoustic, bundle, schema, utils
+
+_COST_SMOOTHING = 0.2
+
+class _CostEstimate:
+    """Exponentially smoothed seconds per segment, shared across requests."""
+
+    def __init__(self, initial: float):
+        self._value = initial
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return self._value
+
+    def update(self, seconds_per_segment: float):
+        with self._lock:
+            self._value += _COST_SMOOTHING * (seconds_per_segment - self._value)
+
+SEGMENT_COST = _CostEstimate(config.SEGMENT_COST_SECONDS)
+
+def plan_segments(n_samples: int, length: int, max_segments: int) -> np.ndarray:
+    """
+    Start samples of up to max_segments non-overlapping length-sample windows
+    spread evenly over n_samples. A clip shorter than one window gives [0].
+    """
+    if n_samples <= length:
+        return np.zeros(1, dtype=np.intp)
+    n = max(min(max_segments, n_samples // length), 1)
+    return np.linspace(0, n_samples - length, n).astype(np.intp)
+
+def segment_budget(remaining_seconds: float) -> int:
+    """Segments that fit in the remaining budget at the current cost estimate (at least 1)."""
+    fit = int(remaining_seconds / max(SEGMENT_COST.value, 1e-3))
+    return max(min(fit, config.MAX_SEGMENTS), 1)
+
+def extract_segments(
+    audio_base64: str,
+    language_hint: str | None = None,
+    budget_seconds: float | None = None,
+    max_segments: int | None = None
+) -> bundle.SegmentBundle:
+    """
+    Decodes the whole clip, preprocesses it once and extracts acoustic
+    features for as many analysis windows as the latency budget allows.
+    """
+    start = time.perf_counter()
+    budget_seconds = config.SEGMENT_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+
+    raw_waveform, metadata = io.decode_to_array(audio_base64, full=True)
+    waveform = preprocess.preprocess_waveform(raw_waveform, sr=config.SAMPLE_RATE, copy=False)
+
+    length = int(config.ANALYSIS_WINDOW_SECONDS * config.SAMPLE_RATE)
+    n_allowed = segment_budget(budget_seconds - (time.perf_counter() - start))
+    if max_segments is not None:
+        n_allowed = max(min(n_allowed, max_segments), 1)
+    starts = plan_segments(len(waveform), length, n_allowed)
+
+    # Equal-length windows (the last one zero-padded if the clip is short) -> one batched pass
+    stack = np.zeros((len(starts), length), dtype=np.float32)
+    lengths = np.empty(len(starts), dtype=np.intp)
+    for i, s in enumerate(starts):
+        piece = waveform[s:s + length]
+        stack[i, :len(piece)] = piece
+        lengths[i] = max(len(piece), 1)
+
+    extract_start = time.perf_counter()
+    matrix = features_acoustic.extract_acoustic_batch(stack, lengths, sr=config.SAMPLE_RATE)
+    SEGMENT_COST.update((time.perf_counter() - extract_start) / len(starts))
+
+    bounds = np.stack([starts, starts + lengths], axis=1) / config.SAMPLE_RATE
+    metadata["segments"] = len(starts)
+    metadata["segment_budget_seconds"] = budget_seconds
+    metadata["segment_extraction_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+    utils.logger.info(f"Extracted {len(starts)} segments in {metadata['segment_extraction_ms']:.0f} ms")
+
+    return bundle.SegmentBundle(
+        acoustic_matrix=matrix,
+        segment_bounds=bounds,
+        metadata=metadata,
+        version=config.BUNDLE_VERSION,
+        schema_version=schema.ACOUSTIC.version
+    )
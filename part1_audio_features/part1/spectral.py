@@ -0,0 +1,102 @@
+"""
+Shared STFT feature plan.
+
+One magnitude spectrogram per waveform feeds MFCCs, spectral centroid,
+rolloff and flatness, instead of librosa recomputing the STFT for each
+feature. The window, mel filterbank, DCT matrix and FFT bin frequencies are
+built once per (sr, n_fft, hop_length) and cached.
+
+Outputs follow librosa's defaults (hann window, centered zero-padded frames,
+128 Slaney mel bands, power_to_db with ref=1.0/amin=1e-10/top_db=80,
+orthonormal DCT-II, roll_percent=0.85). Against librosa.feature.* they agree
+within 2e-3 absolute on MFCCs (dB-scale coefficients, mostly 1-1000 in
+magnitude) and 1e-4 relative on centroid and flatness. Rolloff may move by
+one FFT bin (sr / n_fft Hz) on frames that sit exactly on the 85% energy
+threshold. tests/test_spectral.py pins these tolerances.
+
+Zero padding is librosa's pad_mode="constant" default from 0.10 on, hence
+the librosa>=0.10 requirement; 0.9 padded with "reflect", which changes the
+first and last frames of every clip.
+"""
+import functools
+from dataclasses import dataclass
+import numpy as np
+import librosa
+import scipy.fft
+from . import config
+
+AMIN = 1e-10
+TOP_DB = 80.0
+ROLL_PERCENT = 0.85
+N_MELS = 128
+
+@dataclass
+class SpectralFeatures:
+    mfcc: np.ndarray  # (..., n_mfcc, n_frames)
+    centroid: np.ndarray  # (..., n_frames)
+    rolloff: np.ndarray  # (..., n_frames)
+    flatness: np.ndarray  # (..., n_frames)
+
+class FeaturePlan:
+    """Precomputed analysis matrices for one (sr, n_fft, hop_length)."""
+
+    def __init__(self, sr: int, n_fft: int, hop_length: int, n_mfcc: int = config.N_MFCC, n_mels: int = N_MELS):
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mfcc = n_mfcc
+
+        self.window = librosa.filters.get_window("hann", n_fft, fftbins=True).astype(np.float32)
+        self.mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels).astype(np.float32)
+        # Row k of the orthonormal DCT-II matrix, truncated to the kept coefficients
+        self.dct = scipy.fft.dct(np.eye(n_mels), type=2, norm="ortho", axis=0)[:n_mfcc].astype(np.float32)
+        self.freqs = librosa.fft_frequencies(sr=sr, n_fft=n_fft)
+
+    def magnitude(self, y: np.ndarray) -> np.ndarray:
+        """|STFT| of a waveform (..., n_samples), shape (..., 1 + n_fft // 2, n_frames)."""
+        y = np.asarray(y, dtype=np.float32)
+        pad = [(0, 0)] * (y.ndim - 1) + [(self.n_fft // 2, self.n_fft // 2)]
+        frames = np.lib.stride_tricks.sliding_window_view(np.pad(y, pad), self.n_fft, axis=-1)[..., ::self.hop_length, :]
+        return np.abs(np.fft.rfft(frames * self.window, axis=-1)).swapaxes(-1, -2)
+
+    def n_frames(self, n_samples) -> np.ndarray:
+        """Frames of a clip of n_samples (centered framing)."""
+        return 1 + np.asarray(n_samples) // self.hop_length
+
+    def analyze(self, y: np.ndarray, n_frames=None) -> SpectralFeatures:
+        """
+        All spectral features of a waveform from a single STFT. y may carry
+        leading batch dimensions; outputs keep them. For a zero-padded stack,
+        n_frames (one per clip, see n_frames()) limits each clip's top_db
+        reference to its own frames, so those frames match the unpadded clip.
+        """
+        S = self.magnitude(y)
+        power = np.square(S)
+
+        # MFCC: log-mel power (dB, ref=1.0, clipped to top_db below each clip's peak) -> DCT-II
+        log_mel = 10.0 * np.log10(np.maximum(self.mel_basis @ power, AMIN))
+        own = log_mel
+        if n_frames is not None:
+            own = np.where(np.arange(log_mel.shape[-1]) < np.asarray(n_frames)[..., None, None], log_mel, -np.inf)
+        np.maximum(log_mel, own.max(axis=(-2, -1), keepdims=True) - TOP_DB, out=log_mel)
+        mfcc = self.dct @ log_mel
+
+        # Centroid: magnitude-weighted mean frequency (silent frames -> 0)
+        total = S.sum(axis=-2)
+        centroid = np.divide(self.freqs @ S, total, out=np.zeros(total.shape), where=total > np.finfo(S.dtype).tiny)
+
+        # Rolloff: lowest bin whose cumulative magnitude reaches ROLL_PERCENT of the total
+        cumulative = np.cumsum(S, axis=-2)
+        below = (cumulative < ROLL_PERCENT * cumulative[..., -1:, :]).sum(axis=-2)
+        rolloff = self.freqs[np.minimum(below, len(self.freqs) - 1)]
+
+        # Flatness: geometric / arithmetic mean of the thresholded power spectrum
+        power_floor = np.maximum(power, AMIN)
+        flatness = np.exp(np.mean(np.log(power_floor), axis=-2)) / np.mean(power_floor, axis=-2)
+
+        return SpectralFeatures(mfcc=mfcc, centroid=centroid, rolloff=rolloff, flatness=flatness)
+
+@functools.lru_cache(maxsize=8)
+def get_plan(sr: int = config.SAMPLE_RATE, n_fft: int = config.N_FFT, hop_length: int = config.HOP_LENGTH) -> FeaturePlan:
+    """Returns the cached FeaturePlan for these analysis parameters."""
+    return FeaturePlan(sr, n_fft, hop_length)
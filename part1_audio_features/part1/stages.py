@@ -0,0 +1,54 @@
+"""
+Runs the independent feature stages of one request (spectral features, voice
+quality, deep embeddings) either one after another or concurrently on a
+shared thread pool (PARALLEL_STAGES). The stages only read the waveform and
+write disjoint outputs; librosa/NumPy and torch release the GIL in their hot
+loops and Praat runs in worker processes, so threads overlap well.
+"""
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from . import config, metrics
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """Returns the process-wide stage executor, starting it on first use."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=config.STAGE_WORKERS, thread_name_prefix="part1-stage")
+            atexit.register(_EXECUTOR.shutdown, wait=False)
+        return _EXECUTOR
+
+def _timed(name: str, fn: Callable[[], Any], timings: dict) -> Any:
+    start = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        timings[name] = round(elapsed * 1000.0, 2)
+        metrics.STAGE_LATENCY.labels(stage=name).observe(elapsed)
+
+def run_stages(stages: dict[str, Callable[[], Any]], parallel: bool | None = None) -> tuple[dict, dict]:
+    """
+    Runs each zero-argument stage and returns (results, timings_ms), both
+    keyed by stage name. Any stage exception is re-raised after all stages
+    have finished.
+    """
+    parallel = config.PARALLEL_STAGES if parallel is None else parallel
+    timings = {}
+    if not parallel or len(stages) < 2:
+        return {name: _timed(name, fn, timings) for name, fn in stages.items()}, timings
+
+    executor = get_executor()
+    futures = {name: executor.submit(_timed, name, fn, timings) for name, fn in stages.items()}
+    # Wait for every stage before raising so none keeps writing into shared outputs
+    errors = [f.exception() for f in futures.values()]
+    for error in errors:
+        if error is not None:
+            raise error
+    return {name: f.result() for name, f in futures.items()}, timings
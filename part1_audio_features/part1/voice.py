@@ -0,0 +1,315 @@
+"""
+NumPy voice-quality backend (VOICE_BACKEND=numpy).
+
+Computes the same six features as the Praat block in features_acoustic
+(pitch_mean, pitch_std, voiced_ratio, jitter_local, shimmer_local, hnr) with
+the same analysis settings, but without parselmouth:
+
+- Pitch: Boersma-style windowed autocorrelation (3 periods of the pitch
+  floor per frame, 20 ms step), normalized by the window's own
+  autocorrelation. The best N_CANDIDATES peaks per frame, with Praat's
+  octave cost, feed a Viterbi path search with Praat's octave-jump and
+  voiced/unvoiced costs and its voicing/silence thresholds
+  (_track_pitch). Frames of all clips in a batch go through one FFT.
+- Pulses: inside each voiced run, the first pulse is the largest excursion
+  of the first period; each next one is the shift 0.8-1.2 local periods on
+  whose one-period window best cross-correlates with the current pulse's
+  (_pulses), close to Praat's "To PointProcess (periodic, cc)".
+- Jitter/shimmer (local): Praat's formulas and period/amplitude limits on
+  those pulses. Amplitudes are parabolically refined peak heights, not
+  Praat's interpolated peak search.
+- HNR: 10*log10(r / (1 - r)) of a one-period cross-correlation at the
+  tracked lag, averaged over non-silent frames like Praat's Harmonicity
+  "Get mean".
+
+Measured against the Praat path with voice_parity.py on the 47 temp_audio
+WAVs (1.5 s window), median / p90 absolute difference:
+
+    pitch_mean    0.005 / 5.3 Hz      voiced_ratio  0 / 0.049
+    pitch_std     0.003 / 18.9 Hz     hnr           1.7 / 23 dB
+    jitter_local  0.0012 / 0.011      shimmer_local 0.0033 / 0.023
+
+Pitch statistics and HNR agree closely on steadily voiced input
+(tests/test_voice.py pins them to Praat on synthetic voices). Jitter and
+shimmer only agree in magnitude: the pulse placement differs, and shimmer
+reads about 2-3.5x Praat on clean voices. The p90 HNR error comes from
+noise-free tones, where Praat reports ~75 dB and the r clip here caps HNR
+near 50-60 dB. The p90 pitch_std error comes from noisy clips, where some
+frames keep a wrong candidate that Praat's path avoids (std 24-36 Hz vs
+8 Hz). Models trained on Praat features should not be served with this
+backend without checking those columns.
+"""
+import numpy as np
+import scipy.fft
+from . import config, schema
+
+PITCH_FLOOR = 75.0
+PITCH_CEILING = 500.0
+TIME_STEP = 0.02
+OCTAVE_COST = 0.01
+OCTAVE_JUMP_COST = 0.35
+VOICED_UNVOICED_COST = 0.14
+N_CANDIDATES = 4
+LAG_TOLERANCE = 0.1  # HNR searches this fraction around the tracked period
+VOICING_THRESHOLD = 0.45
+SILENCE_THRESHOLD = 0.03
+HNR_SILENCE_THRESHOLD = 0.1
+# Jitter/shimmer limits, as passed to Praat in features_acoustic
+PERIOD_FLOOR = 0.0001
+PERIOD_CEILING = 0.02
+MAX_PERIOD_FACTOR = 1.3
+MAX_AMPLITUDE_FACTOR = 1.6
+
+FEATURES = schema.VOICE_FEATURES
+
+def extract_voice_quality(waveform: np.ndarray, sr: int = config.SAMPLE_RATE, pulses: bool = True) -> dict:
+    """Single-clip wrapper around extract_voice_batch; same keys as the Praat path."""
+    waveform = np.asarray(waveform, dtype=np.float32)
+    row = extract_voice_batch(waveform[np.newaxis], [len(waveform)], sr, pulses)[0]
+    return dict(zip(FEATURES, row.tolist()))
+
+def extract_voice_batch(waveforms: np.ndarray, lengths=None, sr: int = config.SAMPLE_RATE, pulses: bool = True) -> np.ndarray:
+    """
+    Voice-quality features for a zero-padded (n_clips, n_samples) stack.
+    Returns float64 array (n_clips, 6) in FEATURES order. Like Praat, jitter
+    and shimmer are NaN when a clip has no usable consecutive periods, and
+    hnr is NaN when every frame is silent. pulses=False skips pulse picking
+    and leaves jitter and shimmer NaN.
+    """
+    waveforms = np.asarray(waveforms, dtype=np.float32)
+    n_clips, n_samples = waveforms.shape
+    lengths = np.full(n_clips, n_samples) if lengths is None else np.asarray(lengths, dtype=np.intp)
+
+    window = int(round(3 * sr / PITCH_FLOOR))
+    hop = int(round(TIME_STEP * sr))
+    min_lag = int(np.floor(sr / PITCH_CEILING))
+    max_lag = int(np.ceil(sr / PITCH_FLOOR))
+
+    out = np.zeros((n_clips, len(FEATURES)))
+    if n_samples < window:
+        out[:, 3:] = np.nan
+        return out
+
+    # --- Frame-level correlation over the whole batch ---
+    frames = np.lib.stride_tricks.sliding_window_view(waveforms, window, axis=-1)[:, ::hop]  # (n, F, W)
+    valid = np.arange(frames.shape[1]) * hop + window <= lengths[:, np.newaxis]  # (n, F)
+    centred = frames - frames.mean(axis=-1, keepdims=True)
+    strength, lag = _correlation_candidates(centred, sr, min_lag, max_lag)
+
+    frame_peak = np.abs(centred).max(axis=-1)
+    global_peak = np.where(valid, frame_peak, 0.0).max(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.nan_to_num(frame_peak / global_peak)
+    path_lag = _track_pitch(strength, lag, relative)
+    with np.errstate(divide="ignore"):
+        f0 = sr / path_lag
+    voiced = valid & (f0 > PITCH_FLOOR) & (f0 < PITCH_CEILING)
+
+    # HNR: one-period cross-correlation at the tracked (or best) lag of each non-silent frame
+    hnr_lag = np.where(np.isfinite(path_lag), path_lag, lag[..., 0])
+    centres = np.arange(frames.shape[1]) * hop + window // 2
+    r_cc = _cross_correlation(waveforms, centres, hnr_lag, int(round(sr / PITCH_FLOOR)), max_lag)
+    sounding = valid & (relative > HNR_SILENCE_THRESHOLD)
+
+    for i in range(n_clips):
+        n_valid = int(valid[i].sum())
+        f0_voiced = f0[i][voiced[i]]
+        if len(f0_voiced):
+            out[i, 0] = f0_voiced.mean()
+            out[i, 1] = f0_voiced.std()
+            out[i, 2] = len(f0_voiced) / max(n_valid, 1)
+
+        if pulses:
+            y = waveforms[i, :lengths[i]]
+            periods, amplitudes = _pulses(y, sr, f0[i], voiced[i], window, hop)
+            out[i, 3], out[i, 4] = _jitter_shimmer(periods, amplitudes)
+        else:
+            out[i, 3:5] = np.nan
+
+        r = np.clip(r_cc[i][sounding[i]], 1e-6, 1 - 1e-6)
+        out[i, 5] = np.mean(10 * np.log10(r / (1 - r))) if len(r) else np.nan
+
+    return out
+
+def _correlation_candidates(frames: np.ndarray, sr: int, min_lag: int, max_lag: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Top N_CANDIDATES normalized autocorrelation peaks per frame as
+    (strength, fractional lag), each (..., N_CANDIDATES), best first.
+    Strength includes Praat's octave cost; missing candidates have lag inf.
+    """
+    window = np.hanning(frames.shape[-1] + 2)[1:-1].astype(np.float32)
+    n_fft = 1 << int(np.ceil(np.log2(2 * frames.shape[-1])))
+
+    ac = scipy.fft.irfft(np.abs(scipy.fft.rfft(frames * window, n_fft, axis=-1)) ** 2, n_fft, axis=-1)[..., :max_lag + 2]
+    window_ac = scipy.fft.irfft(np.abs(scipy.fft.rfft(window, n_fft)) ** 2, n_fft)[:max_lag + 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.nan_to_num(ac / ac[..., :1]) / (window_ac / window_ac[0])
+
+    # Local maxima in the lag range, parabolically interpolated
+    centre = r[..., min_lag:max_lag + 1]
+    left, right = r[..., min_lag - 1:max_lag], r[..., min_lag + 1:max_lag + 2]
+    is_peak = (centre >= left) & (centre > right) & (centre > 0)
+    curvature = left - 2 * centre + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(curvature < 0, 0.5 * (left - right) / curvature, 0.0)
+    peak = np.minimum(centre - 0.25 * (left - right) * shift, 1.0)
+    lags = np.arange(min_lag, max_lag + 1) + shift
+
+    # Rank by strength minus octave cost (favours higher pitch), keep the best few
+    # (non-peak lags can be shifted out of range; they are replaced before the log)
+    octave_lags = np.where(is_peak, lags, sr / PITCH_FLOOR)
+    score = np.where(is_peak, peak - OCTAVE_COST * np.log2(PITCH_FLOOR * octave_lags / sr), -np.inf)
+    top = np.argsort(-score, axis=-1)[..., :N_CANDIDATES]
+    score = np.take_along_axis(score, top, axis=-1)
+    found = np.isfinite(score)
+    return np.where(found, score, 0.0), np.where(found, np.take_along_axis(lags, top, axis=-1), np.inf)
+
+def _track_pitch(strength: np.ndarray, lag: np.ndarray, relative: np.ndarray) -> np.ndarray:
+    """
+    Praat's Viterbi path through the candidates plus an unvoiced candidate,
+    with octave-jump and voiced/unvoiced transition costs. Returns the chosen
+    lag per frame (n, F), inf where the path is unvoiced.
+    """
+    n, n_frames, k = strength.shape
+    # Unvoiced candidate strength: voicing threshold, raised in quiet frames
+    unvoiced = VOICING_THRESHOLD + np.maximum(0.0, 2 - relative / (SILENCE_THRESHOLD / (1 + VOICING_THRESHOLD)))
+    local = np.concatenate([np.where(np.isfinite(lag), strength, -np.inf), unvoiced[..., np.newaxis]], axis=-1)
+    # log2 of the voiced candidates only; missing candidates and the unvoiced one are NaN (switch cost below)
+    found = np.isfinite(lag)
+    log_f = np.concatenate([np.where(found, -np.log2(np.where(found, lag, 1.0)), np.nan),
+                            np.full((n, n_frames, 1), np.nan)], axis=-1)
+
+    # Costs scale with 0.01 s / time step, as in Praat
+    correction = 0.01 / TIME_STEP
+    is_voiced = np.arange(k + 1) < k
+    score = local[:, 0]
+    back = np.zeros((n, n_frames, k + 1), dtype=np.intp)
+    for t in range(1, n_frames):
+        octave = OCTAVE_JUMP_COST * np.abs(log_f[:, t - 1, :, np.newaxis] - log_f[:, t, np.newaxis, :])
+        switch = VOICED_UNVOICED_COST * (is_voiced[:, np.newaxis] != is_voiced[np.newaxis, :])
+        cost = np.where(np.isnan(octave), switch, octave) * correction  # (n, prev, cur)
+        total = score[:, :, np.newaxis] - cost
+        back[:, t] = np.argmax(total, axis=1)
+        score = np.take_along_axis(total, back[:, t, np.newaxis, :], axis=1)[:, 0] + local[:, t]
+
+    state = np.argmax(score, axis=-1)
+    path = np.empty((n, n_frames), dtype=np.intp)
+    for t in range(n_frames - 1, -1, -1):
+        path[:, t] = state
+        state = back[np.arange(n), t, state]
+    lag = np.concatenate([lag, np.full((n, n_frames, 1), np.inf)], axis=-1)
+    return np.take_along_axis(lag, path[..., np.newaxis], axis=-1)[..., 0]
+
+def _cross_correlation(waveforms: np.ndarray, centres: np.ndarray, lag: np.ndarray, span: int, max_lag: int) -> np.ndarray:
+    """
+    Normalized cross-correlation between the span samples around each frame
+    centre and the same span shifted by up to LAG_TOLERANCE around lag (best
+    match), as in Praat's cc method with one period per window. 0 where lag is inf.
+    """
+    n_samples = waveforms.shape[-1]
+    padded = np.pad(waveforms, [(0, 0), (0, span + max_lag + 1)])
+    starts = np.clip(centres - span // 2, 0, n_samples - 1)
+    segments = np.lib.stride_tricks.sliding_window_view(padded, span + max_lag + 1, axis=-1)[:, starts]  # (n, F, S)
+    x = segments[..., :span]
+
+    # x . z[tau] for every tau at once, and the energy of each shifted span
+    n_fft = 1 << int(np.ceil(np.log2(segments.shape[-1] + span)))
+    spectrum = np.conj(scipy.fft.rfft(x, n_fft, axis=-1)) * scipy.fft.rfft(segments, n_fft, axis=-1)
+    dots = scipy.fft.irfft(spectrum, n_fft, axis=-1)[..., :max_lag + 1]
+    energy = np.cumsum(np.concatenate([np.zeros(segments.shape[:-1] + (1,)), segments.astype(np.float64) ** 2], axis=-1), axis=-1)
+    shifted = energy[..., span:span + max_lag + 1] - energy[..., :max_lag + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.nan_to_num(dots / np.sqrt(shifted * shifted[..., :1]))
+
+    taus = np.arange(max_lag + 1)
+    near = np.abs(taus - lag[..., np.newaxis]) <= np.maximum(LAG_TOLERANCE * lag[..., np.newaxis], 1)
+    best = np.argmax(np.where(near & (taus > 0), r, -np.inf), axis=-1)[..., np.newaxis]
+
+    # Parabolic interpolation between samples (Praat interpolates the peak too)
+    left = np.take_along_axis(r, np.maximum(best - 1, 0), axis=-1)[..., 0]
+    mid = np.take_along_axis(r, best, axis=-1)[..., 0]
+    right = np.take_along_axis(r, np.minimum(best + 1, max_lag), axis=-1)[..., 0]
+    curvature = left - 2 * mid + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        peak = np.where(curvature < 0, mid - 0.125 * (left - right) ** 2 / curvature, mid)
+    return np.where(np.isfinite(lag), np.clip(peak, 0.0, 1.0), 0.0)
+
+def _pulses(y: np.ndarray, sr: int, f0: np.ndarray, voiced: np.ndarray, window: int, hop: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Glottal periods (s) and the peak amplitude opening each period, inside
+    voiced runs. The last pulse of a run has a NaN period, so periods never
+    pair up across an unvoiced gap in jitter/shimmer.
+    """
+    periods, amplitudes = [], []
+    centres = np.arange(len(f0)) * hop + window / 2
+    flips = np.diff(np.concatenate([[0], voiced.astype(np.int8), [0]]))
+    for first, last in zip(np.flatnonzero(flips == 1), np.flatnonzero(flips == -1) - 1):
+        start = int(max(centres[first] - hop / 2, 0))
+        end = int(min(centres[last] + hop / 2, len(y)))
+        run_centres, run_f0 = centres[first:last + 1], f0[first:last + 1]
+
+        # Polarity and first pulse from the largest excursion in the first period
+        t0 = sr / run_f0[0]
+        head = y[start:start + int(t0)]
+        if len(head) == 0:
+            continue
+        sign = 1.0 if head.max() >= -head.min() else -1.0
+        pos = start + int(np.argmax(sign * head))
+        time = float(pos)
+        while True:
+            period = sr / np.interp(pos, run_centres, run_f0)
+            half = max(int(period / 2), 2)
+            lo, hi = pos + int(0.8 * period), min(pos + int(np.ceil(1.2 * period)), end - half - 1)
+            if lo >= hi or pos - half < 0:
+                break
+            # Next pulse: shift whose period best matches this one (cross-correlation)
+            reference = y[pos - half:pos + half]
+            candidates = np.lib.stride_tricks.sliding_window_view(y[lo - half:hi + half + 1], 2 * half)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cc = np.nan_to_num(candidates @ reference / np.sqrt(np.einsum("ij,ij->i", candidates, candidates)))
+            best = int(np.argmax(cc))
+            shift = 0.0
+            if 0 < best < len(cc) - 1:
+                curvature = cc[best - 1] - 2 * cc[best] + cc[best + 1]
+                if curvature < 0:
+                    shift = 0.5 * (cc[best - 1] - cc[best + 1]) / curvature
+            nxt = lo + best
+            periods.append((nxt + shift - time) / sr)
+            amplitudes.append(_peak_height(y, pos, half, sign))
+            pos, time = nxt, nxt + shift
+        amplitudes.append(_peak_height(y, pos, max(int(sr / run_f0[-1] / 2), 2), sign))
+        periods.append(np.nan)
+    return np.array(periods), np.array(amplitudes)
+
+def _peak_height(y: np.ndarray, pos: int, half: int, sign: float) -> float:
+    """Largest excursion (in the pulse polarity) within half a period of pos, parabolically refined."""
+    lo = max(pos - half, 0)
+    segment = sign * y[lo:pos + half]
+    k = int(np.argmax(segment))
+    if 0 < k < len(segment) - 1:
+        left, mid, right = segment[k - 1], segment[k], segment[k + 1]
+        curvature = left - 2 * mid + right
+        if curvature < 0:
+            return float(mid - 0.125 * (left - right) ** 2 / curvature)
+    return float(segment[k])
+
+def _jitter_shimmer(periods: np.ndarray, amplitudes: np.ndarray) -> tuple[float, float]:
+    """Praat's jitter (local) and shimmer (local) with the period/amplitude limits above."""
+    ok = (periods >= PERIOD_FLOOR) & (periods <= PERIOD_CEILING)
+    if ok.sum() < 2:
+        return np.nan, np.nan
+
+    prev, cur = periods[:-1], periods[1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pair = ok[:-1] & ok[1:] & (np.maximum(prev, cur) / np.minimum(prev, cur) <= MAX_PERIOD_FACTOR)
+    if not pair.any():
+        return np.nan, np.nan
+    jitter = np.abs(cur - prev)[pair].mean() / periods[ok].mean()
+
+    a_prev, a_cur = amplitudes[:-1], amplitudes[1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amp_pair = pair & (np.maximum(a_prev, a_cur) / np.minimum(a_prev, a_cur) <= MAX_AMPLITUDE_FACTOR)
+    if not amp_pair.any():
+        return float(jitter), np.nan
+    shimmer = np.abs(a_cur - a_prev)[amp_pair].mean() / amplitudes[ok].mean()
+    return float(jitter), float(shimmer)
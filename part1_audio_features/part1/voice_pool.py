@@ -0,0 +1,191 @@
+import atexit
+import collections
+import multiprocessing
+import queue
+import threading
+import time
+import numpy as np
+from . import config, metrics, utils
+
+class VoiceWorkerError(Exception):
+    pass
+
+class VoiceTimeout(VoiceWorkerError):
+    pass
+
+def _worker_main(conn):
+    """Worker loop: (waveform, sr, pulses) in, Praat voice-quality dict (or an error string) out."""
+    from .features_acoustic import extract_voice_quality_praat
+    while True:
+        try:
+            waveform, sr, pulses = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            conn.send(("ok", extract_voice_quality_praat(waveform, sr, pulses)))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(timeout=1.0)
+            self.conn.close()
+        except Exception:
+            pass
+
+class VoiceWorkerPool:
+    """
+    Runs the Praat voice-quality stage in separate processes so a clip that
+    makes Praat spin can be stopped: a thread stuck in parselmouth cannot be
+    interrupted, but its process can be killed.
+
+    Workers are spawned up front and reused. A call that misses its deadline
+    kills its worker and a replacement is spawned in the background; the
+    caller gets VoiceTimeout and falls back to zero-filled features.
+    """
+
+    def __init__(
+        self,
+        size: int = config.VOICE_POOL_SIZE,
+        timeout: float = config.VOICE_TIMEOUT_SECONDS
+    ):
+        self.size = size
+        self.timeout = timeout
+
+        # spawn, not fork: the API process holds threads (and possibly torch) that must not be forked
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._latencies = collections.deque(maxlen=256)
+        self._counts = {"calls": 0, "failures": 0, "timeouts": 0, "kills": 0, "restarts": 0}
+
+        for _ in range(size):
+            self._idle.put(_Worker(self._ctx))
+        metrics.VOICE_POOL_SIZE.set(size)
+
+    def _replace(self):
+        """Spawns one worker in place of a killed or crashed one."""
+        with self._lock:
+            if self._closed:
+                return
+        try:
+            self._idle.put(_Worker(self._ctx))
+        except OSError as e:
+            utils.logger.warning(f"Could not spawn voice-quality worker: {e}")
+
+    def _timeout(self, message: str) -> VoiceTimeout:
+        """Counts a missed deadline (checkout or result) and returns the exception to raise."""
+        with self._lock:
+            self._counts["timeouts"] += 1
+        metrics.VOICE_POOL_TIMEOUTS.inc()
+        return VoiceTimeout(message)
+
+    def _checkout(self, deadline: float) -> _Worker | None:
+        """Returns a live idle worker, replacing any that died while idle; None past the deadline."""
+        while True:
+            try:
+                worker = self._idle.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                return None
+            if worker.process.is_alive():
+                return worker
+            worker.kill()
+            with self._lock:
+                self._counts["restarts"] += 1
+            metrics.VOICE_POOL_RESTARTS.inc()
+            threading.Thread(target=self._replace, daemon=True).start()
+
+    def run(self, waveform: np.ndarray, sr: int = config.SAMPLE_RATE, timeout: float | None = None, pulses: bool = True) -> dict:
+        """
+        Praat voice-quality features for one clip, computed in a worker.
+        `timeout` covers waiting for a free worker and the computation
+        together. Raises VoiceTimeout past the deadline (a worker that was
+        computing is killed) or VoiceWorkerError if the worker fails.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            if self._closed:
+                raise VoiceWorkerError("Voice-quality pool is shut down")
+
+        worker = self._checkout(deadline)
+        if worker is None:
+            raise self._timeout(f"No voice-quality worker free within {timeout:.1f}s")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._idle.put(worker)
+            raise self._timeout(f"No voice-quality worker free within {timeout:.1f}s")
+
+        start = time.perf_counter()
+        try:
+            worker.conn.send((np.asarray(waveform, dtype=np.float32), sr, pulses))
+            ready = worker.conn.poll(remaining)
+            if ready:
+                status, result = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            worker.kill()
+            threading.Thread(target=self._replace, daemon=True).start()
+            with self._lock:
+                self._counts["failures"] += 1
+            raise VoiceWorkerError(f"Voice-quality worker died: {e}")
+
+        if not ready:
+            worker.kill()
+            threading.Thread(target=self._replace, daemon=True).start()
+            with self._lock:
+                self._counts["kills"] += 1
+            metrics.VOICE_POOL_KILLS.inc()
+            raise self._timeout(f"Voice-quality stage exceeded {timeout:.1f}s")
+
+        self._idle.put(worker)
+        latency = time.perf_counter() - start
+        with self._lock:
+            self._counts["calls"] += 1
+            self._latencies.append(latency)
+            if status != "ok":
+                self._counts["failures"] += 1
+        if status != "ok":
+            raise VoiceWorkerError(result)
+        return result
+
+    def stats(self) -> dict:
+        """Pool size, counters and recent per-call latency."""
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000.0
+            stats = {"size": self.size, "idle": self._idle.qsize(), **self._counts}
+        if len(latencies):
+            stats["latency_ms_p50"] = float(np.percentile(latencies, 50))
+            stats["latency_ms_p95"] = float(np.percentile(latencies, 95))
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                break
+        metrics.VOICE_POOL_SIZE.set(0)
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool() -> VoiceWorkerPool:
+    """Returns the process-wide voice-quality pool, starting it on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = VoiceWorkerPool()
+            atexit.register(_POOL.shutdown)
+            utils.logger.info(f"Started voice-quality worker pool ({_POOL.size} workers)")
+        return _POOL
@@ -7,7 +7,7 @@ setup(
     install_requires=[
         "numpy>=1.24",
         "scipy>=1.10",
-        "librosa>=0.9.2",
+        "librosa>=0.10",
         "torchaudio>=2.0",
         "torch>=2.0.0",
         "transformers>=4.30",
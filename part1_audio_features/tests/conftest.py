@@ -37,3 +37,9 @@ def sample_mp3_base64(sample_wav_path):
         
     os.remove(mp3_path)
     return base64.b64encode(data).decode("utf-8")
+
+@pytest.fixture(scope="session")
+def sample_wav_base64(sample_wav_path):
+    """Returns the sample WAV file as a base64 string."""
+    with open(sample_wav_path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
@@ -0,0 +1,89 @@
+import shutil
+import pytest
+import numpy as np
+from part1 import decoder_pool
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+@pytest.fixture
+def pool():
+    p = decoder_pool.FFmpegDecoderPool(size=1, max_queue=2, timeout=10.0)
+    yield p
+    p.shutdown()
+
+@needs_ffmpeg
+def test_pool_decodes_to_16k_mono(pool, sample_wav_path):
+    with open(sample_wav_path, "rb") as f:
+        data = f.read()
+    y = pool.decode(data)
+    assert y.dtype == np.float32
+    assert len(y) == pytest.approx(16000 * 4, abs=160)
+    stats = pool.stats()
+    assert stats["decodes"] == 1
+    assert stats["queue_depth"] == 0
+    assert "latency_ms_p50" in stats
+
+@needs_ffmpeg
+def test_bounded_pool_stops_at_max_seconds(sample_wav_path):
+    with open(sample_wav_path, "rb") as f:
+        data = f.read()
+    bounded = decoder_pool.FFmpegDecoderPool(size=1, max_queue=2, timeout=10.0, max_seconds=1.0)
+    try:
+        assert len(bounded.decode(data)) == pytest.approx(16000, abs=160)
+    finally:
+        bounded.shutdown()
+
+def test_max_seconds_limits_ffmpeg_output():
+    assert "-t" not in decoder_pool.FFmpegDecoderPool(size=0)._command()
+    command = decoder_pool.FFmpegDecoderPool(size=0, max_seconds=1.51)._command()
+    assert command[command.index("-t") + 1] == "1.510"
+    assert command.index("-t") > command.index("pipe:0")
+
+@needs_ffmpeg
+def test_pool_replaces_crashed_worker(pool, sample_wav_path):
+    with open(sample_wav_path, "rb") as f:
+        data = f.read()
+    idle = pool._idle.get_nowait()
+    idle.kill()
+    idle.wait()
+    pool._idle.put(idle)
+
+    y = pool.decode(data)
+    assert len(y) > 0
+    assert pool.stats()["restarts"] == 1
+
+@needs_ffmpeg
+def test_pool_rejects_garbage(pool):
+    with pytest.raises(decoder_pool.DecoderError):
+        pool.decode(b"not audio at all")
+
+@needs_ffmpeg
+def test_concurrent_replenish_keeps_pool_size():
+    import threading
+    pool = decoder_pool.FFmpegDecoderPool(size=2, max_queue=2, timeout=10.0)
+    try:
+        for _ in range(2):
+            pool._discard(pool._idle.get_nowait())
+        threads = [threading.Thread(target=pool._replenish) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert pool._idle.qsize() == 2
+    finally:
+        pool.shutdown()
+
+def test_spawn_failure_disables_pool(monkeypatch):
+    calls = []
+    def no_ffmpeg(*args, **kwargs):
+        calls.append(args)
+        raise FileNotFoundError(2, "No such file or directory", "ffmpeg")
+    monkeypatch.setattr(decoder_pool.subprocess, "Popen", no_ffmpeg)
+    monkeypatch.setattr(decoder_pool, "_POOLS", {})
+    monkeypatch.setattr(decoder_pool, "_POOL_ERROR", None)
+
+    with pytest.raises(decoder_pool.DecoderError, match="Could not start ffmpeg"):
+        decoder_pool.get_pool()
+    with pytest.raises(decoder_pool.DecoderError, match="disabled"):
+        decoder_pool.get_pool()
+    assert len(calls) == 1
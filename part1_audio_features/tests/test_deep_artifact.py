@@ -0,0 +1,21 @@
+import pytest
+from part1 import deep_artifact
+
+def test_mmap_refused_on_old_torch(monkeypatch, tmp_path):
+    import torch
+    monkeypatch.setattr(torch, "__version__", "2.0.1+cpu")
+    with pytest.raises(deep_artifact.ArtifactError, match="torch>=2.1"):
+        deep_artifact._load_mapped(str(tmp_path))
+
+def test_missing_directory_is_artifact_error(tmp_path):
+    import json
+    manifest = {"format": deep_artifact.ARTIFACT_FORMAT, "weights": "mmap", "model_name": "m",
+                **deep_artifact._versions(), "sha256": {}}
+    (tmp_path / deep_artifact.MANIFEST).write_text(json.dumps(manifest))
+    with pytest.raises(deep_artifact.ArtifactError, match="config/"):
+        deep_artifact.verify(str(tmp_path), "m", "mmap")
+
+def test_unreadable_manifest_is_artifact_error(tmp_path):
+    (tmp_path / deep_artifact.MANIFEST).write_text("{not json")
+    with pytest.raises(deep_artifact.ArtifactError, match="Unreadable"):
+        deep_artifact.verify(str(tmp_path), "m", "qint8")
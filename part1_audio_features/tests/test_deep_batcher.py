@@ -0,0 +1,39 @@
+import threading
+import numpy as np
+import pytest
+from part1 import deep_batcher
+
+def _fake_embed(calls):
+    def embed(waveforms, sr):
+        calls.append(len(waveforms))
+        return np.stack([np.full(4, w.sum(), dtype=np.float32) for w in waveforms])
+    return embed
+
+def test_concurrent_requests_share_a_batch():
+    calls = []
+    batcher = deep_batcher.EmbeddingBatcher(_fake_embed(calls), max_batch=4, max_wait_ms=200)
+    results = {}
+    barrier = threading.Barrier(4)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = batcher.submit(np.full(10, i, dtype=np.float32))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.shutdown()
+
+    assert sum(calls) == 4 and len(calls) < 4
+    for i in range(4):
+        np.testing.assert_array_equal(results[i], np.full(4, 10 * i))
+
+def test_errors_reach_every_caller():
+    def boom(waveforms, sr):
+        raise ValueError("model failed")
+    batcher = deep_batcher.EmbeddingBatcher(boom, max_batch=2, max_wait_ms=1)
+    with pytest.raises(ValueError, match="model failed"):
+        batcher.submit(np.zeros(10, dtype=np.float32))
+    batcher.shutdown()
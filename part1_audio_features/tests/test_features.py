@@ -1,6 +1,6 @@
 import numpy as np
 import pytest
-from part1 import features_acoustic, features_deep
+from part1 import features_acoustic, features_deep, schema, config
 
 @pytest.fixture
 def mock_waveform():
@@ -19,6 +19,20 @@ def test_acoustic_features(mock_waveform):
         assert k in features, f"Missing key: {k}"
         # Some might be None if extraction failed (e.g. pitch on noise), but typically for noise pitch is 0.
         # Jitter/Shimmer might be None if no pitch.
+
+def test_acoustic_vector_matches_schema(mock_waveform):
+    vec = features_acoustic.extract_acoustic_vector(mock_waveform)
+    assert vec.dtype == np.float32
+    assert vec.shape == (schema.ACOUSTIC.size,)
+    # Model input order is the sorted feature names
+    assert list(schema.ACOUSTIC.names) == sorted(schema.ACOUSTIC.names)
+
+    view = schema.ACOUSTIC.view(vec)
+    # Praat may report NaN jitter/shimmer on noise, so compare as arrays
+    as_dict = schema.ACOUSTIC.to_dict(vec)
+    assert list(view) == list(as_dict)
+    np.testing.assert_array_equal([view[k] for k in view], list(as_dict.values()))
+    np.testing.assert_array_equal(schema.ACOUSTIC.from_dict(view), vec)
         
 def test_deep_embeddings(mock_waveform):
     # This test might be slow as it loads the model
@@ -31,3 +45,170 @@ def test_deep_embeddings(mock_waveform):
         assert emb.shape == (1536,)
     except Exception as e:
         pytest.fail(f"Deep feature extraction failed: {e}")
+
+def test_deep_batch_matches_single_clip():
+    # Real model: padding must not leak into the embeddings of shorter clips
+    try:
+        features_deep.load_model()
+    except Exception as e:
+        pytest.skip(f"wav2vec2 unavailable: {e}")
+    rng = np.random.default_rng(0)
+    clips = [0.1 * rng.standard_normal(n).astype(np.float32) for n in (16000, 24000, 16000, 9000)]
+    batch = features_deep.extract_deep_embeddings_batch(clips)
+    for row, clip in zip(batch, clips):
+        np.testing.assert_allclose(row, features_deep.extract_deep_embeddings_batch([clip])[0], rtol=1e-4, atol=1e-4)
+
+class _Processor:
+    """Wav2Vec2Processor's audio half (the tokenizer needs a vocabulary download)."""
+    def __init__(self, feature_extractor):
+        self.feature_extractor = feature_extractor
+
+    def __call__(self, *args, **kwargs):
+        return self.feature_extractor(*args, **kwargs)
+
+def test_trimmed_requests_share_one_forward_pass(monkeypatch):
+    # wav2vec2-base takes no attention mask: requests of different lengths are padded to one window
+    import threading
+    import torch
+    from transformers import Wav2Vec2Config, Wav2Vec2FeatureExtractor, Wav2Vec2Model
+    from part1 import deep_batcher
+    torch.manual_seed(0)
+    model = Wav2Vec2Model(Wav2Vec2Config(
+        hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64,
+        conv_dim=(32,) * 7, num_conv_pos_embeddings=16, num_conv_pos_embedding_groups=2
+    )).eval()
+    monkeypatch.setattr(features_deep, "_MODEL", model)
+    monkeypatch.setattr(features_deep, "_PROCESSOR", _Processor(Wav2Vec2FeatureExtractor(return_attention_mask=False)))
+    calls = []
+    embed_padded = features_deep._embed_padded
+    monkeypatch.setattr(features_deep, "_embed_padded", lambda w, sr: calls.append(len(w)) or embed_padded(w, sr))
+    batcher = deep_batcher.EmbeddingBatcher(features_deep.extract_deep_embeddings_batch, max_batch=3, max_wait_ms=2000)
+    monkeypatch.setattr(features_deep, "_BATCHER", batcher)
+    monkeypatch.setattr(config, "DEEP_BATCHING", True)
+
+    rng = np.random.default_rng(0)
+    clips = [0.1 * rng.standard_normal(n).astype(np.float32) for n in (17000, 21000, 24000)]
+    results = {}
+    barrier = threading.Barrier(len(clips))
+
+    def worker(i):
+        barrier.wait()
+        results[i] = features_deep.extract_deep_embeddings(clips[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(clips))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.shutdown()
+    assert calls == [3]
+
+    monkeypatch.setattr(config, "DEEP_BATCHING", False)
+    for i, clip in enumerate(clips):
+        np.testing.assert_allclose(results[i], features_deep.extract_deep_embeddings(clip), rtol=1e-4, atol=1e-4)
+
+def test_acoustic_batch_matches_single():
+    rng = np.random.default_rng(0)
+    t = np.arange(24000) / 16000
+    clips = [(0.3 * np.sin(2 * np.pi * f0 * t) + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+             for f0 in (120, 180, 240, 300)]
+    clips[2] = clips[2][:17001]  # padded + length-masked clips, all lengths in one STFT pass
+    clips[3] = clips[3][:9999]
+
+    stack = np.zeros((4, 24000), dtype=np.float32)
+    for i, clip in enumerate(clips):
+        stack[i, :len(clip)] = clip
+    batch = features_acoustic.extract_acoustic_batch(stack, lengths=[len(c) for c in clips])
+
+    assert batch.shape == (4, schema.ACOUSTIC.size)
+    for row, clip in zip(batch, clips):
+        np.testing.assert_allclose(row, features_acoustic.extract_acoustic_vector(clip), rtol=1e-5, atol=1e-6)
+
+def test_praat_voice_quality_on_tone():
+    t = np.arange(24000) / 16000
+    rng = np.random.default_rng(0)
+    y = (0.3 * np.sin(2 * np.pi * 150 * t) + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+    features = features_acoustic.extract_voice_quality_praat(y)
+    assert features["pitch_mean"] == pytest.approx(150, rel=0.02)
+    assert features["voiced_ratio"] > 0.8
+    assert features["hnr"] > 10
+    assert features["jitter_local"] < 0.01
+
+def test_praat_voice_quality_keeps_trained_semantics():
+    # The model was trained on ac pitch and To Harmonicity (cc); the served values must be exactly those
+    import parselmouth
+    from parselmouth.praat import call
+    t = np.arange(24000) / 16000
+    y = (0.3 * np.sin(2 * np.pi * 180 * t * (1 + 0.02 * np.sin(2 * np.pi * 3 * t)))).astype(np.float32)
+    features = features_acoustic.extract_voice_quality_praat(y)
+
+    sound = parselmouth.Sound(y, sampling_frequency=16000)
+    f0 = sound.to_pitch(time_step=0.02, pitch_floor=75.0, pitch_ceiling=500.0).selected_array["frequency"]
+    voiced = f0[(f0 > 75) & (f0 < 500)]
+    harmonicity = call(sound, "To Harmonicity (cc)", 0.02, 75, 0.1, 1.0)
+    assert features["pitch_mean"] == pytest.approx(voiced.mean())
+    assert features["pitch_std"] == pytest.approx(voiced.std())
+    assert features["hnr"] == pytest.approx(call(harmonicity, "Get mean", 0, 0))
+
+def test_praat_shared_pitch_track(monkeypatch):
+    # PRAAT_SHARED_PITCH: pitch statistics are the cc track's, HNR stays close to To Harmonicity (cc)
+    import parselmouth
+    from parselmouth.praat import call
+    monkeypatch.setattr(config, "PRAAT_SHARED_PITCH", True)
+    t = np.arange(24000) / 16000
+    y = (0.3 * np.sin(2 * np.pi * 180 * t * (1 + 0.02 * np.sin(2 * np.pi * 3 * t)))).astype(np.float32)
+    features = features_acoustic.extract_voice_quality_praat(y)
+
+    sound = parselmouth.Sound(y, sampling_frequency=16000)
+    f0 = sound.to_pitch_cc(time_step=0.02, pitch_floor=75.0, pitch_ceiling=500.0).selected_array["frequency"]
+    voiced = f0[(f0 > 75) & (f0 < 500)]
+    harmonicity = call(sound, "To Harmonicity (cc)", 0.02, 75, 0.1, 1.0)
+    assert features["pitch_mean"] == pytest.approx(voiced.mean())
+    assert features["pitch_std"] == pytest.approx(voiced.std())
+    assert features["hnr"] == pytest.approx(call(harmonicity, "Get mean", 0, 0), abs=1.0)
+    assert np.isfinite(features["jitter_local"]) and np.isfinite(features["shimmer_local"])
+
+def test_running_moments_match_numpy():
+    rng = np.random.default_rng(0)
+    frames = rng.standard_normal((250, 8)) * 3 + 5
+    moments = features_deep.RunningMoments(8)
+    for block in np.array_split(frames, [40, 41, 180]):
+        moments.update(block)
+    np.testing.assert_allclose(moments.mean, frames.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(moments.std, frames.std(axis=0), rtol=1e-12)
+
+def test_chunks_own_every_sample_once():
+    bounds = features_deep._chunk_bounds(16000 * 12, 16000 * 5, 8000)
+    owned = [(own_start, own_end) for _, _, own_start, own_end in bounds]
+    assert owned[0][0] == 0 and owned[-1][1] == 16000 * 12
+    assert all(a[1] == b[0] for a, b in zip(owned, owned[1:]))
+    assert all(end - start <= 16000 * 5 for start, end, _, _ in bounds)
+
+def test_short_tail_chunk_is_merged():
+    # 12 s in 5 s chunks without overlap leaves a 2 s tail (kept); 10.01 s leaves 160 samples (merged)
+    assert [end - start for start, end, _, _ in features_deep._chunk_bounds(16000 * 12, 16000 * 5, 0)] == [80000, 80000, 32000]
+    bounds = features_deep._chunk_bounds(160160, 16000 * 5, 0, min_len=400)
+    assert len(bounds) == 2 and bounds[-1][1] == bounds[-1][3] == 160160
+
+def test_frames_owned_once_by_centre():
+    from types import SimpleNamespace
+    field, stride = features_deep._receptive_field(SimpleNamespace(conv_kernel=(10, 3, 3, 3, 3, 2, 2), conv_stride=(5, 2, 2, 2, 2, 2, 2)))
+    assert (field, stride) == (400, 320)
+    n = 16000 * 12
+    centres = []
+    for start, end, own_start, own_end in features_deep._chunk_bounds(n, 16000 * 5, 8000, field):
+        n_frames = (end - start - field) // stride + 1
+        owned = features_deep._owned_frames(start, n_frames, field, stride, own_start, own_end)
+        centres.extend(start + np.flatnonzero(owned) * stride + field // 2)
+    assert np.all(np.diff(centres) > 0)  # no frame pooled twice, in time order
+    assert centres[0] < stride and centres[-1] > n - stride - field
+
+def test_truncate_layers_keeps_first_k():
+    from types import SimpleNamespace
+    layers = list(range(12))
+    model = SimpleNamespace(encoder=SimpleNamespace(layers=layers), config=SimpleNamespace(num_hidden_layers=12))
+    features_deep.truncate_layers(model, 4)
+    assert model.encoder.layers == [0, 1, 2, 3] and model.config.num_hidden_layers == 4
+    # Cutting from the full list again can grow the depth back
+    features_deep.truncate_layers(model, 0, layers)
+    assert model.encoder.layers == layers and model.config.num_hidden_layers == 12
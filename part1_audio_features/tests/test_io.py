@@ -1,5 +1,7 @@
 import pytest
+import base64
 import os
+import numpy as np
 from part1 import io, config
 
 def test_decode_valid_mp3(sample_mp3_base64):
@@ -24,3 +26,45 @@ def test_too_short_audio(sample_mp3_base64):
     # This might define a constraint issue if the fixture is short, 
     # but our fixture uses 4.0s which is > 3.0s min.
     pass
+
+def test_decode_to_array_in_memory(sample_wav_base64):
+    waveform, metadata = io.decode_to_array(sample_wav_base64)
+    assert waveform.dtype == np.float32
+    assert waveform.ndim == 1
+    assert len(waveform) == int(config.ANALYSIS_WINDOW_SECONDS * config.SAMPLE_RATE)
+    assert metadata["decoder"] == "soundfile"
+    assert metadata["format"] == "wav"
+    assert metadata["duration"] == pytest.approx(4.0, abs=0.01)
+    assert metadata["sample_rate"] == 16000
+    assert metadata["channels"] == 1
+
+def test_bounded_decode_keeps_full_duration(monkeypatch):
+    import base64
+    from io import BytesIO
+    import soundfile as sf
+
+    sr = 44100
+    t = np.arange(sr * 12) / sr
+    stereo = np.stack([0.3 * np.sin(2 * np.pi * 220 * t)] * 2, axis=1)
+    buf = BytesIO()
+    sf.write(buf, stereo, sr, format="WAV")
+    payload = base64.b64encode(buf.getvalue()).decode("utf-8")
+
+    monkeypatch.setattr(config, "BOUNDED_DECODE", True)
+    waveform, metadata = io.decode_to_array(payload)
+    assert metadata["duration"] == pytest.approx(12.0)
+    assert len(waveform) == int(config.ANALYSIS_WINDOW_SECONDS * config.SAMPLE_RATE)
+
+def test_garbage_without_ffmpeg_is_validation_error(monkeypatch):
+    from part1 import decoder_pool
+    def no_ffmpeg(*args, **kwargs):
+        raise FileNotFoundError(2, "No such file or directory", "ffmpeg")
+    monkeypatch.setattr(decoder_pool.subprocess, "Popen", no_ffmpeg)
+    monkeypatch.setattr(decoder_pool, "_POOLS", {})
+    monkeypatch.setattr(decoder_pool, "_POOL_ERROR", None)
+    monkeypatch.setattr(config, "FFMPEG_POOL_ENABLED", True)
+
+    payload = base64.b64encode(b"not audio at all " * 64).decode("utf-8")
+    for _ in range(2):
+        with pytest.raises(io.ValidationError):
+            io.decode_to_array(payload)
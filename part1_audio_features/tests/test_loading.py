@@ -0,0 +1,50 @@
+import threading
+import time
+import pytest
+from part1 import loading
+
+def test_concurrent_callers_share_one_load():
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return object()
+
+    loader = loading.OnceLoader("test", load)
+    assert loader.state == loading.PENDING
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(loader.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert loader.status()["state"] == loading.READY
+
+def test_waiters_see_failure_and_next_call_retries():
+    attempts = []
+    started = threading.Event()
+
+    def load():
+        attempts.append(1)
+        if len(attempts) == 1:
+            started.set()
+            time.sleep(0.1)
+            raise OSError("disk full")
+        return "model"
+
+    loader = loading.OnceLoader("test", load)
+    first = threading.Thread(target=lambda: pytest.raises(OSError, loader.get))
+    first.start()
+    started.wait()
+    with pytest.raises(loading.LoadError, match="disk full"):
+        loader.get()
+    first.join()
+
+    status = loader.status()
+    assert status["state"] == loading.FAILED and "disk full" in status["error"]
+    assert loader.get() == "model"
+    assert len(attempts) == 2 and loader.ready
@@ -0,0 +1,16 @@
+import mmap
+import os
+import pytest
+from part1 import memory
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="Linux /proc only")
+def test_report_counts_mapped_file(tmp_path):
+    path = tmp_path / "weights.bin"
+    path.write_bytes(b"\x01" * (4 << 20))
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert sum(mapped[i] for i in range(0, len(mapped), 4096)) > 0  # fault every page in
+        report = memory.report(str(path))
+
+    assert report["rss_mb"] >= report["unique_mb"] > 0
+    assert report["mapped_rss_mb"] == pytest.approx(4.0, abs=0.1)
+    assert report["mapped_unique_mb"] + report["mapped_shared_mb"] == pytest.approx(report["mapped_rss_mb"], abs=0.1)
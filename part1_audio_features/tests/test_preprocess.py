@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 from part1 import preprocess
 
 def test_preprocess_output_shape(sample_wav_path):
@@ -8,3 +9,21 @@ def test_preprocess_output_shape(sample_wav_path):
     assert waveform.ndim == 1
     # Check normalization range
     assert np.max(np.abs(waveform)) <= 1.0
+
+def test_preprocess_waveform_matches_librosa_trim():
+    import librosa
+    rng = np.random.default_rng(0)
+    y = (0.2 * rng.standard_normal(24000)).astype(np.float32)
+    y[:5000] *= 1e-4  # leading silence
+    y[20000:] *= 1e-4  # trailing silence
+
+    _, (start, end) = librosa.effects.trim(y, top_db=preprocess.TRIM_TOP_DB)
+    out = preprocess.preprocess_waveform(y)
+    assert len(out) == end - start
+    assert np.sqrt(np.mean(out ** 2)) == pytest.approx(preprocess.TARGET_RMS, rel=1e-3)
+
+def test_preprocess_waveform_in_place():
+    y = np.full(16000, 0.5, dtype=np.float32)
+    out = preprocess.preprocess_waveform(y, copy=False)
+    assert np.shares_memory(out, y)
+    assert out.dtype == np.float32
@@ -0,0 +1,60 @@
+import io as _io
+import numpy as np
+import pytest
+import soundfile as sf
+from part1 import probe
+
+def _encode(fmt, subtype, sr=44100, channels=2, duration=3.5):
+    t = np.arange(int(sr * duration)) / sr
+    y = np.stack([0.3 * np.sin(2 * np.pi * 220 * t)] * channels, axis=1)
+    buf = _io.BytesIO()
+    sf.write(buf, y, sr, format=fmt, subtype=subtype)
+    return buf.getvalue()
+
+@pytest.mark.parametrize("fmt,subtype,codec,sr", [
+    ("WAV", "PCM_16", "pcm", 44100),
+    ("WAV", "FLOAT", "pcm_float", 44100),
+    ("FLAC", "PCM_16", "flac", 44100),
+    ("OGG", "VORBIS", "vorbis", 44100),
+    ("OGG", "OPUS", "opus", 48000),
+])
+def test_probe_formats(fmt, subtype, codec, sr):
+    info = probe.probe(_encode(fmt, subtype, sr=sr))
+    assert info.codec == codec
+    assert info.sample_rate == sr
+    assert info.channels == 2
+    assert info.duration == pytest.approx(3.5, abs=0.01)
+
+@pytest.mark.skipif("MP3" not in sf.available_formats(), reason="libsndfile built without MP3")
+def test_probe_mp3_header():
+    data = _encode("MP3", "MPEG_LAYER_III", channels=1)
+    assert probe.sniff_format(data) == "mp3"
+    info = probe.probe(data)
+    assert info.codec == "mp3"
+    assert info.sample_rate == 44100
+    assert info.channels == 1
+    assert info.duration == pytest.approx(3.5, abs=0.05)
+
+def test_probe_rejects_unknown():
+    assert probe.sniff_format(b"\x00" * 64) is None
+    with pytest.raises(probe.ProbeError):
+        probe.probe(b"\x00" * 64)
+
+def test_decode_rejects_long_clip_before_decoding(monkeypatch):
+    import base64
+    from part1 import io, config
+
+    data = _encode("WAV", "PCM_16", sr=8000, channels=1, duration=config.MAX_DURATION_SECONDS + 1)
+    monkeypatch.setattr(io, "_read_soundfile", lambda raw: pytest.fail("decoded despite bad duration"))
+    with pytest.raises(io.ValidationError, match="out of bounds"):
+        io.decode_to_array(base64.b64encode(data).decode("utf-8"))
+
+def test_stray_mp3_sync_is_not_mp3():
+    # Valid-looking MPEG-1 layer III header (128 kbps, 44.1 kHz) inside non-MP3 bytes
+    header = b"\xff\xfb\x90\x64"
+    rng = np.random.default_rng(0)
+    junk = rng.integers(0, 0xFF, 2000, dtype=np.uint8).tobytes()  # never 0xFF: no second sync
+    assert probe.sniff_format(b"\x00" * 100 + header + junk) is None
+    # A lone header at the end of the data is not enough either
+    assert probe.sniff_format(b"\x00" * 100 + header) is None
+    assert probe.sniff_format(b"\x00" * 100 + header + b"\x00" * 413 + header) is None
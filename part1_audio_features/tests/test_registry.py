@@ -0,0 +1,19 @@
+import pytest
+from part1 import registry, schema
+
+def test_every_acoustic_feature_is_registered():
+    assert set(schema.ACOUSTIC.names) <= set(registry.FEATURES)
+    assert registry.DEEP_EMBEDDINGS in registry.FEATURES
+
+def test_closure_pulls_in_pitch_for_jitter():
+    assert registry.resolve(["jitter_local"]) == {"point_process", "pitch"}
+    assert registry.resolve(["hnr", "mfcc_mean_0"]) == {"pitch", "stft"}
+
+def test_acoustic_model_skips_embeddings():
+    analyses = registry.resolve(schema.ACOUSTIC.names)
+    assert "embeddings" not in analyses
+    assert registry.provided(analyses) == set(schema.ACOUSTIC.names)
+
+def test_unknown_feature():
+    with pytest.raises(KeyError):
+        registry.resolve(["not_a_feature"])
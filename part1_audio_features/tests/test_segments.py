@@ -0,0 +1,24 @@
+import numpy as np
+from part1 import segments, config
+
+def test_plan_spreads_non_overlapping_windows():
+    starts = segments.plan_segments(10 * 16000, 24000, 4)
+    assert len(starts) == 4
+    assert starts[0] == 0 and starts[-1] == 10 * 16000 - 24000
+    assert (np.diff(starts) >= 24000).all()
+
+def test_plan_limited_by_clip_length():
+    assert len(segments.plan_segments(50000, 24000, 8)) == 2
+    assert list(segments.plan_segments(10000, 24000, 8)) == [0]
+
+def test_budget_bounds_segment_count(monkeypatch):
+    monkeypatch.setattr(segments, "SEGMENT_COST", segments._CostEstimate(0.5))
+    assert segments.segment_budget(2.1) == 4
+    assert segments.segment_budget(0.0) == 1
+    assert segments.segment_budget(1000.0) == config.MAX_SEGMENTS
+
+def test_extract_segments(sample_wav_base64):
+    seg = segments.extract_segments(sample_wav_base64, budget_seconds=1000.0, max_segments=2)
+    assert seg.acoustic_matrix.shape[0] == len(seg.segment_bounds) == 2
+    assert seg.metadata["segments"] == 2
+    assert (seg.segment_bounds[:, 1] > seg.segment_bounds[:, 0]).all()
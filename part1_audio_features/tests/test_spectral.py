@@ -0,0 +1,34 @@
+import numpy as np
+import librosa
+import pytest
+from part1 import spectral
+
+@pytest.fixture
+def voiced_waveform():
+    sr = 16000
+    t = np.arange(int(sr * 1.5)) / sr
+    rng = np.random.default_rng(0)
+    return (0.3 * np.sin(2 * np.pi * 220 * t) + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+
+def test_plan_matches_librosa(voiced_waveform):
+    y, sr = voiced_waveform, 16000
+    feats = spectral.get_plan(sr, 2048, 512).analyze(y)
+
+    mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13, n_fft=2048, hop_length=512)
+    np.testing.assert_allclose(feats.mfcc, mfcc, atol=2e-3)
+    np.testing.assert_allclose(feats.centroid, librosa.feature.spectral_centroid(y=y, sr=sr)[0], rtol=1e-4)
+    np.testing.assert_allclose(feats.flatness, librosa.feature.spectral_flatness(y=y)[0], rtol=1e-4)
+    bin_hz = sr / 2048
+    np.testing.assert_allclose(feats.rolloff, librosa.feature.spectral_rolloff(y=y, sr=sr)[0], atol=bin_hz)
+
+def test_plan_is_cached():
+    assert spectral.get_plan(16000, 2048, 512) is spectral.get_plan(16000, 2048, 512)
+
+def test_plan_batch_matches_single(voiced_waveform):
+    plan = spectral.get_plan(16000, 2048, 512)
+    stack = np.stack([voiced_waveform, 0.5 * voiced_waveform[::-1]])
+    batch = plan.analyze(stack)
+    for i, y in enumerate(stack):
+        single = plan.analyze(y)
+        np.testing.assert_allclose(batch.mfcc[i], single.mfcc, rtol=1e-5, atol=1e-4)
+        np.testing.assert_allclose(batch.centroid[i], single.centroid, rtol=1e-6)
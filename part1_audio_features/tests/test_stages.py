@@ -0,0 +1,22 @@
+import time
+import pytest
+from part1 import stages
+
+def test_parallel_stages_overlap():
+    fns = {name: (lambda name=name: time.sleep(0.2) or name) for name in ("a", "b", "c")}
+    start = time.perf_counter()
+    results, timings = stages.run_stages(fns, parallel=True)
+    assert time.perf_counter() - start < 0.5
+    assert results == {"a": "a", "b": "b", "c": "c"}
+    assert set(timings) == {"a", "b", "c"}
+    assert all(ms >= 190 for ms in timings.values())
+
+def test_sequential_matches_parallel():
+    fns = {"x": lambda: 1, "y": lambda: 2}
+    assert stages.run_stages(fns, parallel=False)[0] == stages.run_stages(fns, parallel=True)[0]
+
+def test_stage_error_is_raised():
+    def boom():
+        raise ValueError("stage failed")
+    with pytest.raises(ValueError, match="stage failed"):
+        stages.run_stages({"ok": lambda: 1, "bad": boom}, parallel=True)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from part1 import voice
+
+@pytest.fixture
+def voiced_waveform():
+    sr = 16000
+    t = np.arange(int(sr * 1.5)) / sr
+    rng = np.random.default_rng(0)
+    return (0.3 * np.sin(2 * np.pi * 150 * t) + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+def test_steady_tone(voiced_waveform):
+    features = voice.extract_voice_quality(voiced_waveform)
+    assert list(features) == list(voice.FEATURES)
+    assert features["pitch_mean"] == pytest.approx(150, rel=0.02)
+    assert features["voiced_ratio"] > 0.8
+    assert features["jitter_local"] < 0.01
+    assert features["hnr"] > 10
+
+def test_batch_matches_single(voiced_waveform):
+    short = voiced_waveform[:17001] * 0.5
+    stack = np.zeros((2, len(voiced_waveform)), dtype=np.float32)
+    stack[0], stack[1, :len(short)] = voiced_waveform, short
+    batch = voice.extract_voice_batch(stack, lengths=[len(voiced_waveform), len(short)])
+
+    assert batch.shape == (2, len(voice.FEATURES))
+    for row, clip in zip(batch, (voiced_waveform, short)):
+        single = voice.extract_voice_quality(clip)
+        np.testing.assert_allclose(row, [single[k] for k in voice.FEATURES], rtol=1e-5, atol=1e-6)
+
+def test_too_short_clip():
+    row = voice.extract_voice_batch(np.zeros((1, 100), dtype=np.float32))[0]
+    assert row[0] == row[1] == row[2] == 0.0
+    assert np.isnan(row[3:]).all()
+
+def _synthetic_voices():
+    sr = 16000
+    t = np.arange(int(sr * 1.5)) / sr
+    rng = np.random.default_rng(1)
+    vibrato = np.cumsum(180 * (1 + 0.03 * np.sin(2 * np.pi * 5 * t))) / sr
+    glottal = np.cumsum(120 * (1 + 0.02 * np.sin(2 * np.pi * 4 * t))) / sr
+    return {
+        "vibrato": 0.3 * np.sin(2 * np.pi * vibrato) + 0.01 * rng.standard_normal(len(t)),
+        "harmonics": sum(0.3 / k * np.sin(2 * np.pi * k * glottal) for k in range(1, 8))
+                     + 0.02 * rng.standard_normal(len(t)),
+    }
+
+@pytest.mark.parametrize("name", ["vibrato", "harmonics"])
+def test_parity_with_praat(name):
+    from part1 import features_acoustic
+    y = _synthetic_voices()[name].astype(np.float32)
+    praat = features_acoustic.extract_voice_quality_praat(y)
+    fast = voice.extract_voice_quality(y)
+
+    assert fast["pitch_mean"] == pytest.approx(praat["pitch_mean"], rel=0.005)
+    assert fast["pitch_std"] == pytest.approx(praat["pitch_std"], abs=0.5)
+    assert fast["voiced_ratio"] == pytest.approx(praat["voiced_ratio"], abs=0.05)
+    assert fast["hnr"] == pytest.approx(praat["hnr"], abs=1.0)
+    # Different pulse placement: only the magnitude is shared, shimmer reads high (see voice.py)
+    assert praat["jitter_local"] / 2 < fast["jitter_local"] < praat["jitter_local"] * 2
+    assert praat["shimmer_local"] < fast["shimmer_local"] < praat["shimmer_local"] * 4
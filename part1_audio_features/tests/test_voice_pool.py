@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from part1 import voice_pool, features_acoustic
+
+@pytest.fixture
+def pool():
+    p = voice_pool.VoiceWorkerPool(size=1, timeout=30.0)
+    yield p
+    p.shutdown()
+
+@pytest.fixture
+def tone():
+    t = np.arange(24000) / 16000
+    return (0.3 * np.sin(2 * np.pi * 150 * t)).astype(np.float32)
+
+def test_pool_matches_in_process(pool, tone):
+    assert pool.run(tone) == features_acoustic.extract_voice_quality_praat(tone)
+    stats = pool.stats()
+    assert stats["calls"] == 1
+    assert "latency_ms_p50" in stats
+
+def test_pool_kills_and_replaces_on_timeout(pool, tone):
+    with pytest.raises(voice_pool.VoiceTimeout):
+        pool.run(tone, timeout=1e-4)
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["kills"] == 1
+
+    # The replacement worker picks up the next call
+    assert pool.run(tone)["pitch_mean"] > 0
+
+def test_timeout_zero_fills_and_flags(monkeypatch, pool, tone):
+    monkeypatch.setattr(features_acoustic.config, "VOICE_BACKEND", "praat")
+    monkeypatch.setattr(features_acoustic.config, "VOICE_POOL_ENABLED", True)
+    monkeypatch.setattr(voice_pool, "get_pool", lambda: pool)
+    monkeypatch.setattr(pool, "timeout", 1e-4)
+
+    metadata = {}
+    features = features_acoustic.extract_voice_quality(tone, metadata=metadata)
+    assert set(features.values()) == {0.0}
+    assert metadata["voice_quality_timeout"] is True
+
+def test_checkout_timeout_is_counted(pool, tone):
+    busy = pool._idle.get()
+    try:
+        with pytest.raises(voice_pool.VoiceTimeout, match="No voice-quality worker free"):
+            pool.run(tone, timeout=0.2)
+    finally:
+        pool._idle.put(busy)
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["kills"] == 0
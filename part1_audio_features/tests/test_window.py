@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from part1 import window, config
+
+SR = 16000
+
+def _clip(silence_s: float, speech_s: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(speech_s * SR)) / SR
+    # Amplitude-modulated harmonic tone as a stand-in for voiced speech
+    voiced = 0.3 * np.sin(2 * np.pi * 150 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+    silence = 1e-4 * rng.standard_normal(int(silence_s * SR))
+    return np.concatenate([silence, voiced]).astype(np.float32)
+
+def test_skips_leading_silence(monkeypatch):
+    monkeypatch.setattr(config, "WINDOW_SELECTION", "energy")
+    y = _clip(3.0, 2.0)
+    length = int(config.ANALYSIS_WINDOW_SECONDS * SR)
+    metadata = {}
+    start, end = window.cut(y, SR, length, metadata)
+    assert start >= 3.0 * SR - 0.02 * SR
+    assert end - start == length
+    assert metadata["window_start"] == pytest.approx(start / SR)
+    assert metadata["window_selection_ms"] >= 0
+
+def test_first_mode_keeps_old_behaviour(monkeypatch):
+    monkeypatch.setattr(config, "WINDOW_SELECTION", "first")
+    assert window.cut(_clip(3.0, 2.0), SR, 24000) == (0, 24000)
+    assert window.search_seconds() == config.ANALYSIS_WINDOW_SECONDS
+
+def test_short_clip_starts_at_zero():
+    assert window.select_window(_clip(0.0, 1.0), SR, 24000) == 0
+
+def test_white_noise_is_not_speech():
+    noise = np.random.default_rng(1).uniform(-0.5, 0.5, SR).astype(np.float32)
+    assert not window.speech_frames(noise, SR).any()
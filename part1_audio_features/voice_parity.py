@@ -0,0 +1,98 @@
+"""
+Parity report: NumPy voice-quality backend (part1/voice.py) vs Praat.
+
+Runs both backends over every WAV under --data_dir (preprocessed the same way
+as the API, cut to the analysis window unless --full) and prints, per
+feature, the median/p90 absolute and relative differences, the correlation
+across the corpus and how often exactly one backend returned NaN, plus the
+time each backend took.
+"""
+import os
+import glob
+import json
+import time
+import argparse
+import numpy as np
+from tqdm import tqdm
+from part1 import preprocess, features_acoustic, voice, config
+
+def _load(data_dir: str, full: bool) -> list[np.ndarray]:
+    wav_files = sorted(glob.glob(os.path.join(data_dir, "**/*.wav"), recursive=True))
+    window = int(config.ANALYSIS_WINDOW_SECONDS * config.SAMPLE_RATE)
+    waveforms = []
+    for wav_path in tqdm(wav_files, desc="preprocess"):
+        try:
+            y = preprocess.preprocess_audio(wav_path)
+        except Exception as e:
+            print(f"Error processing {wav_path}: {e}")
+            continue
+        y = y if full else y[:window]
+        if len(y) > 0:
+            waveforms.append(y)
+    return waveforms
+
+def _compare(praat: np.ndarray, fast: np.ndarray) -> dict:
+    report = {}
+    for j, name in enumerate(voice.FEATURES):
+        a, b = praat[:, j], fast[:, j]
+        both = np.isfinite(a) & np.isfinite(b)
+        diff = np.abs(a[both] - b[both])
+        rel = diff / np.maximum(np.abs(a[both]), 1e-9)
+        corr = np.corrcoef(a[both], b[both])[0, 1] if both.sum() > 2 and a[both].std() > 0 and b[both].std() > 0 else float("nan")
+        report[name] = {
+            "n": int(both.sum()),
+            "abs_median": float(np.median(diff)) if len(diff) else float("nan"),
+            "abs_p90": float(np.percentile(diff, 90)) if len(diff) else float("nan"),
+            "rel_median": float(np.median(rel)) if len(rel) else float("nan"),
+            "rel_p90": float(np.percentile(rel, 90)) if len(rel) else float("nan"),
+            "corr": float(corr),
+            "nan_mismatch": int((np.isfinite(a) != np.isfinite(b)).sum()),
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data_dir", type=str, required=True, help="Reference corpus (directory of WAVs)")
+    parser.add_argument("--full", action="store_true", help="Use whole clips instead of the analysis window")
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+
+    waveforms = _load(args.data_dir, args.full)
+    if not waveforms:
+        print(f"No usable WAV files found in {args.data_dir}")
+        return
+
+    start = time.perf_counter()
+    praat = np.array([[f[name] for name in voice.FEATURES]
+                      for f in map(features_acoustic.extract_voice_quality_praat, waveforms)])
+    praat_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = []
+    for i in range(0, len(waveforms), args.batch_size):
+        chunk = waveforms[i:i + args.batch_size]
+        lengths = [len(w) for w in chunk]
+        stack = np.zeros((len(chunk), max(lengths)), dtype=np.float32)
+        for k, w in enumerate(chunk):
+            stack[k, :len(w)] = w
+        fast.append(voice.extract_voice_batch(stack, lengths))
+    fast = np.concatenate(fast)
+    numpy_s = time.perf_counter() - start
+
+    report = _compare(praat, fast)
+    print(f"{len(waveforms)} clips  praat {praat_s / len(waveforms) * 1e3:.1f} ms/clip  "
+          f"numpy {numpy_s / len(waveforms) * 1e3:.1f} ms/clip  ({praat_s / numpy_s:.1f}x)")
+    print(f"{'feature':<14} {'n':>5} {'abs med':>9} {'abs p90':>9} {'rel med':>8} {'rel p90':>8} {'corr':>6} {'nan!=':>6}")
+    for name, r in report.items():
+        print(f"{name:<14} {r['n']:>5} {r['abs_median']:>9.4g} {r['abs_p90']:>9.4g} "
+              f"{r['rel_median']:>8.3f} {r['rel_p90']:>8.3f} {r['corr']:>6.3f} {r['nan_mismatch']:>6}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"clips": len(waveforms), "praat_seconds": praat_s, "numpy_seconds": numpy_s,
+                       "features": report}, f, indent=2)
+        print(f"Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
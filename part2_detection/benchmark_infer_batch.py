@@ -0,0 +1,55 @@
+"""
+Throughput of part2.infer_batch vs a loop over part2.infer.
+
+Uses the trained artifacts under models/ and random schema-sized inputs, so
+only inference is timed (no feature extraction). Torch is pinned to one
+thread unless --threads is given, so the numbers are items per second per core.
+"""
+import argparse
+import time
+import numpy as np
+import torch
+import part2
+from part2 import utils
+
+def _bundles(n: int, names: list[str]) -> list[part2.FeatureBundle]:
+    rng = np.random.default_rng(0)
+    return [
+        part2.FeatureBundle(acoustic_features=dict(zip(names, rng.standard_normal(len(names)).tolist())),
+                            deep_embeddings=np.zeros(0, dtype=np.float32), metadata={}, version="benchmark")
+        for _ in range(n)
+    ]
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=str, default="1,8,32,128,512,2048")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--explain", action="store_true", help="Include the rule-based explanation")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    utils.load_artifacts()
+    names = utils.input_names()
+
+    print(f"threads={args.threads} explain={args.explain}")
+    print(f"{'batch':>6} {'loop items/s':>13} {'batch items/s':>14} {'matrix items/s':>15} {'speedup':>8}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        bundles = _bundles(size, names)
+        matrix = np.stack([utils.bundle_vector(b) for b in bundles])
+
+        loop = _best_of(lambda: [part2.infer(b, with_explanation=args.explain) for b in bundles], args.repeats)
+        batch = _best_of(lambda: part2.infer_batch(bundles, with_explanation=args.explain), args.repeats)
+        stacked = _best_of(lambda: part2.infer_batch(matrix, with_explanation=args.explain), args.repeats)
+        print(f"{size:>6} {size / loop:>13.0f} {size / batch:>14.0f} {size / stacked:>15.0f} {loop / batch:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Exports the trained classifier, scaler and calibrator under models/ as the
+folded NumPy engine (part2/numpy_engine.py) and checks that it reproduces
+the torch path's probabilities on random inputs. train_model.py writes the
+packed artifact (model.p2pk) instead; this is for serving the NumPy engine
+from the separate model files, e.g. of models trained before the artifact.
+"""
+import argparse
+import numpy as np
+import torch
+from part2 import utils, config, numpy_engine
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=str, default=config.NUMPY_MODEL_PATH)
+    parser.add_argument("--samples", type=int, default=1000)
+    args = parser.parse_args()
+
+    clf, scaler, cal = utils._load_torch()
+    numpy_engine.export(args.output, clf, scaler, cal)
+
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((args.samples, config.INPUT_DIM_DEFAULT)).astype(np.float32)
+    if scaler is not None:
+        x = x * scaler.scale_.astype(np.float32) + scaler.mean_.astype(np.float32)
+        scaled = scaler.transform(x)
+    else:
+        scaled = x
+    with torch.no_grad():
+        expected = cal.predict_proba(clf(torch.from_numpy(np.asarray(scaled, dtype=np.float32)))).reshape(-1).numpy()
+    actual = numpy_engine.NumpyClassifier.load(args.output).predict_proba(x)
+
+    print(f"Max |p_numpy - p_torch| over {args.samples} inputs: {np.abs(actual - expected).max():.2e}")
+    print(f"NumPy engine saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
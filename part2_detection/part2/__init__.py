@@ -2,8 +2,7 @@
 import warnings
 warnings.filterwarnings("ignore")
 
-from typing import Dict, Any, Union
-import torch
+from typing import Dict, Any, List, Sequence, Union
 import numpy as np
 
 # Try implicit relative import if part1 installed, else define Protocol
@@ -21,37 +20,53 @@ except ImportError:
 
 from . import utils, explain, config
 
-def infer(features: FeatureBundle) -> Dict[str, Any]:
+def _check_loaded():
+    if utils._ENGINE is None and (utils._MODEL is None or utils._CALIBRATOR is None):
+        raise RuntimeError(
+            "Models not loaded. Ensure orchestrator.preload_models() was called at startup."
+        )
+
+def _predict_proba(matrix: np.ndarray) -> np.ndarray:
+    """Calibrated AI-generated probability per row of an unscaled (N, D) feature matrix."""
+    if utils._ENGINE is not None:
+        # Scaler and calibrator are folded into the NumPy engine's weights
+        return utils._ENGINE.predict_proba(matrix)
+
+    import torch
+    with torch.no_grad():
+        logits = utils._MODEL(utils.prepare_matrix(matrix))
+        return utils._CALIBRATOR.predict_proba(logits).reshape(-1).numpy()
+
+def infer(features: FeatureBundle, with_explanation: bool = True) -> Dict[str, Any]:
     """
     Input: FeatureBundle (part1 output)
-    Output: DetectionResult JSON
+    Output: DetectionResult JSON. with_explanation=False skips the rule-based
+    explanation (whose features part1 may then not have computed).
     """
     # 1. Verify models are loaded (should be loaded at startup via orchestrator.preload_models())
-    if utils._MODEL is None or utils._CALIBRATOR is None:
-        raise RuntimeError(
-            "Models not loaded. Ensure orchestrator.preload_models() was called at startup."
-        )
+    _check_loaded()
     
     # 2. Preprocess
     # Note: real robustness requires checking input dimensions against model expectation
-    input_tensor = utils.prepare_input(features)
+    vector = utils.bundle_vector(features)
     
     # 3. Predict & Calibrate
-    with torch.no_grad():
-        logits = utils._MODEL(input_tensor)
-        proba = utils._CALIBRATOR.predict_proba(logits).item()
+    proba = float(_predict_proba(vector[None, :])[0])
         
     # 4. Explain
-    # Threshold check
-    is_fake = proba >= config.DEFAULT_THRESHOLD
     explanation_text = explain.generate_explanation(
         features.acoustic_features, 
         utils._BASELINES, 
         proba, 
         config.DEFAULT_THRESHOLD
-    )
+    ) if with_explanation else ""
     
     # 5. Result
+    return _result(proba, explanation_text)
+
+def _result(proba: float, explanation_text: str) -> Dict[str, Any]:
+    """DetectionResult JSON for a calibrated AI-generated probability."""
+    is_fake = proba >= config.DEFAULT_THRESHOLD
     winner_proba = proba if is_fake else (1.0 - proba)
     
     return {
@@ -61,3 +76,60 @@ def infer(features: FeatureBundle) -> Dict[str, Any]:
         "model_version": config.MODEL_VERSION,
         "decision_threshold": config.DEFAULT_THRESHOLD
     }
+
+def infer_batch(batch: Union[Sequence[FeatureBundle], np.ndarray], with_explanation: bool = True) -> List[Dict[str, Any]]:
+    """
+    Input: FeatureBundles, or an (N, D) matrix of unscaled schema-ordered acoustic vectors
+    Output: one DetectionResult JSON per item, as infer would return for it.
+    One scaler transform, one forward pass and one calibration for the whole batch.
+    """
+    _check_loaded()
+
+    if isinstance(batch, np.ndarray):
+        matrix = np.atleast_2d(batch)
+        if utils.feature_schema is not None and matrix.shape[1] == utils.feature_schema.ACOUSTIC.size:
+            acoustic = [utils.feature_schema.ACOUSTIC.view(row) for row in matrix]
+        else:
+            acoustic = [{}] * len(matrix)
+    else:
+        bundles = list(batch)
+        if not bundles:
+            return []
+        matrix = np.stack([utils.bundle_vector(b) for b in bundles])
+        acoustic = [b.acoustic_features for b in bundles]
+
+    probas = _predict_proba(matrix)
+    return [
+        _result(float(p), explain.generate_explanation(
+            features, utils._BASELINES, float(p), config.DEFAULT_THRESHOLD
+        ) if with_explanation else "")
+        for p, features in zip(probas, acoustic)
+    ]
+
+def infer_segments(segments, with_explanation: bool = True) -> Dict[str, Any]:
+    """
+    Input: part1 SegmentBundle (several analysis windows of one clip)
+    Output: DetectionResult JSON for the clip plus a per-segment timeline.
+    All segments go through the model in one batch; the clip verdict uses
+    the mean segment probability.
+    """
+    _check_loaded()
+
+    utils.check_schema(segments.schema_version)
+    probas = _predict_proba(segments.acoustic_matrix)
+    proba = float(probas.mean())
+
+    explanation_text = ""
+    if with_explanation:
+        # Rules read per-clip cues; use the segment average of each feature
+        mean_vector = np.nanmean(np.asarray(segments.acoustic_matrix, dtype=np.float32), axis=0)
+        acoustic = utils.feature_schema.ACOUSTIC.view(mean_vector) if utils.feature_schema is not None else {}
+        explanation_text = explain.generate_explanation(acoustic, utils._BASELINES, proba, config.DEFAULT_THRESHOLD)
+
+    return {
+        **_result(proba, explanation_text),
+        "segments": [
+            {"start": round(float(start), 3), "end": round(float(end), 3), "probability": round(float(p), 4)}
+            for (start, end), p in zip(segments.segment_bounds, probas)
+        ]
+    }
@@ -12,6 +12,13 @@ DEFAULT_MODEL_PATH = os.path.join(MODELS_DIR, "classifier.pt")
 SCALER_PATH = os.path.join(MODELS_DIR, "scaler.pkl")
 CALIBRATOR_PATH = os.path.join(MODELS_DIR, "calibrator.pkl")
 METADATA_PATH = os.path.join(MODELS_DIR, "model_metadata.json")
+NUMPY_MODEL_PATH = os.path.join(MODELS_DIR, "classifier_numpy.npz")
+# Single packed artifact (packed.py); preferred over all of the files above when present
+PACKED_MODEL_PATH = os.path.join(MODELS_DIR, "model.p2pk")
+
+# Serving engine: "numpy" (scaler and calibrator folded into float32 arrays, torch is never
+# imported), "torch", or "auto" (numpy when PACKED_MODEL_PATH or NUMPY_MODEL_PATH exists).
+INFERENCE_ENGINE = os.getenv("PART2_ENGINE", "auto").lower()
 
 # Inference Defaults
 DEFAULT_THRESHOLD = 0.5
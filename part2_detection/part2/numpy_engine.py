@@ -0,0 +1,92 @@
+"""
+Torch-free inference for SimpleClassifier.
+
+export() folds the StandardScaler into the first Linear layer and the
+TemperatureScaler into the last one, so serving is
+
+    sigmoid(W3 relu(W2 relu(layernorm(W1 x + b1)) + b2) + b3)
+
+on the raw schema-ordered features: three matmuls and a LayerNorm, with
+no separate scaling or calibration step. The arrays are saved as float32 in
+an .npz (no pickle). Neither export() nor NumpyClassifier imports torch.
+"""
+import numpy as np
+
+ARRAYS = ("w1", "b1", "ln_weight", "ln_bias", "ln_eps", "w2", "b2", "w3", "b3")
+
+def fold(
+    state: dict,
+    mean: np.ndarray | None,
+    scale: np.ndarray | None,
+    temperature: float,
+    bias: float,
+    ln_eps: float = 1e-5
+) -> dict:
+    """
+    Engine arrays from a SimpleClassifier state dict (numpy arrays), the
+    scaler statistics (None without a scaler) and the calibration parameters.
+    Folding is done in float64 and stored as float32.
+    """
+    w1 = state["net.0.weight"].astype(np.float64)
+    b1 = state["net.0.bias"].astype(np.float64)
+    if mean is not None:
+        # W1 (x - mean) / scale + b1 = (W1 / scale) x + (b1 - (W1 / scale) mean)
+        w1 = w1 / np.asarray(scale, dtype=np.float64)[None, :]
+        b1 = b1 - w1 @ np.asarray(mean, dtype=np.float64)
+
+    # (W3 h + b3) / T + bias
+    w3 = state["net.6.weight"].astype(np.float64) / temperature
+    b3 = state["net.6.bias"].astype(np.float64) / temperature + bias
+
+    arrays = {
+        "w1": w1, "b1": b1,
+        "ln_weight": state["net.1.weight"], "ln_bias": state["net.1.bias"], "ln_eps": np.array(ln_eps),
+        "w2": state["net.4.weight"], "b2": state["net.4.bias"],
+        "w3": w3, "b3": b3
+    }
+    return {name: np.ascontiguousarray(value, dtype=np.float32) for name, value in arrays.items()}
+
+def export(path: str, clf, scaler, calibrator) -> dict:
+    """Folds a trained SimpleClassifier, StandardScaler (or None) and TemperatureScaler into an .npz at path."""
+    state = {name: tensor.detach().cpu().numpy() for name, tensor in clf.state_dict().items()}
+    arrays = fold(
+        state,
+        None if scaler is None else scaler.mean_,
+        None if scaler is None else scaler.scale_,
+        float(calibrator.temperature.item()),
+        float(calibrator.bias.item()),
+        ln_eps=clf.net[1].eps
+    )
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    return arrays
+
+class NumpyClassifier:
+    """Calibrated SimpleClassifier on raw (unscaled) feature rows."""
+
+    def __init__(self, arrays: dict):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.input_dim = self.w1.shape[1]
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in ARRAYS})
+
+    def logits(self, x: np.ndarray) -> np.ndarray:
+        """Calibrated logits (N,) of an (N, input_dim) matrix."""
+        x = np.atleast_2d(np.asarray(x, dtype=np.float32))
+        if x.shape[1] != self.input_dim:
+            raise ValueError(f"Expected {self.input_dim} features per row, got {x.shape[1]}")
+        h = x @ self.w1.T + self.b1
+        mean = h.mean(axis=1, keepdims=True)
+        var = h.var(axis=1, keepdims=True)
+        h = (h - mean) / np.sqrt(var + self.ln_eps) * self.ln_weight + self.ln_bias
+        h = np.maximum(h, 0.0)
+        h = np.maximum(h @ self.w2.T + self.b2, 0.0)
+        return (h @ self.w3.T + self.b3).reshape(-1)
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        """Calibrated AI-generated probability per row."""
+        return 1.0 / (1.0 + np.exp(-self.logits(x)))
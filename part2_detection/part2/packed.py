@@ -0,0 +1,138 @@
+"""
+Single-file model artifact: classifier weights, scaler statistics,
+calibration parameters, input feature names and human baselines.
+
+Layout (little-endian):
+
+    magic      4 bytes   b"P2PK"
+    format     uint32    FORMAT
+    header_len uint64    length of the JSON header
+    header     JSON      versions, feature schema, baselines, array table
+    padding    to ALIGN
+    arrays     raw C-order data, each starting at a multiple of ALIGN
+
+The array table gives dtype, shape, offset and sha256 of every array. read()
+memory-maps the file read-only and returns zero-copy NumPy views after
+checking the checksums, and refuses a file written for another feature
+schema. No pickle is involved at any point.
+"""
+import hashlib
+import json
+import mmap
+import struct
+import numpy as np
+
+MAGIC = b"P2PK"
+FORMAT = 1
+ALIGN = 64
+_PREFIX = struct.Struct("<4sIQ")
+
+class PackedArtifactError(Exception):
+    pass
+
+class SchemaMismatchError(PackedArtifactError):
+    """The artifact is intact but was trained on other input features than part1 provides."""
+
+class Standardizer:
+    """transform() of a fitted StandardScaler, from its stored mean and scale."""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, x: np.ndarray) -> np.ndarray:
+        return (np.asarray(x, dtype=np.float32) - self.mean_) / self.scale_
+
+def _pad(n: int) -> int:
+    return -n % ALIGN
+
+def arrays_from(clf, scaler, calibrator) -> dict:
+    """float32 arrays of a trained SimpleClassifier, StandardScaler (or None) and TemperatureScaler."""
+    arrays = {f"model.{name}": tensor.detach().cpu().numpy() for name, tensor in clf.state_dict().items()}
+    if scaler is not None:
+        arrays["scaler.mean"] = scaler.mean_
+        arrays["scaler.scale"] = scaler.scale_
+    arrays["calibrator.temperature"] = calibrator.temperature.detach().cpu().numpy()
+    arrays["calibrator.bias"] = calibrator.bias.detach().cpu().numpy()
+    return {name: np.ascontiguousarray(value, dtype=np.float32) for name, value in arrays.items()}
+
+def write(path: str, arrays: dict, features: list[str], schema_version: str | None,
+          baselines: dict, model_version: str, ln_eps: float = 1e-5) -> dict:
+    """Writes the artifact and returns its header."""
+    table, offset = {}, 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        table[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+            "sha256": hashlib.sha256(array.tobytes()).hexdigest()
+        }
+        offset += array.nbytes + _pad(array.nbytes)
+
+    header = {
+        "model_version": model_version,
+        "schema_version": schema_version,
+        "features": list(features),
+        "ln_eps": ln_eps,
+        "baselines": baselines,
+        "arrays": table
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    start = _PREFIX.size + len(header_bytes)
+
+    with open(path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * _pad(start))
+        for name, array in arrays.items():
+            data = np.ascontiguousarray(array).tobytes()
+            f.write(data)
+            f.write(b"\0" * _pad(len(data)))
+    return header
+
+def read(path: str, schema=None) -> tuple[dict, dict]:
+    """
+    (header, arrays) of the artifact at path, arrays as read-only views of
+    the mapped file. `schema` (part1's ACOUSTIC, if available) is checked
+    against the stored feature schema. Raises SchemaMismatchError if it
+    differs, PackedArtifactError for an unreadable file.
+    """
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buf) < _PREFIX.size:
+        raise PackedArtifactError(f"{path} is truncated")
+    magic, fmt, header_len = _PREFIX.unpack_from(buf)
+    if magic != MAGIC:
+        raise PackedArtifactError(f"{path} is not a packed model artifact")
+    if fmt != FORMAT:
+        raise PackedArtifactError(f"Artifact format {fmt}, expected {FORMAT}")
+    header = json.loads(bytes(buf[_PREFIX.size:_PREFIX.size + header_len]).decode("utf-8"))
+
+    if schema is not None:
+        acoustic = [name for name in header["features"] if name != "deep_embeddings"]
+        if header["schema_version"] != schema.version or acoustic != list(schema.names):
+            raise SchemaMismatchError(
+                f"Artifact was trained on feature schema {header['schema_version']} ({len(acoustic)} acoustic features), "
+                f"part1 provides {schema.version} ({len(schema.names)})"
+            )
+
+    data_start = _PREFIX.size + header_len
+    data_start += _pad(data_start)
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        start = data_start + entry["offset"]
+        end = start + count * dtype.itemsize
+        if end > len(buf):
+            raise PackedArtifactError(f"{path} is truncated ({name})")
+        if hashlib.sha256(memoryview(buf)[start:end]).hexdigest() != entry["sha256"]:
+            raise PackedArtifactError(f"Checksum mismatch for {name}")
+        arrays[name] = np.frombuffer(buf, dtype=dtype, count=count, offset=start).reshape(entry["shape"])
+    return header, arrays
+
+def state_dict(arrays: dict) -> dict:
+    """SimpleClassifier state dict entries (numpy) from the artifact arrays."""
+    return {name[len("model."):]: value for name, value in arrays.items() if name.startswith("model.")}
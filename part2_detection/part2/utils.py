@@ -1,69 +1,255 @@
-import torch
 import json
+import logging
 import os
-import joblib
 import numpy as np
 from types import SimpleNamespace
-from . import config, model, calibrator
+from . import config, numpy_engine, packed
+
+try:
+    from part1 import schema as feature_schema
+except ImportError:
+    feature_schema = None
+
+try:
+    from part1.loading import OnceLoader
+except ImportError:
+    # Without part1: same once-only contract, reporting only pending/ready
+    import threading
+
+    class OnceLoader:
+        def __init__(self, name, load_fn):
+            self.name, self._load_fn, self._lock, self._loaded = name, load_fn, threading.Lock(), False
+
+        @property
+        def ready(self) -> bool:
+            return self._loaded
+
+        def get(self):
+            with self._lock:
+                if not self._loaded:
+                    self._load_fn()
+                    self._loaded = True
+
+        def status(self) -> dict:
+            return {"state": "ready" if self._loaded else "pending", "error": None, "load_seconds": None}
+
+logger = logging.getLogger(__name__)
 
 # Caches
 _MODEL = None
 _SCALER = None
 _CALIBRATOR = None
+_ENGINE = None
 _BASELINES = None
+_FEATURES = None
+
+def engine() -> str:
+    """Serving engine per config.INFERENCE_ENGINE: "numpy" or "torch"."""
+    if config.INFERENCE_ENGINE == "auto":
+        exported = os.path.exists(config.PACKED_MODEL_PATH) or os.path.exists(config.NUMPY_MODEL_PATH)
+        return "numpy" if exported else "torch"
+    return config.INFERENCE_ENGINE
+
+def _load_torch():
+    """(model, scaler, calibrator) as trained by train_model.py."""
+    import torch
+    import joblib
+    from . import model, calibrator
 
-def load_artifacts():
-    """Lazily loads model, scaler, calibrator, and baselines."""
-    global _MODEL, _SCALER, _CALIBRATOR, _BASELINES
-    
     # 1. Load Model
-    if _MODEL is None:
-        # Initialize architecture
-        _MODEL = model.SimpleClassifier(config.INPUT_DIM_DEFAULT)
-        # Load weights if exist
-        if os.path.exists(config.DEFAULT_MODEL_PATH):
-            _MODEL.load_state_dict(torch.load(config.DEFAULT_MODEL_PATH, map_location="cpu"))
-        _MODEL.eval()
+    # Initialize architecture
+    clf = model.SimpleClassifier(config.INPUT_DIM_DEFAULT)
+    # Load weights if exist
+    if os.path.exists(config.DEFAULT_MODEL_PATH):
+        clf.load_state_dict(torch.load(config.DEFAULT_MODEL_PATH, map_location="cpu"))
+    clf.eval()
 
     # 2. Load Scaler
-    if _SCALER is None and os.path.exists(config.SCALER_PATH):
-        _SCALER = joblib.load(config.SCALER_PATH)
+    scaler = None
+    if os.path.exists(config.SCALER_PATH):
+        scaler = joblib.load(config.SCALER_PATH)
 
     # 3. Load Calibrator
-    if _CALIBRATOR is None:
-        _CALIBRATOR = calibrator.TemperatureScaler()
-        if os.path.exists(config.CALIBRATOR_PATH):
-            state = torch.load(config.CALIBRATOR_PATH, map_location="cpu")
-            _CALIBRATOR.load_state_dict(state)
-        _CALIBRATOR.eval()
-
-    # 4. Load Human Baselines
-    # Assuming Part 1's baseline path; ideally this should be copied to models/
-    # But for now we try to find it relative to part1
-    if _BASELINES is None:
-        baseline_path = os.path.abspath(os.path.join(config.BASE_DIR, "../../part1_audio_features/baselines/human_baseline.json"))
-        if os.path.exists(baseline_path):
-            with open(baseline_path, "r") as f:
-                _BASELINES = json.load(f)
+    cal = calibrator.TemperatureScaler()
+    if os.path.exists(config.CALIBRATOR_PATH):
+        state = torch.load(config.CALIBRATOR_PATH, map_location="cpu")
+        cal.load_state_dict(state)
+    cal.eval()
+    return clf, scaler, cal
+
+def _load_packed():
+    """(model, scaler, calibrator, numpy engine, baselines, features) from the packed artifact."""
+    header, arrays = packed.read(
+        config.PACKED_MODEL_PATH, feature_schema.ACOUSTIC if feature_schema is not None else None
+    )
+    temperature = float(arrays["calibrator.temperature"][0])
+    bias = float(arrays["calibrator.bias"][0])
+
+    clf = scaler = cal = numpy_clf = None
+    if engine() == "numpy":
+        numpy_clf = numpy_engine.NumpyClassifier(numpy_engine.fold(
+            packed.state_dict(arrays), arrays.get("scaler.mean"), arrays.get("scaler.scale"),
+            temperature, bias, header["ln_eps"]
+        ))
+    else:
+        import torch
+        from . import model, calibrator
+        state = {name: torch.tensor(value) for name, value in packed.state_dict(arrays).items()}
+        clf = model.SimpleClassifier(state["net.0.weight"].shape[1])
+        clf.load_state_dict(state)
+        clf.eval()
+        if "scaler.mean" in arrays:
+            scaler = packed.Standardizer(arrays["scaler.mean"], arrays["scaler.scale"])
+        cal = calibrator.TemperatureScaler()
+        cal.load_state_dict({"temperature": torch.tensor([temperature]), "bias": torch.tensor([bias])})
+        cal.eval()
+    return clf, scaler, cal, numpy_clf, header["baselines"], header["features"]
+
+def load_baselines() -> dict:
+    """Human baselines from part1's baselines/ (empty if not built)."""
+    # Assuming Part 1's baseline path; the packed artifact carries its own copy
+    baseline_path = os.path.abspath(os.path.join(config.BASE_DIR, "../../part1_audio_features/baselines/human_baseline.json"))
+    if os.path.exists(baseline_path):
+        with open(baseline_path, "r") as f:
+            return json.load(f)
+    return {} # Fallback
+
+def _load():
+    """Loads model, scaler, calibrator, baselines and feature names, then publishes them together."""
+    global _MODEL, _SCALER, _CALIBRATOR, _ENGINE, _BASELINES, _FEATURES
+
+    packed_loaded = False
+    if os.path.exists(config.PACKED_MODEL_PATH):
+        # Everything from the single artifact train_model.py writes. A schema
+        # mismatch fails the load: the separate files come from the same training run.
+        try:
+            clf, scaler, cal, numpy_clf, baselines, features = _load_packed()
+            packed_loaded = True
+        except packed.SchemaMismatchError:
+            raise
+        except packed.PackedArtifactError as e:
+            logger.warning(f"Not using {config.PACKED_MODEL_PATH} ({e}); loading the separate model files")
+    if not packed_loaded:
+        # 1-3. Model: the folded NumPy engine, or the torch model with its scaler and calibrator
+        # (auto falls back to torch when an unreadable packed artifact was the only export)
+        clf = scaler = cal = numpy_clf = None
+        if engine() == "numpy" and (config.INFERENCE_ENGINE == "numpy" or os.path.exists(config.NUMPY_MODEL_PATH)):
+            numpy_clf = numpy_engine.NumpyClassifier.load(config.NUMPY_MODEL_PATH)
         else:
-            _BASELINES = {} # Fallback
+            clf, scaler, cal = _load_torch()
 
-def prepare_input(feature_bundle) -> torch.Tensor:
-    """Concatenates embeddings and acoustic features into a tensor."""
+        # 4. Load Human Baselines
+        baselines = load_baselines()
+
+        # 5. Input features the model consumes (drives what part1 computes)
+        features = _load_feature_names()
+
+    # Scaler before model: anyone who sees _MODEL set also sees the scaler it expects
+    _SCALER, _CALIBRATOR, _BASELINES, _FEATURES = scaler, cal, baselines, features
+    _MODEL, _ENGINE = clf, numpy_clf
+
+_LOADER = OnceLoader("part2", _load)
+
+def load_artifacts():
+    """
+    Lazily loads model, scaler, calibrator, and baselines, once per process.
+    Concurrent first callers wait for the single in-flight load.
+    """
+    _LOADER.get()
+
+def load_state() -> dict:
+    """Load state of the part2 artifacts (pending, loading, ready or failed)."""
+    return _LOADER.status()
+
+def _load_feature_names() -> list[str]:
+    """
+    Feature names from the model metadata ("features"), else the schema's
+    acoustic features, plus "deep_embeddings" if INPUT_DIM_DEFAULT leaves
+    room for them.
+    """
+    if os.path.exists(config.METADATA_PATH):
+        with open(config.METADATA_PATH, "r") as f:
+            names = json.load(f).get("features")
+        if names:
+            return list(names)
+    if feature_schema is None:
+        return []
+    names = list(feature_schema.ACOUSTIC.names)
+    if config.INPUT_DIM_DEFAULT > feature_schema.ACOUSTIC.size:
+        names.append("deep_embeddings")
+    return names
+
+def required_features() -> list[str]:
+    """Feature names the loaded model consumes; pass to part1.extract_features(features=...)."""
+    load_artifacts()
+    return list(_FEATURES)
+
+def input_names() -> list[str]:
+    """
+    Acoustic feature names in model input order, for building inputs by
+    name (benchmarks, tests): part1's schema when it matches
+    INPUT_DIM_DEFAULT, else placeholders f000, f001, ... that acoustic_names
+    keeps in the same order.
+    """
+    if feature_schema is not None and feature_schema.ACOUSTIC.size == config.INPUT_DIM_DEFAULT:
+        return list(feature_schema.ACOUSTIC.names)
+    return [f"f{i:03d}" for i in range(config.INPUT_DIM_DEFAULT)]
+
+def acoustic_names(acoustic) -> list[str]:
+    """Feature names in the order acoustic_vector lays out this mapping."""
+    if feature_schema is not None and len(acoustic) == feature_schema.ACOUSTIC.size:
+        return list(feature_schema.ACOUSTIC.names)
+    # Without part1, fall back to the order the schema is defined by: sorted names
+    return sorted(acoustic.keys())
+
+def acoustic_vector(acoustic) -> np.ndarray:
+    """Model-ordered float32 vector from a name -> value mapping of acoustic features."""
+    if feature_schema is not None and len(acoustic) == feature_schema.ACOUSTIC.size:
+        return feature_schema.ACOUSTIC.from_dict(acoustic)
+    return np.array([acoustic[k] for k in acoustic_names(acoustic)], dtype=np.float32)
+
+def bundle_vector(feature_bundle) -> np.ndarray:
+    """Unscaled model input vector of one FeatureBundle."""
     # This logic needs to align with config.INPUT_DIM_DEFAULT
     # 1. Deep Embeddings (Ignored for now due to synthetic mismatch)
     # emb = feature_bundle.deep_embeddings
     
     # 2. Acoustic Features (Order matters!)
-    ac_dict = feature_bundle.acoustic_features
-    ac_keys = sorted(ac_dict.keys())
-    ac_vals = np.array([ac_dict[k] for k in ac_keys], dtype=np.float32)
+    # Bundles from the current part1 already carry the schema-ordered vector
+    vector = getattr(feature_bundle, "acoustic_vector", None)
+    if vector is not None and feature_schema is not None and \
+            getattr(feature_bundle, "schema_version", None) == feature_schema.SCHEMA_VERSION:
+        ac_vals = np.asarray(vector, dtype=np.float32)
+    else:
+        ac_vals = acoustic_vector(feature_bundle.acoustic_features)
     
     # Concatenate (Acoustic only)
-    combined = ac_vals
+    return ac_vals
+
+def prepare_input(feature_bundle):
+    """Concatenates embeddings and acoustic features into a tensor."""
+    import torch
+    combined = bundle_vector(feature_bundle)
     
     # Normalize if scaler exists
     if _SCALER:
         combined = _SCALER.transform(combined.reshape(1, -1)).flatten()
         
     return torch.from_numpy(combined).float().unsqueeze(0) # (1, D)
+
+def check_schema(schema_version: str | None):
+    """Raises ValueError for acoustic vectors from another part1 schema."""
+    if feature_schema is not None and schema_version is not None and schema_version != feature_schema.SCHEMA_VERSION:
+        raise ValueError(f"Acoustic schema {schema_version} does not match {feature_schema.SCHEMA_VERSION}")
+
+def prepare_matrix(acoustic_matrix: np.ndarray, schema_version: str | None = None):
+    """Scaled (N, D) model input tensor from stacked schema-ordered acoustic vectors (one row per segment/clip)."""
+    import torch
+    check_schema(schema_version)
+    combined = np.asarray(acoustic_matrix, dtype=np.float32)
+
+    # Normalize if scaler exists
+    if _SCALER:
+        combined = _SCALER.transform(combined)
+
+    return torch.from_numpy(np.asarray(combined, dtype=np.float32)) # (N, D)
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+import torch
+from sklearn.preprocessing import StandardScaler
+from part2 import model, calibrator
+
+@pytest.fixture
+def trained():
+    """(x, clf, scaler, cal): seeded 92-wide inputs, their fitted scaler, an untrained classifier and a non-identity calibrator."""
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    x = (rng.standard_normal((200, 92)) * rng.uniform(0.1, 50, 92) + rng.uniform(-100, 100, 92)).astype(np.float32)
+    scaler = StandardScaler().fit(x)
+    clf = model.SimpleClassifier(92).eval()
+    cal = calibrator.TemperatureScaler()
+    with torch.no_grad():
+        cal.temperature.fill_(1.7)
+        cal.bias.fill_(-0.3)
+    return x, clf, scaler, cal
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+import part2
+from part2 import utils
+
+@pytest.fixture(scope="module")
+def bundles():
+    utils.load_artifacts()
+    names = utils.input_names()
+    rng = np.random.default_rng(0)
+    return [
+        part2.FeatureBundle(acoustic_features=dict(zip(names, rng.standard_normal(len(names)).tolist())),
+                            deep_embeddings=np.zeros(0, dtype=np.float32), metadata={}, version="test")
+        for _ in range(16)
+    ]
+
+def test_batch_matches_single(bundles):
+    single = [part2.infer(b) for b in bundles]
+    batched = part2.infer_batch(bundles)
+    assert len(batched) == len(single)
+    for a, b in zip(single, batched):
+        assert a["classification"] == b["classification"]
+        assert a["confidence"] == pytest.approx(b["confidence"], abs=1e-4)
+        assert a["explanation"] == b["explanation"]
+
+def test_matrix_input_matches_bundles(bundles):
+    matrix = np.stack([utils.bundle_vector(b) for b in bundles])
+    from_matrix = part2.infer_batch(matrix, with_explanation=False)
+    from_bundles = part2.infer_batch(bundles, with_explanation=False)
+    assert [r["confidence"] for r in from_matrix] == [r["confidence"] for r in from_bundles]
+
+def test_empty_batch():
+    utils.load_artifacts()
+    assert part2.infer_batch([]) == []
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+import torch
+from part2 import numpy_engine
+
+def test_folded_engine_matches_torch(tmp_path, trained):
+    x, clf, scaler, cal = trained
+    path = str(tmp_path / "engine.npz")
+    numpy_engine.export(path, clf, scaler, cal)
+
+    with torch.no_grad():
+        expected = cal.predict_proba(clf(torch.from_numpy(scaler.transform(x).astype(np.float32)))).reshape(-1).numpy()
+    actual = numpy_engine.NumpyClassifier.load(path).predict_proba(x)
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+def test_engine_rejects_wrong_width(trained):
+    _, clf, scaler, cal = trained
+    engine = numpy_engine.NumpyClassifier(numpy_engine.fold(
+        {k: v.numpy() for k, v in clf.state_dict().items()}, scaler.mean_, scaler.scale_, 1.0, 0.0
+    ))
+    with pytest.raises(ValueError):
+        engine.predict_proba(np.zeros((2, 91), dtype=np.float32))
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import joblib
+import torch
+from part2 import packed, numpy_engine, config, utils
+
+NAMES = [f"f{i:03d}" for i in range(92)]
+
+@pytest.fixture
+def artifact(tmp_path, trained):
+    _, clf, scaler, cal = trained
+    path = str(tmp_path / "model.p2pk")
+    packed.write(path, packed.arrays_from(clf, scaler, cal), features=NAMES, schema_version="acoustic-v1",
+                 baselines={"jitter_local": {"median": 0.02}}, model_version="test")
+    return path, clf, scaler, cal
+
+def test_roundtrip_is_aligned_and_exact(artifact):
+    path, clf, scaler, cal = artifact
+    header, arrays = packed.read(path, SimpleNamespace(version="acoustic-v1", names=NAMES))
+    assert header["baselines"] == {"jitter_local": {"median": 0.02}}
+    assert header["features"] == NAMES
+    for name, value in clf.state_dict().items():
+        np.testing.assert_array_equal(arrays[f"model.{name}"], value.numpy())
+    assert all(a.ctypes.data % packed.ALIGN == 0 for a in arrays.values())
+    assert not arrays["model.net.0.weight"].flags.writeable
+
+    x = np.random.default_rng(0).standard_normal((8, 92)).astype(np.float32)
+    engine = numpy_engine.NumpyClassifier(numpy_engine.fold(
+        packed.state_dict(arrays), arrays["scaler.mean"], arrays["scaler.scale"],
+        float(arrays["calibrator.temperature"][0]), float(arrays["calibrator.bias"][0])
+    ))
+    with torch.no_grad():
+        expected = cal.predict_proba(clf(torch.from_numpy(packed.Standardizer(
+            scaler.mean_.astype(np.float32), scaler.scale_.astype(np.float32)).transform(x)))).reshape(-1).numpy()
+    np.testing.assert_allclose(engine.predict_proba(x), expected, atol=1e-5)
+
+def test_refuses_other_schema(artifact):
+    path = artifact[0]
+    with pytest.raises(packed.PackedArtifactError, match="schema"):
+        packed.read(path, SimpleNamespace(version="acoustic-v2", names=NAMES))
+
+def test_refuses_corrupted_weights(artifact):
+    path = artifact[0]
+    data = bytearray(open(path, "rb").read())
+    data[-packed.ALIGN * 4] ^= 0xFF
+    open(path, "wb").write(bytes(data))
+    with pytest.raises(packed.PackedArtifactError):
+        packed.read(path)
+
+@pytest.fixture
+def legacy_models(tmp_path, monkeypatch, trained):
+    """Separate model files of the trained fixture under tmp_path, with config and utils caches pointed at them."""
+    _, clf, scaler, cal = trained
+    torch.save(clf.state_dict(), str(tmp_path / "classifier.pt"))
+    joblib.dump(scaler, str(tmp_path / "scaler.pkl"))
+    torch.save(cal.state_dict(), str(tmp_path / "calibrator.pkl"))
+    monkeypatch.setattr(config, "DEFAULT_MODEL_PATH", str(tmp_path / "classifier.pt"))
+    monkeypatch.setattr(config, "SCALER_PATH", str(tmp_path / "scaler.pkl"))
+    monkeypatch.setattr(config, "CALIBRATOR_PATH", str(tmp_path / "calibrator.pkl"))
+    monkeypatch.setattr(config, "NUMPY_MODEL_PATH", str(tmp_path / "missing.npz"))
+    monkeypatch.setattr(config, "INFERENCE_ENGINE", "auto")
+    for name in ("_MODEL", "_SCALER", "_CALIBRATOR", "_ENGINE", "_BASELINES", "_FEATURES"):
+        monkeypatch.setattr(utils, name, None)
+    monkeypatch.setattr(utils, "_LOADER", utils.OnceLoader("part2", utils._load))
+
+@pytest.mark.skipif(utils.feature_schema is None, reason="needs part1's feature schema")
+def test_schema_mismatch_fails_load_despite_model_files(artifact, legacy_models, monkeypatch):
+    # NAMES are not part1's schema: the separate files from the same run must not be served either
+    monkeypatch.setattr(config, "PACKED_MODEL_PATH", artifact[0])
+    with pytest.raises(packed.SchemaMismatchError):
+        utils.load_artifacts()
+    assert utils.load_state()["state"] == "failed"
+    assert utils._MODEL is None and utils._ENGINE is None
+
+def test_unreadable_artifact_falls_back_to_model_files(artifact, legacy_models, monkeypatch, caplog):
+    path = artifact[0]
+    with open(path, "r+b") as f:
+        f.write(b"XXXX")
+    monkeypatch.setattr(config, "PACKED_MODEL_PATH", path)
+
+    utils.load_artifacts()
+    assert "Not using" in caplog.text
+    assert utils.load_state()["state"] == "ready"
+    assert utils._ENGINE is None and utils._MODEL is not None
@@ -6,7 +6,14 @@ import json
 import joblib
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, roc_auc_score
-from part2 import config, model
+from part2 import config, model, utils, packed
+
+def _check_feature_names(feature_names, acoustic: dict, path: str) -> list[str]:
+    """Input feature names of this sample, which must match every earlier sample's."""
+    names = utils.acoustic_names(acoustic)
+    if feature_names is not None and names != feature_names:
+        raise ValueError(f"{path} has different acoustic features than the earlier samples")
+    return names
 
 def main():
     print("--- Part 2: Detection Model Training Pipeline (with Scaler) ---")
@@ -28,6 +35,7 @@ def main():
     
     X_train = []
     y_train = []
+    feature_names = None
     
     for filename, label in train_labels_map.items():
         path = os.path.join(train_dir, filename)
@@ -38,8 +46,8 @@ def main():
         acoustic = json.loads(str(data["acoustic"]))
         
         # Concatenate features (same order as utils.prepare_input)
-        ac_keys = sorted(acoustic.keys())
-        ac_vals = np.array([acoustic[k] for k in ac_keys], dtype=np.float32)
+        feature_names = _check_feature_names(feature_names, acoustic, path)
+        ac_vals = utils.acoustic_vector(acoustic)
         # AC only
         combined = ac_vals
         
@@ -66,8 +74,8 @@ def main():
         embeddings = data["embeddings"]
         acoustic = json.loads(str(data["acoustic"]))
         
-        ac_keys = sorted(acoustic.keys())
-        ac_vals = np.array([acoustic[k] for k in ac_keys], dtype=np.float32)
+        feature_names = _check_feature_names(feature_names, acoustic, path)
+        ac_vals = utils.acoustic_vector(acoustic)
         # AC only
         combined = ac_vals
         
@@ -173,10 +181,24 @@ def main():
     print(f"Validation Accuracy: {acc*100:.2f}%")
     print(f"Validation AUC: {auc:.4f}")
     print(f"Mean Predicted Proba (Class 1): {np.mean(val_probs):.4f}")
+
+    # Single packed artifact (weights, scaler, calibrator, feature schema, baselines) that load_artifacts prefers
+    schema = utils.feature_schema
+    trained_on_schema = schema is not None and feature_names == list(schema.ACOUSTIC.names)
+    packed.write(
+        config.PACKED_MODEL_PATH,
+        packed.arrays_from(clf.cpu(), scaler, calibrator.cpu()),
+        features=feature_names,
+        schema_version=schema.SCHEMA_VERSION if trained_on_schema else None,
+        baselines=utils.load_baselines(),
+        model_version=config.MODEL_VERSION,
+        ln_eps=clf.net[1].eps
+    )
     
     print(f"Model saved to: {config.DEFAULT_MODEL_PATH}")
     print(f"Scaler saved to: {config.SCALER_PATH}")
     print(f"Calibrator saved to: {config.CALIBRATOR_PATH}")
+    print(f"Packed artifact saved to: {config.PACKED_MODEL_PATH}")
     print("Training Complete.")
 
 if __name__ == "__main__":
@@ -21,6 +21,11 @@ class Settings(BaseSettings):
     MAX_AUDIO_SIZE_BYTES: int = 1 * 1024 * 1024  # 1 MB (ensures fast processing on CPU)
     MIN_DURATION_SECONDS: float = 1.0
     MAX_DURATION_SECONDS: float = 10.0  # Reduced from 30s to guarantee <8s response time
+
+    # Multi-segment scoring: analyse several windows per clip and return a timeline.
+    # The segment count adapts so feature extraction stays within part1's
+    # SEGMENT_BUDGET_SECONDS (part1/config.py, same env var).
+    SEGMENT_MODE: bool = False
     
     # Model Paths (optional, can fallback to hardcoded defaults in Part 1/2)
     # These env vars allow us to override paths if needed in Docker
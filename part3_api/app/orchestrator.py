@@ -7,11 +7,14 @@ import os
 import structlog
 import numpy as np
 from .errors import FeatureExtractionError, InferenceError
+from .config import settings
 
 logger = structlog.get_logger()
 
 # Global state
 MODEL_LOADED = False
+# Feature names the deployed model consumes, resolved and validated once (see _model_features)
+MODEL_FEATURES = None
 
 # --- Dynamic Path Setup for Local Dev ---
 # If running locally without pip install -e, we need to add sibling dirs to path
@@ -45,10 +48,14 @@ def detect_voice(audio_base64: str, language_hint: str | None, request_id: str):
 
     logger.info("orchestrator_start", request_id=request_id)
 
+    if settings.SEGMENT_MODE:
+        return _detect_segments(audio_base64, language_hint, request_id)
+
     # 1. Feature Extraction (Part 1)
     try:
-        # Part 1 extract_features accepts base64 directly
-        features = part1.extract_features(audio_base64, language_hint)
+        # Part 1 extract_features accepts base64 directly; compute only what the model
+        # (and the explanation) reads
+        features = part1.extract_features(audio_base64, language_hint, features=_model_features())
         logger.info("feature_extraction_success", request_id=request_id)
     except Exception as e:
         logger.error("feature_extraction_failed", request_id=request_id, error=str(e))
@@ -67,6 +74,49 @@ def detect_voice(audio_base64: str, language_hint: str | None, request_id: str):
         logger.error("inference_failed", request_id=request_id, error=str(e))
         raise InferenceError(str(e))
 
+def _detect_segments(audio_base64: str, language_hint: str | None, request_id: str):
+    """Multi-segment variant of detect_voice: batched features and one batched inference."""
+    try:
+        segments = part1.extract_segments(audio_base64, language_hint)
+        logger.info("feature_extraction_success", request_id=request_id, segments=segments.metadata["segments"])
+    except Exception as e:
+        logger.error("feature_extraction_failed", request_id=request_id, error=str(e))
+        raise FeatureExtractionError(str(e))
+
+    try:
+        result = part2.infer_segments(segments)
+        result["request_id"] = request_id
+        logger.info("inference_success", request_id=request_id, classification=result.get("classification"))
+        return result
+    except Exception as e:
+        logger.error("inference_failed", request_id=request_id, error=str(e))
+        raise InferenceError(str(e))
+
+def _model_features() -> tuple[str, ...]:
+    """
+    The model's input features, checked against part1's registry. Resolved
+    once (normally by preload_models) and reused by every request; raises
+    KeyError if the model asks for a feature part1 does not know.
+    """
+    global MODEL_FEATURES
+    if MODEL_FEATURES is None:
+        names = tuple(part2.utils.required_features())
+        part1.registry.resolve(names)
+        MODEL_FEATURES = names
+    return MODEL_FEATURES
+
+def probe_audio(audio_bytes: bytes):
+    """
+    Header-only probe of the upload via part1 (no decoding).
+    Returns part1.probe.AudioInfo, or None if part1 is unavailable or the format is not probeable.
+    """
+    if not part1:
+        return None
+    try:
+        return part1.probe.probe(audio_bytes)
+    except part1.probe.ProbeError:
+        return None
+
 def preload_models():
     """
     Triggers lazy loading of models in part1 and part2.
@@ -86,6 +136,26 @@ def preload_models():
                 logger.info("part1_deep_model_skipped_by_config")
         except Exception as e:
             logger.error("part1_preload_failed", error=str(e))
+
+        # Warm ffmpeg decoder workers so the first non-libsndfile upload skips process start-up
+        # (the bounded pool single-window requests use; whole-clip decodes start theirs on first use)
+        try:
+            from part1 import config as p1_config
+            if p1_config.FFMPEG_POOL_ENABLED:
+                from part1.decoder_pool import get_pool
+                from part1.io import decode_limit_seconds
+                logger.info("part1_decoder_pool_started", **get_pool(decode_limit_seconds()).stats())
+        except Exception as e:
+            logger.warning("part1_decoder_pool_failed", error=str(e))
+
+        # Spawn Praat workers up front; each imports parselmouth/librosa once
+        try:
+            from part1 import config as p1_config
+            if p1_config.VOICE_BACKEND == "praat" and p1_config.VOICE_POOL_ENABLED:
+                from part1.voice_pool import get_pool as get_voice_pool
+                logger.info("part1_voice_pool_started", **get_voice_pool().stats())
+        except Exception as e:
+            logger.warning("part1_voice_pool_failed", error=str(e))
     
     if part2:
         try:
@@ -94,12 +164,19 @@ def preload_models():
             
             # Verify models are actually loaded
             from part2 import utils as p2_utils
-            if p2_utils._MODEL is None or p2_utils._CALIBRATOR is None:
+            try:
+                part2._check_loaded()
+            except RuntimeError:
                 raise RuntimeError("part2 models failed to load despite no exception")
+
+            # Resolve the model's feature set once; an unknown feature fails startup, not the first request
+            if part1:
+                logger.info("model_features_resolved", count=len(_model_features()))
             
             logger.info("part2_model_preloaded", 
-                       model_loaded=p2_utils._MODEL is not None,
-                       calibrator_loaded=p2_utils._CALIBRATOR is not None)
+                       engine="numpy" if p2_utils._ENGINE is not None else "torch",
+                       model_loaded=p2_utils._MODEL is not None or p2_utils._ENGINE is not None,
+                       calibrator_loaded=p2_utils._CALIBRATOR is not None or p2_utils._ENGINE is not None)
         except Exception as e:
             logger.error("part2_preload_failed", error=str(e))
             # Don't set MODEL_LOADED if part2 fails
@@ -111,8 +188,8 @@ def preload_models():
         
         # Verify part2 models exist and are accessible
         from part2 import utils as p2_utils
-        if p2_utils._MODEL is not None:
-            logger.info("model_verified", model_type=str(type(p2_utils._MODEL)))
+        if p2_utils._MODEL is not None or p2_utils._ENGINE is not None:
+            logger.info("model_verified", model_type=str(type(p2_utils._ENGINE or p2_utils._MODEL)))
         if p2_utils._CALIBRATOR is not None:
             logger.info("calibrator_verified")
         
@@ -121,11 +198,35 @@ def preload_models():
     except Exception as e:
         logger.warning("warmup_verification_failed", error=str(e))
 
+    # Unique vs shared memory of this worker, to size the worker count (wav2vec2 weights
+    # mapped with DEEP_WEIGHTS=mmap count as shared once a second worker maps them)
+    if part1:
+        try:
+            from part1 import config as p1_config, memory, deep_artifact
+            mapped = deep_artifact.mapped_path() if p1_config.USE_DEEP_FEATURES and p1_config.DEEP_WEIGHTS == "mmap" else None
+            logger.info("worker_memory_report", **memory.report(mapped))
+        except Exception as e:
+            logger.warning("worker_memory_report_failed", error=str(e))
+
     global MODEL_LOADED
     MODEL_LOADED = True
     
     total_duration = time.time() - start_time
     logger.info("all_models_preloaded", total_startup_seconds=round(total_duration, 2))
 
+def model_status() -> dict:
+    """
+    Load state per model: pending, loading, ready or failed (loads are
+    single-flight, see part1.loading). wav2vec2 is "disabled" without
+    USE_DEEP_FEATURES.
+    """
+    status = {}
+    if part1:
+        from part1 import config as p1_config
+        status["wav2vec2"] = part1.features_deep.load_state() if p1_config.USE_DEEP_FEATURES else {"state": "disabled"}
+    if part2:
+        status["part2"] = part2.utils.load_state()
+    return status
+
 def is_model_loaded():
-    return MODEL_LOADED
+    return MODEL_LOADED and all(s["state"] in ("ready", "disabled") for s in model_status().values())
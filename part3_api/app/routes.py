@@ -7,7 +7,7 @@ import structlog
 from .schemas import DetectRequest, DetectResponse
 from .auth import get_api_key
 from . import rate_limiter
-from .orchestrator import detect_voice
+from .orchestrator import detect_voice, probe_audio
 from .errors import AppError, RateLimitExceeded
 from . import metrics
 from .config import settings
@@ -22,14 +22,15 @@ router = APIRouter()
 
 @router.get("/ready")
 async def readiness_probe():
-    from .orchestrator import is_model_loaded
+    from .orchestrator import is_model_loaded, model_status
+    models = model_status()
     if is_model_loaded():
-        return {"status": "ready", "model_loaded": True}
-    raise HTTPException(status_code=503, detail="Model not loaded yet")
+        return {"status": "ready", "model_loaded": True, "models": models}
+    raise HTTPException(status_code=503, detail={"message": "Model not loaded yet", "models": models})
 
 # Allow POST to both / and /detect-voice for compatibility with different testers
-@router.post("/", response_model=DetectResponse, include_in_schema=False)
-@router.post("/detect-voice", response_model=DetectResponse)
+@router.post("/", response_model=DetectResponse, response_model_exclude_none=True, include_in_schema=False)
+@router.post("/detect-voice", response_model=DetectResponse, response_model_exclude_none=True)
 async def detect_voice_endpoint(
     req: DetectRequest,
     api_key: str = Depends(get_api_key)
@@ -72,26 +73,22 @@ async def detect_voice_endpoint(
              log.error("request_too_large_fast_fail", size=len(req.audioBase64), limit=settings.MAX_AUDIO_SIZE_BYTES)
              raise HTTPException(status_code=413, detail="Audio file too large")
 
-        # Early duration validation (decode and check before expensive processing)
+        # Early duration validation from container headers (no decoding) before expensive processing
         try:
             import base64
-            import io
-            import wave
             audio_bytes = base64.b64decode(req.audioBase64)
             
-            # Quick duration check for WAV files
-            try:
-                with wave.open(io.BytesIO(audio_bytes), 'rb') as wav:
-                    duration = wav.getnframes() / wav.getframerate()
-                    if duration < settings.MIN_DURATION_SECONDS or duration > settings.MAX_DURATION_SECONDS:
-                        log.warning("invalid_audio_duration", duration=duration)
-                        raise HTTPException(
-                            status_code=400, 
-                            detail=f"Audio duration must be between {settings.MIN_DURATION_SECONDS}s and {settings.MAX_DURATION_SECONDS}s"
-                        )
-            except wave.Error:
-                # Not a WAV file, might be MP3 - skip duration check and let part1 handle it
-                pass
+            # MP3 (Xing/VBRI/LAME or frame walk), WAV, FLAC and Ogg are probed from headers only
+            info = probe_audio(audio_bytes)
+            if info is not None:
+                duration = info.duration
+                if duration < settings.MIN_DURATION_SECONDS or duration > settings.MAX_DURATION_SECONDS:
+                    log.warning("invalid_audio_duration", duration=duration, codec=info.codec)
+                    raise HTTPException(
+                        status_code=400, 
+                        detail=f"Audio duration must be between {settings.MIN_DURATION_SECONDS}s and {settings.MAX_DURATION_SECONDS}s"
+                    )
+            # Unknown formats skip the early check and let part1 handle them
                 
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -133,6 +130,7 @@ async def detect_voice_endpoint(
             classification="AI_GENERATED" if result["classification"].lower() == "fake" else "HUMAN",
             confidenceScore=result["confidence"],
             explanation=final_explanation,
+            segments=result.get("segments"),
         )
 
     except RateLimitExceeded:
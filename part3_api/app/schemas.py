@@ -43,9 +43,15 @@ class DetectRequest(BaseModel):
             raise ValueError("audioFormat must be 'mp3'")
         return "mp3"
 
+class SegmentScore(BaseModel):
+    start: float = Field(..., description="Segment start (seconds into the trimmed clip)")
+    end: float = Field(..., description="Segment end (seconds into the trimmed clip)")
+    probability: float = Field(..., ge=0.0, le=1.0, description="AI-generated probability for this segment")
+
 class DetectResponse(BaseModel):
     status: str = Field("success", description="Status of the request (success/error)")
     language: str = Field(..., description="Language of the analyzed audio")
     classification: str = Field(..., description="Prediction: 'Human' or 'AI_GENERATED'")
     confidenceScore: float = Field(..., ge=0.0, le=1.0, description="Confidence score (0.0 to 1.0)")
     explanation: str = Field(..., description="Human-readable explanation (max 3 lines)")
+    segments: Optional[list[SegmentScore]] = Field(None, description="Per-segment timeline (multi-segment mode only)")